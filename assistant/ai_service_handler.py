@@ -3,15 +3,33 @@ import json
 import time
 from typing import Optional, Dict, List, Any
 from pathlib import Path
-import requests
-from threading import Lock
+from threading import RLock, Timer
+from .lazy_import import lazy_import
+from .request_scheduler import RequestScheduler
+from .provider_health import ProviderHealth
+from .warm_cache import get_warm_cache, fingerprint
+
+requests = lazy_import('requests')
 
 class AIServiceHandler:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.service_lock = Lock()
+        self.service_lock = RLock()
         self.available_services = {}
         self.current_service = None
+        ai_config = config.get('ai_service') or config.get('ai_services') or {}
+        self.scheduler = RequestScheduler(ai_config.get('scheduler', {}))
+        self.health_config = ai_config.get('health', {})
+        self.provider_health: Dict[str, ProviderHealth] = {}
+        # Assumed latency (seconds) for providers that have not been observed yet
+        self.latency_priors = {'local': 0.5, 'cloud': 2.0}
+        self.max_attempts = self.health_config.get('max_attempts', 2)
+        self.local_model_paths = [
+            Path.home() / '.local' / 'share' / 'ai_models',
+            Path(__file__).parent / 'resources' / 'models'
+        ]
+        # Model discovery and health checks from the last launch, revalidated in the background
+        self.warm_cache = get_warm_cache()
         self._initialize_services()
 
     def _initialize_services(self):
@@ -24,21 +42,35 @@ class AIServiceHandler:
         self._select_optimal_service()
 
     def _detect_local_models(self):
-        """Detect available local AI models"""
-        local_model_paths = [
-            Path.home() / '.local' / 'share' / 'ai_models',
-            Path(__file__).parent / 'resources' / 'models'
-        ]
+        """Detect available local AI models, reusing the last scan while the model folders are unchanged"""
+        key = fingerprint(self.local_model_paths)
+        models = self.warm_cache.cached('ai_local_models', key, self._scan_local_models,
+                                        on_change=lambda found: self._apply_services('local', found))
+        self._apply_services('local', models, reselect=False)
 
-        for path in local_model_paths:
+    def _scan_local_models(self) -> Dict[str, Dict]:
+        """Scan the model folders for valid local models"""
+        models = {}
+        for path in self.local_model_paths:
             if path.exists():
                 for model_dir in path.glob('*'):
                     if self._validate_local_model(model_dir):
-                        self.available_services[model_dir.name] = {
+                        models[model_dir.name] = {
                             'type': 'local',
                             'path': str(model_dir),
                             'capabilities': self._get_model_capabilities(model_dir)
                         }
+        return models
+
+    def _apply_services(self, service_type: str, services: Dict[str, Dict], reselect: bool = True):
+        """Replace the detected services of one type, e.g. after a background revalidation"""
+        with self.service_lock:
+            for name in [name for name, service in self.available_services.items()
+                         if service['type'] == service_type and name not in services]:
+                del self.available_services[name]
+            self.available_services.update(services)
+        if reselect:
+            self._select_optimal_service()
 
     def _validate_local_model(self, model_path: Path) -> bool:
         """Validate if a local model is properly formatted and accessible"""
@@ -81,8 +113,19 @@ class AIServiceHandler:
         }
 
         for name, service in cloud_services.items():
-            if self._validate_cloud_service(service):
-                self.available_services[name] = service
+            service['name'] = name
+
+        def probe():
+            return [name for name, service in cloud_services.items() if self._validate_cloud_service(service)]
+
+        def apply(reachable, reselect=True):
+            self._apply_services('cloud', {name: cloud_services[name] for name in reachable
+                                           if name in cloud_services}, reselect)
+
+        # Health checks take seconds per provider; start from last launch's answer and re-check in the background
+        key = fingerprint(env=('HTTP_PROXY', 'HTTPS_PROXY', 'NO_PROXY'),
+                          urls=sorted(service['url'] for service in cloud_services.values()))
+        apply(self.warm_cache.cached('ai_cloud_health', key, probe, on_change=apply), reselect=False)
 
     def _validate_cloud_service(self, service: Dict) -> bool:
         """Validate if a cloud service is accessible"""
@@ -104,43 +147,110 @@ class AIServiceHandler:
         except Exception:
             return False
 
-    def _select_optimal_service(self):
+    def _get_health(self, service_name: str) -> ProviderHealth:
+        """Get the rolling health tracker for a provider, creating it on first use"""
+        with self.service_lock:
+            if service_name not in self.provider_health:
+                self.provider_health[service_name] = ProviderHealth(
+                    window=self.health_config.get('window', 50),
+                    max_error_rate=self.health_config.get('max_error_rate', 0.5),
+                    failure_threshold=self.health_config.get('failure_threshold', 3),
+                    base_cooldown=self.health_config.get('cooldown_seconds', 30),
+                    max_cooldown=self.health_config.get('max_cooldown_seconds', 300)
+                )
+            return self.provider_health[service_name]
+
+    def _expected_latency(self, service_name: str, service: Dict) -> float:
+        """Observed p95 latency, or a per-type prior for providers not yet used"""
+        p95 = self._get_health(service_name).p95_latency()
+        if p95 is not None:
+            return p95
+        return self.latency_priors.get(service['type'], 2.0)
+
+    def _rank_services(self, task_type: Optional[str] = None) -> List[tuple]:
+        """Rank usable services by capability match and observed latency"""
+        with self.service_lock:
+            candidates = [(name, service) for name, service in self.available_services.items()
+                          if self._get_health(name).can_attempt()]
+        capable = [item for item in candidates
+                   if not task_type or task_type in item[1].get('capabilities', [])]
+        pool = capable or candidates
+        # Prefer local services when latencies tie
+        return sorted(pool, key=lambda item: (self._expected_latency(*item), item[1]['type'] != 'local'))
+
+    def _select_optimal_service(self, task_type: Optional[str] = None):
         """Select the best available AI service based on capabilities and performance"""
+        ranked = self._rank_services(task_type)
         with self.service_lock:
-            # Prioritize local services if available
-            local_services = {name: service for name, service in self.available_services.items()
-                            if service['type'] == 'local'}
-            if local_services:
-                self.current_service = next(iter(local_services.items()))
-                return
-
-            # Fall back to cloud services
-            cloud_services = {name: service for name, service in self.available_services.items()
-                            if service['type'] == 'cloud'}
-            if cloud_services:
-                self.current_service = next(iter(cloud_services.items()))
+            self.current_service = ranked[0] if ranked else None
+        return self.current_service
 
     def process_text(self, text: str, task_type: str) -> Dict[str, Any]:
-        """Process text using the current AI service"""
-        if not self.current_service:
+        """Process text using the fastest healthy AI service"""
+        ranked = self._rank_services(task_type)
+        if not ranked:
             return {'error': 'No AI service available'}
 
-        service_name, service_config = self.current_service
+        result = None
+        for service_name, service_config in ranked[:self.max_attempts]:
+            if not self._get_health(service_name).begin_attempt():
+                continue
+            with self.service_lock:
+                self.current_service = (service_name, service_config)
+            try:
+                # Route through the scheduler so concurrent identical prompts share one call
+                if service_config['type'] == 'local':
+                    result = self.scheduler.run(
+                        service_name, task_type, text,
+                        lambda prompt: self._timed_call(
+                            service_name, self._process_local, prompt, task_type, service_config),
+                        batch_call=lambda prompts: self._timed_call(
+                            service_name, self._process_local_batch, prompts, task_type, service_config)
+                    )
+                else:
+                    result = self.scheduler.run(
+                        service_name, task_type, text,
+                        lambda prompt: self._timed_call(
+                            service_name, self._process_cloud, prompt, task_type, service_config)
+                    )
+            except Exception as e:
+                result = {'error': f'Processing failed: {str(e)}'}
+                continue
+            if not self._is_error(result):
+                return result
+
+        return result or {'error': 'No AI service available'}
+
+    def _is_error(self, result: Any) -> bool:
+        if isinstance(result, list):
+            return any(self._is_error(item) for item in result)
+        return isinstance(result, dict) and bool(result.get('error'))
+
+    def _timed_call(self, service_name: str, func, *args):
+        """Run a provider call and feed its latency and outcome into the health tracker"""
+        start = time.monotonic()
         try:
-            if service_config['type'] == 'local':
-                return self._process_local(text, task_type, service_config)
-            else:
-                return self._process_cloud(text, task_type, service_config)
-        except Exception as e:
-            # If current service fails, try to switch to another service
-            self._handle_service_failure(service_name)
-            return {'error': f'Processing failed: {str(e)}'}
+            result = func(*args)
+        except Exception:
+            self._handle_service_failure(service_name, time.monotonic() - start)
+            raise
+        elapsed = time.monotonic() - start
+        if self._is_error(result):
+            self._handle_service_failure(service_name, elapsed)
+        else:
+            self._get_health(service_name).record_success(elapsed)
+        return result
 
     def _process_local(self, text: str, task_type: str, service_config: Dict) -> Dict[str, Any]:
         """Process text using a local AI model"""
         # Implementation for local model processing
         pass
 
+    def _process_local_batch(self, texts: List[str], task_type: str, service_config: Dict) -> List[Dict[str, Any]]:
+        """Process a micro-batch of prompts with a local AI model"""
+        # Models without a native batch entry point are run prompt by prompt
+        return [self._process_local(text, task_type, service_config) for text in texts]
+
     def _process_cloud(self, text: str, task_type: str, service_config: Dict) -> Dict[str, Any]:
         """Process text using a cloud AI service"""
         # Check for AI configuration under either 'ai_service' or 'ai_services' key
@@ -208,12 +318,37 @@ class AIServiceHandler:
         except Exception as e:
             return {'error': f'HuggingFace processing failed: {str(e)}'}
 
-    def _handle_service_failure(self, failed_service: str):
-        """Handle service failure by switching to another available service"""
-        with self.service_lock:
-            if failed_service in self.available_services:
-                del self.available_services[failed_service]
-            self._select_optimal_service()
+    def _handle_service_failure(self, failed_service: str, latency: float = 0.0):
+        """Record a failure and switch away from the service while its breaker is open"""
+        if self._get_health(failed_service).record_failure(latency):
+            self._schedule_probe(failed_service)
+        self._select_optimal_service()
+
+    def _schedule_probe(self, service_name: str):
+        """Re-probe an open provider once its cooldown expires"""
+        timer = Timer(self._get_health(service_name).retry_in(), self._probe_service, args=(service_name,))
+        timer.daemon = True
+        timer.start()
+
+    def _probe_service(self, service_name: str):
+        """Half-open trial: close the breaker if the provider answers again"""
+        health = self._get_health(service_name)
+        service = self.available_services.get(service_name)
+        if not service or not health.begin_attempt():
+            # Live traffic already claimed the trial slot
+            return
+
+        start = time.monotonic()
+        if service['type'] == 'local':
+            healthy = self._validate_local_model(Path(service['path']))
+        else:
+            healthy = self._validate_cloud_service(service)
+
+        if healthy:
+            health.record_success(time.monotonic() - start)
+        elif health.record_failure(time.monotonic() - start):
+            self._schedule_probe(service_name)
+        self._select_optimal_service()
 
     def get_service_status(self) -> Dict[str, Any]:
         """Get the current status of AI services"""
@@ -223,5 +358,10 @@ class AIServiceHandler:
             'service_types': {
                 name: service['type']
                 for name, service in self.available_services.items()
-            }
+            },
+            'health': {
+                name: self._get_health(name).get_stats()
+                for name in self.available_services
+            },
+            'scheduler': self.scheduler.get_metrics()
         }
\ No newline at end of file
@@ -0,0 +1,398 @@
+import json
+import os
+import platform
+import re
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache import CACHE_DIR
+
+INDEX_VERSION = 1
+
+# Executables in install folders that are never what the user means by "open X"
+_HELPER_EXE = re.compile(r'unins\d*|uninstall|setup|install|update|crash|helper|report|elevat', re.I)
+# Field codes in a .desktop Exec line (%f, %U, ...)
+_FIELD_CODE = re.compile(r'%[a-zA-Z]')
+
+
+def normalize_app_name(name: str) -> str:
+    """Lowercase words of an application name without extension or punctuation"""
+    name = re.sub(r'\.(exe|lnk|desktop|app)$', '', name.strip().lower())
+    return ' '.join(re.findall(r'[a-z0-9+#]+', name))
+
+
+class AppLauncherIndex:
+    """Persistent index from application names and aliases to launch targets.
+
+    Each platform source (Start Menu shortcuts, Program Files, registry
+    App Paths and Uninstall keys on Windows; .desktop files and $PATH on
+    Linux; application bundles on macOS) is scanned separately and stored
+    with a stamp of the directory mtimes or registry write times it was
+    built from. A refresh rescans only the sources whose stamp changed, so
+    it is cheap to run in the background at startup and after a miss.
+    Lookups are dictionary hits on normalized names with a whole-word
+    fallback.
+    """
+
+    def __init__(self, index_path=None, refresh_cooldown: float = 60.0):
+        self.index_path = Path(index_path or CACHE_DIR / 'app_index.json')
+        self.refresh_cooldown = refresh_cooldown
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self.names: Dict[str, Dict[str, str]] = {}
+        self.refresh_lock = threading.Lock()
+        self.refresh_thread = None
+        self.last_refresh = 0.0
+        self.system = platform.system()
+        self._load()
+
+    # Lookup
+
+    def resolve(self, app_name: str) -> Optional[Dict[str, str]]:
+        """Best launch entry for a spoken application name, or None"""
+        query = normalize_app_name(app_name)
+        if not query:
+            return None
+        names = self.names
+        if not names:
+            # Nothing indexed yet, e.g. first run: build it in the background and
+            # answer from $PATH meanwhile rather than making the command wait
+            self.start_refresh()
+            command = shutil.which(app_name.strip()) or shutil.which(query.replace(' ', '-'))
+            return {'name': app_name.strip(), 'target': command, 'kind': 'command'} if command else None
+
+        entry = names.get(query)
+        if entry is None:
+            # Shortest indexed name containing the query as whole words: "code" -> "visual studio code"
+            padded = f' {query} '
+            matches = [name for name in names if padded in f' {name} ']
+            if not matches:
+                self.start_refresh()
+                return None
+            entry = names[min(matches, key=len)]
+
+        if entry['kind'] != 'command' and not os.path.exists(entry['target']):
+            self.start_refresh()
+            return None
+        return entry
+
+    def launch(self, entry: Dict[str, str]) -> bool:
+        """Start the application an entry points to"""
+        kind, target = entry['kind'], entry['target']
+        try:
+            if kind == 'shortcut':
+                os.startfile(target)
+            elif kind == 'desktop':
+                desktop_id = entry.get('desktop_id')
+                if desktop_id and shutil.which('gtk-launch'):
+                    subprocess.Popen(['gtk-launch', desktop_id])
+                else:
+                    subprocess.Popen(shlex.split(entry['exec']))
+            elif kind == 'bundle':
+                subprocess.Popen(['open', '-a', target])
+            else:
+                subprocess.Popen([target])
+            return True
+        except Exception as e:
+            logging.error(f"Could not launch {target}: {str(e)}")
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'names': len(self.names),
+            'sources': {source_id: len(source['entries']) for source_id, source in self.sources.items()},
+            'last_refresh': self.last_refresh,
+            'refreshing': self.is_refreshing()
+        }
+
+    # Refresh
+
+    def is_refreshing(self) -> bool:
+        return self.refresh_thread is not None and self.refresh_thread.is_alive()
+
+    def start_refresh(self, force: bool = False):
+        """Refresh changed sources in the background, at most once per cooldown"""
+        if self.is_refreshing():
+            return
+        if not force and time.time() - self.last_refresh < self.refresh_cooldown:
+            return
+        self.refresh_thread = threading.Thread(target=self.refresh, daemon=True)
+        self.refresh_thread.start()
+
+    def refresh(self) -> int:
+        """Rescan sources whose stamp changed; returns the number rescanned"""
+        with self.refresh_lock:
+            self.last_refresh = time.time()
+            rescanned = 0
+            sources = {}
+            for source_id, stamp_func, scan_func in self._source_definitions():
+                try:
+                    stamp = stamp_func()
+                    previous = self.sources.get(source_id)
+                    if previous and previous['stamp'] == stamp:
+                        sources[source_id] = previous
+                        continue
+                    sources[source_id] = {'stamp': stamp, 'entries': scan_func()}
+                    rescanned += 1
+                except Exception as e:
+                    logging.error(f"App index source {source_id} failed: {str(e)}")
+                    if source_id in self.sources:
+                        sources[source_id] = self.sources[source_id]
+
+            if rescanned or sources.keys() != self.sources.keys():
+                self.sources = sources
+                self.names = self._build_names(sources)
+                self._save()
+            logging.info(f"App index refreshed: {rescanned} source(s) rescanned, {len(self.names)} names")
+            return rescanned
+
+    def _build_names(self, sources: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+        """Name -> entry map; earlier sources and primary names win over aliases"""
+        names = {}
+        ordered = [entry for source in sources.values() for entry in source['entries']]
+        for entry in ordered:
+            names.setdefault(normalize_app_name(entry['name']), entry)
+        for entry in ordered:
+            for alias in entry.get('aliases', []):
+                alias = normalize_app_name(alias)
+                if alias:
+                    names.setdefault(alias, entry)
+        names.pop('', None)
+        return names
+
+    def _source_definitions(self) -> List[Tuple[str, Callable[[], Any], Callable[[], List[Dict[str, Any]]]]]:
+        if self.system == 'Windows':
+            start_menus = [
+                os.path.join(os.environ.get('APPDATA', ''), 'Microsoft', 'Windows', 'Start Menu', 'Programs'),
+                os.path.join(os.environ.get('ProgramData', ''), 'Microsoft', 'Windows', 'Start Menu', 'Programs')
+            ]
+            program_dirs = [
+                os.environ.get('ProgramFiles', 'C:\\Program Files'),
+                os.environ.get('ProgramFiles(x86)', 'C:\\Program Files (x86)'),
+                os.environ.get('LocalAppData', '')
+            ]
+            return [
+                ('start_menu', lambda: self._dir_stamp(start_menus, max_depth=None),
+                 lambda: self._scan_start_menu(start_menus)),
+                ('registry', self._registry_stamp, self._scan_registry),
+                ('program_files', lambda: self._dir_stamp(program_dirs, max_depth=0),
+                 lambda: self._scan_program_files(program_dirs)),
+            ]
+        if self.system == 'Darwin':
+            bundle_dirs = ['/Applications', '/System/Applications', os.path.expanduser('~/Applications')]
+            return [
+                ('bundles', lambda: self._dir_stamp(bundle_dirs, max_depth=1),
+                 lambda: self._scan_bundles(bundle_dirs)),
+                ('path', lambda: self._dir_stamp(self._path_dirs(), max_depth=0), self._scan_path),
+            ]
+        desktop_dirs = self._desktop_dirs()
+        return [
+            ('desktop', lambda: self._dir_stamp(desktop_dirs, max_depth=None),
+             lambda: self._scan_desktop_files(desktop_dirs)),
+            ('path', lambda: self._dir_stamp(self._path_dirs(), max_depth=0), self._scan_path),
+        ]
+
+    def _dir_stamp(self, roots: List[str], max_depth: Optional[int]) -> List[List[Any]]:
+        """Modification times of the roots and their subdirectories down to max_depth"""
+        stamp = []
+        for root in roots:
+            if not root or not os.path.isdir(root):
+                continue
+            base_depth = root.rstrip(os.sep).count(os.sep)
+            for current, dirs, _ in os.walk(root):
+                if max_depth is not None and current.count(os.sep) - base_depth >= max_depth:
+                    dirs[:] = []
+                try:
+                    stamp.append([current, os.stat(current).st_mtime])
+                except OSError:
+                    pass
+        return stamp
+
+    # Sources
+
+    def _path_dirs(self) -> List[str]:
+        return list(dict.fromkeys(d for d in os.environ.get('PATH', '').split(os.pathsep) if d))
+
+    def _scan_path(self) -> List[Dict[str, Any]]:
+        entries = []
+        for directory in self._path_dirs():
+            try:
+                with os.scandir(directory) as it:
+                    for item in it:
+                        if item.is_file() and os.access(item.path, os.X_OK):
+                            entries.append({'name': item.name, 'target': item.name, 'kind': 'command'})
+            except OSError:
+                continue
+        return entries
+
+    def _desktop_dirs(self) -> List[str]:
+        data_home = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+        data_dirs = (os.environ.get('XDG_DATA_DIRS') or '/usr/local/share:/usr/share').split(':')
+        extra = ['/var/lib/flatpak/exports/share', os.path.expanduser('~/.local/share/flatpak/exports/share'),
+                 '/var/lib/snapd/desktop']
+        return list(dict.fromkeys(os.path.join(d, 'applications') for d in [data_home] + data_dirs + extra if d))
+
+    def _scan_desktop_files(self, desktop_dirs: List[str]) -> List[Dict[str, Any]]:
+        entries = []
+        for root in desktop_dirs:
+            for current, _, files in os.walk(root):
+                for file in files:
+                    if file.endswith('.desktop'):
+                        path = os.path.join(current, file)
+                        entry = self._read_desktop_file(path, os.path.relpath(path, root).replace(os.sep, '-'))
+                        if entry:
+                            entries.append(entry)
+        return entries
+
+    def _read_desktop_file(self, path: str, desktop_id: str) -> Optional[Dict[str, Any]]:
+        fields = {}
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                in_entry = False
+                for line in f:
+                    line = line.strip()
+                    if line.startswith('['):
+                        in_entry = line == '[Desktop Entry]'
+                    elif in_entry and '=' in line:
+                        key, value = line.split('=', 1)
+                        fields.setdefault(key.strip(), value.strip())
+        except OSError:
+            return None
+
+        if (fields.get('Type', 'Application') != 'Application' or not fields.get('Exec') or not fields.get('Name')
+                or fields.get('NoDisplay', '').lower() == 'true' or fields.get('Hidden', '').lower() == 'true'):
+            return None
+        command = _FIELD_CODE.sub('', fields['Exec']).strip()
+        try:
+            program = os.path.basename(shlex.split(command)[0]) if command else ''
+        except ValueError:
+            return None
+        aliases = [program, desktop_id[:-len('.desktop')]]
+        aliases += [fields.get('GenericName', '')] + fields.get('Keywords', '').split(';')
+        return {'name': fields['Name'], 'target': path, 'kind': 'desktop', 'desktop_id': desktop_id,
+                'exec': command, 'aliases': [alias for alias in aliases if alias]}
+
+    def _scan_bundles(self, bundle_dirs: List[str]) -> List[Dict[str, Any]]:
+        entries = []
+        for root in bundle_dirs:
+            for current, dirs, _ in os.walk(root):
+                for directory in list(dirs):
+                    if directory.endswith('.app'):
+                        dirs.remove(directory)  # Don't descend into bundles
+                        entries.append({'name': directory[:-4], 'target': os.path.join(current, directory),
+                                        'kind': 'bundle'})
+                if current != root:
+                    dirs[:] = []
+        return entries
+
+    def _scan_start_menu(self, start_menus: List[str]) -> List[Dict[str, Any]]:
+        entries = []
+        for start_path in start_menus:
+            for root, _, files in os.walk(start_path):
+                for file in files:
+                    if file.lower().endswith('.lnk') and not _HELPER_EXE.search(file):
+                        entries.append({'name': file[:-4], 'target': os.path.join(root, file), 'kind': 'shortcut'})
+        return entries
+
+    def _scan_program_files(self, program_dirs: List[str]) -> List[Dict[str, Any]]:
+        entries = []
+        for program_dir in program_dirs:
+            if not program_dir or not os.path.exists(program_dir):
+                continue
+            base_depth = program_dir.count(os.sep)
+            for root, dirs, files in os.walk(program_dir):
+                # Skip deep directories, as the old per-request search did
+                if root.count(os.sep) - base_depth >= 3:
+                    dirs[:] = []
+                for file in files:
+                    if file.lower().endswith('.exe') and not _HELPER_EXE.search(file):
+                        entries.append({'name': file[:-4], 'target': os.path.join(root, file), 'kind': 'exe'})
+        return entries
+
+    def _registry_stamp(self) -> List[List[Any]]:
+        import winreg
+        stamp = []
+        for root_key, subkey_path in self._registry_keys():
+            try:
+                with winreg.OpenKey(root_key, subkey_path) as key:
+                    stamp.append([subkey_path, winreg.QueryInfoKey(key)[2]])
+            except OSError:
+                pass
+        return stamp
+
+    def _registry_keys(self) -> List[Tuple[Any, str]]:
+        import winreg
+        return [(root_key, rf"SOFTWARE\Microsoft\Windows\CurrentVersion\{name}")
+                for name in ('App Paths', 'Uninstall')
+                for root_key in (winreg.HKEY_LOCAL_MACHINE, winreg.HKEY_CURRENT_USER)]
+
+    def _scan_registry(self) -> List[Dict[str, Any]]:
+        """Applications from the registry App Paths and Uninstall keys"""
+        import winreg
+        entries = []
+        for root_key, subkey_path in self._registry_keys():
+            try:
+                with winreg.OpenKey(root_key, subkey_path) as key:
+                    for i in range(winreg.QueryInfoKey(key)[0]):
+                        try:
+                            subkey_name = winreg.EnumKey(key, i)
+                            with winreg.OpenKey(key, subkey_name) as subkey:
+                                if subkey_path.endswith('App Paths'):
+                                    path, _ = winreg.QueryValueEx(subkey, "")
+                                    entries.append({'name': subkey_name, 'target': path.strip('"'), 'kind': 'exe'})
+                                    continue
+                                display_name, _ = winreg.QueryValueEx(subkey, "DisplayName")
+                                install_location, _ = winreg.QueryValueEx(subkey, "InstallLocation")
+                                exe_path = self._find_exe_in_directory(install_location, display_name)
+                                if display_name and exe_path:
+                                    entries.append({'name': display_name, 'target': exe_path, 'kind': 'exe'})
+                        except OSError:
+                            continue
+            except OSError:
+                pass
+        return entries
+
+    def _find_exe_in_directory(self, directory: str, app_name: str) -> Optional[str]:
+        """Executable in an install folder, preferring one named like the app"""
+        if not directory or not os.path.isdir(directory):
+            return None
+        try:
+            exe_files = [item.path for item in os.scandir(directory)
+                         if item.name.lower().endswith('.exe') and not _HELPER_EXE.search(item.name)]
+        except OSError:
+            return None
+        app_name_lower = app_name.lower()
+        for exe_file in exe_files:
+            if Path(exe_file).stem.lower() in app_name_lower or app_name_lower in Path(exe_file).stem.lower():
+                return exe_file
+        return exe_files[0] if exe_files else None
+
+    # Persistence
+
+    def _load(self):
+        try:
+            if not self.index_path.exists():
+                return
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != INDEX_VERSION or data.get('system') != self.system:
+                return
+            self.sources = data.get('sources', {})
+            self.names = self._build_names(self.sources)
+        except Exception as e:
+            print(f"Error loading app index {self.index_path}: {str(e)}")
+
+    def _save(self):
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(self.index_path.suffix + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': INDEX_VERSION, 'system': self.system, 'sources': self.sources}, f)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            print(f"Error saving app index {self.index_path}: {str(e)}")
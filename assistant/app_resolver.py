@@ -0,0 +1,160 @@
+import os
+import platform
+import re
+import shutil
+import subprocess
+import threading
+import time
+import logging
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .app_index import AppLauncherIndex, normalize_app_name
+
+# "ms-settings:", "https://..." but not a drive letter such as "C:\\"
+_URI = re.compile(r'^[a-z][a-z0-9+.-]+:', re.I)
+
+
+class AppResolver:
+    """Single lookup from spoken application aliases to launch targets.
+
+    Alias tables from CommandHandler, SystemController, SystemCommand and the
+    user's custom_apps are merged into one word-level trie, so the longest
+    alias mentioned anywhere in a command is found in one pass over its
+    words ("open task manager" matches "task manager", "knowledge" does not
+    match "edge"). Names that are not aliases go to the launcher index.
+    What a target turns out to be (folder, URI, file, command on PATH) is
+    worked out once and cached; failed lookups are retried after
+    negative_ttl seconds, and a target that fails to launch is re-probed.
+    """
+
+    def __init__(self, app_index: Optional[AppLauncherIndex] = None, negative_ttl: float = 60.0):
+        self.app_index = app_index
+        self.negative_ttl = negative_ttl
+        self.system = platform.system()
+        self.aliases: Dict[str, str] = {}
+        self.trie: Dict[str, Any] = {}
+        self.targets: Dict[str, Tuple[Optional[Dict[str, str]], float]] = {}
+        self.lock = threading.Lock()
+
+    # Alias tables
+
+    def add_aliases(self, mapping: Mapping[str, str], override: bool = True):
+        """Register alias -> target pairs; later tables win unless override is False"""
+        with self.lock:
+            for alias, target in mapping.items():
+                key = normalize_app_name(alias)
+                if not key or not target or (not override and key in self.aliases):
+                    continue
+                previous = self.aliases.get(key)
+                self.aliases[key] = target
+                if previous is not None and previous != target:
+                    self.targets.pop(previous, None)
+                node = self.trie
+                for word in key.split():
+                    node = node.setdefault(word, {})
+                node[None] = key  # End of alias marker
+
+    def remove_alias(self, alias: str):
+        with self.lock:
+            key = normalize_app_name(alias)
+            target = self.aliases.pop(key, None)
+            if target is None:
+                return
+            self.targets.pop(target, None)
+            node = self.trie
+            for word in key.split():
+                node = node.get(word, {})
+            node.pop(None, None)
+
+    def find_alias(self, text: str) -> Optional[str]:
+        """Longest registered alias mentioned in text, or None"""
+        words = normalize_app_name(text).split()
+        best = None
+        for start in range(len(words)):
+            node = self.trie
+            for word in words[start:]:
+                node = node.get(word)
+                if node is None:
+                    break
+                if None in node and (best is None or len(node[None]) > len(best)):
+                    best = node[None]
+        return best
+
+    # Resolution
+
+    def resolve(self, text: str) -> Optional[Dict[str, str]]:
+        """Launch entry for an alias mentioned in text, or for text as an application name"""
+        alias = self.find_alias(text)
+        if alias:
+            entry = self._resolve_target(self.aliases[alias])
+            if entry:
+                return dict(entry, alias=alias)
+        if self.app_index:
+            entry = self.app_index.resolve(text)
+            if entry:
+                return dict(entry, alias=normalize_app_name(text))
+        return None
+
+    def _resolve_target(self, target: str) -> Optional[Dict[str, str]]:
+        cached = self.targets.get(target)
+        if cached and (cached[0] is not None or time.time() - cached[1] < self.negative_ttl):
+            return cached[0]
+        entry = self._probe(target)
+        self.targets[target] = (entry, time.time())
+        return entry
+
+    def _probe(self, target: str) -> Optional[Dict[str, str]]:
+        """Work out how to launch a target; the only place that touches the filesystem"""
+        expanded = os.path.expandvars(os.path.expanduser(target))
+        if os.path.isdir(expanded):
+            return {'kind': 'folder', 'target': expanded}
+        if _URI.match(target) and not re.match(r'^[a-z]:[\\/]', target, re.I):
+            return {'kind': 'uri', 'target': target}
+        if os.path.isabs(expanded) or os.sep in expanded:
+            return {'kind': 'exe', 'target': expanded} if os.path.isfile(expanded) else None
+        if self.app_index:
+            entry = self.app_index.resolve(target)
+            if entry:
+                return entry
+        command = shutil.which(target)
+        if command:
+            return {'kind': 'command', 'target': command}
+        if self.system == 'Windows':
+            # Registered through App Paths (winword, excel) even when not on PATH
+            return {'kind': 'shell', 'target': target}
+        return None
+
+    # Launching
+
+    def launch(self, entry: Dict[str, str]) -> bool:
+        kind, target = entry['kind'], entry['target']
+        try:
+            if kind in ('folder', 'uri', 'shell'):
+                if self.system == 'Windows':
+                    os.startfile(target)
+                elif self.system == 'Darwin':
+                    subprocess.Popen(['open', target])
+                else:
+                    subprocess.Popen(['xdg-open', target])
+                return True
+            if self.app_index:
+                launched = self.app_index.launch(entry)
+            else:
+                subprocess.Popen([target])
+                launched = True
+        except Exception as e:
+            logging.error(f"Could not launch {target}: {str(e)}")
+            launched = False
+        if not launched:
+            # Re-probe next time instead of trusting the cached entry
+            for key, (cached, _) in list(self.targets.items()):
+                if cached is not None and cached['target'] == target:
+                    self.targets.pop(key, None)
+        return launched
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'aliases': len(self.aliases),
+            'cached_targets': sum(1 for entry, _ in self.targets.values() if entry is not None),
+            'missing_targets': sum(1 for entry, _ in self.targets.values() if entry is None)
+        }
@@ -0,0 +1,113 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import RLock
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Shared on-disk location for persisted service caches
+CACHE_DIR = Path(os.path.dirname(__file__)).parent / 'cache'
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed time-to-live.
+
+    Expired entries are kept (until evicted) so callers can serve stale data
+    while refreshing in the background. When persist_path is set the cache
+    can be saved to and restored from a JSON file, so keys must be strings
+    and values JSON serializable.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float = 1800, persist_path: Optional[Path] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persist_path = Path(persist_path) if persist_path else None
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = RLock()
+        if self.persist_path:
+            self.load()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a value only if it has not expired"""
+        entry = self.get_entry(key)
+        if entry is None or entry[1] > self.ttl:
+            return default
+        return entry[0]
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Get (value, age in seconds) for a key, whether fresh or stale"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            value, stored_at = entry
+            return value, time.time() - stored_at
+
+    def is_fresh(self, key: str) -> bool:
+        entry = self.get_entry(key)
+        return entry is not None and entry[1] <= self.ttl
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (value, stored_at if stored_at is not None else time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def keys(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries.keys()))
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def load(self) -> None:
+        """Restore entries from disk, keeping their original timestamps"""
+        try:
+            if not self.persist_path or not self.persist_path.exists():
+                return
+            with open(self.persist_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                for key, entry in data.get('entries', {}).items():
+                    self.set(key, entry['value'], entry['stored_at'])
+        except Exception as e:
+            print(f"Error loading cache {self.persist_path}: {str(e)}")
+
+    def save(self) -> None:
+        """Write entries to disk atomically"""
+        if not self.persist_path:
+            return
+        try:
+            with self._lock:
+                data = {'entries': {key: {'value': value, 'stored_at': stored_at}
+                                    for key, (value, stored_at) in self._entries.items()}}
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.persist_path.with_suffix(self.persist_path.suffix + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            print(f"Error saving cache {self.persist_path}: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            fresh = sum(1 for _, stored_at in self._entries.values() if now - stored_at <= self.ttl)
+            return {'entries': len(self._entries), 'fresh': fresh, 'stale': len(self._entries) - fresh,
+                    'max_entries': self.max_entries}
@@ -1,6 +1,7 @@
 import logging
 import os
 import random
+import re
 from datetime import datetime
 from typing import Dict, Any, Optional
 from .commands import CommandRegistry
@@ -12,6 +13,9 @@ from .weather_service import WeatherService
 from .system_controller import SystemController
 from .conversation_storage import ConversationStorage
 from .screen_analyzer import ScreenAnalyzer
+from .screen_sampler import ScreenContextSampler
+from .app_index import AppLauncherIndex
+from .app_resolver import AppResolver
 from .commands.search_commands import GoogleSearchCommand, NewsCommand
 
 class CommandHandler:
@@ -48,8 +52,17 @@ class CommandHandler:
             except KeyError:
                 pass
         self.weather_service = WeatherService()
-        self.system_controller = SystemController()
+        # Installed applications are indexed in the background so "open X" is a lookup
+        self.app_index = AppLauncherIndex()
+        self.app_index.start_refresh()
+        self.app_resolver = AppResolver(self.app_index)
+        self.system_controller = SystemController(self.app_resolver)
         self.screen_analyzer = ScreenAnalyzer(config)
+        # Screen context is sampled in the background; commands only read the latest snapshot
+        sampler_config = config.get('screen_sampler', {}) if hasattr(config, 'get') else {}
+        self.screen_sampler = ScreenContextSampler(self.screen_analyzer, sampler_config)
+        if sampler_config.get('enabled', True):
+            self.screen_sampler.start()
         self.conversation_storage = ConversationStorage()
         self.is_listening = False
         self.ai_mode = False
@@ -100,7 +113,10 @@ class CommandHandler:
             'terminal': 'wt',
             'discord': 'discord'
         }
-        self.custom_apps = {}
+        self.custom_apps = dict(config.get('custom_apps', {})) if hasattr(config, 'get') else {}
+        # One resolver over all alias tables; user-defined apps take precedence
+        self.app_resolver.add_aliases(self.app_map)
+        self.app_resolver.add_aliases(self.custom_apps)
         # Add conversation context
         self.conversation_context = {
             'last_topic': None,
@@ -167,10 +183,15 @@ class CommandHandler:
             from .commands.time_command import TimeCommand
             from .commands.system_command import SystemCommand
             from .commands.help_command import HelpCommand
-            from .commands.youtube_command import YouTubeCommand  # Add this line
+            from .commands.file_search_command import FileSearchCommand
+            from .commands.screen_command import ScreenReadCommand
+            from .commands.youtube_command import YouTubeCommand
+            from .commands.search_commands import GoogleSearchCommand, NewsCommand
             
             # Register core commands with proper error handling
             commands_to_register = [
+                ('file_search', FileSearchCommand),  # First: its check is strict and "play"/"start" appear in file names
+                ('screen', ScreenReadCommand),
                 ('media', MediaCommand),
                 ('weather', WeatherCommand),
                 ('time', TimeCommand),
@@ -178,7 +199,9 @@ class CommandHandler:
                 ('wikipedia', WikipediaCommand),
                 ('system', SystemCommand),
                 ('help', HelpCommand),
-                ('youtube', YouTubeCommand)  # Add this line
+                ('youtube', YouTubeCommand),
+                ('google_search', GoogleSearchCommand),
+                ('news', NewsCommand)
             ]
             
             for intent, command_class in commands_to_register:
@@ -187,22 +210,9 @@ class CommandHandler:
                     self.logger.info(f"Successfully registered {intent} command")
                 except Exception as e:
                     self.logger.error(f"Failed to register {intent} command: {str(e)}")
-                    
-            # Initialize command instances to verify they work
-            for intent, command_class in self.command_registry.get_all_commands().items():
-                try:
-                    command_instance = command_class(self)
-                    self.logger.info(f"Successfully initialized {intent} command")
-                except Exception as e:
-                    self.logger.error(f"Failed to initialize {intent} command: {str(e)}")
-                    # Remove failed command from registry
-                    self.command_registry._commands.pop(intent, None)
         except Exception as e:
-            self.logger.error(f"Error in command registration: {str(e)}")
-            # Don't raise error, just log it
-            self.logger.warning("Continuing with partial command registration")
+            self.logger.error(f"Error in _register_commands: {str(e)}")
 
-    
     def determine_intent(self, command: str) -> str:
         """Determine the intent of the command"""
         command = command.lower()
@@ -332,7 +342,7 @@ class CommandHandler:
                         response += "\nI can help you find some focus-friendly music if you'd like."
                     
                     # Add application opening command handling
-                    elif any(app_name in command for app_name in self.app_map.keys()) or "open" in command:
+                    elif self.app_resolver.find_alias(command) or "open" in command:
                         response += self.open_application(command)
                 except Exception as e:
                     self.logger.error(f"Error handling command: {str(e)}")
@@ -348,7 +358,9 @@ class CommandHandler:
             self.conversation_storage.store_interaction(command, response)
             
             # Store the interaction with context
-            screen_context = self.screen_analyzer.get_screen_context() if hasattr(self, 'screen_analyzer') else {}
+            screen_context = self.screen_sampler.get_snapshot() if hasattr(self, 'screen_sampler') else {}
+            if hasattr(self, 'screen_sampler'):
+                self.screen_sampler.request_refresh()
             context = {
                 'screen_context': screen_context,
                 'mood': self.conversation_context['mood'],
@@ -461,24 +473,6 @@ class CommandHandler:
             # Implement reminder listing logic
         return response
 
-    def handle_schedule(self, command):
-        response = ""
-        if "today" in command:
-            response = "Here's your schedule for today: "
-            # Implement schedule retrieval logic
-        elif "add" in command:
-            response = "I'll add that to your schedule. "
-            # Implement schedule addition logic
-        elif "delete" in command:
-            try:
-                schedule_id = int(command.split("delete schedule")[-1].strip())
-                if self.study_manager.db.delete_schedule(schedule_id):
-                    return f"Schedule {schedule_id} deleted successfully"
-                return "Schedule not found"
-            except ValueError:
-                return "Use format: 'delete schedule [ID]'"
-        return response
-
     def toggle_listening(self):
         """Toggle voice listening state"""
         self.is_listening = not self.is_listening
@@ -592,14 +586,24 @@ class CommandHandler:
                 self.music_controller.set_music_path()
                 
             # Process media commands
-            if "play" in command.lower():
+            if "shuffle" in command.lower():
+                enabled = self.music_controller.set_shuffle(False if "off" in command.lower() else None)
+                return f"Shuffle {'on' if enabled else 'off'}."
+            elif "repeat" in command.lower():
+                mode = 'off' if "off" in command.lower() else 'one' if re.search(r"\b(one|song|track|this)\b", command.lower()) else 'all'
+                self.music_controller.set_repeat(mode)
+                return {"off": "Repeat off.", "one": "Repeating this track.", "all": "Repeating the playlist."}[mode]
+            elif "play" in command.lower():
                 # Check for specific media or artist
-                if "by" in command.lower():
-                    artist = command.split("by")[-1].strip()
-                    if self.music_controller.play_by_artist(artist):
-                        return f"Playing media by {artist}."
+                by_match = re.search(r"^(?:.*?\bplay\s+)?(.*?)\s*\bby\s+(.+)$", command, re.IGNORECASE)
+                if by_match:
+                    title, artist = by_match.group(1).strip(), by_match.group(2).strip()
+                    if title.lower() in ('', 'music', 'media', 'songs', 'something', 'anything', 'tracks'):
+                        title = None
+                    if self.music_controller.play_by_artist(artist, title=title):
+                        return f"Playing {title or 'media'} by {artist}."
                     else:
-                        return f"Couldn't find media by {artist}."
+                        return f"Couldn't find {title or 'media'} by {artist}."
                 elif "playlist" in command.lower():
                     playlist = command.replace('play playlist', '').strip()
                     if self.music_controller.play_playlist(playlist):
@@ -652,24 +656,14 @@ class CommandHandler:
     def launch_application(self, command):
         """Launch applications based on command"""
         try:
-            command = command.lower()
-            # Extract app name from command
-            app_name = None
-            for key in self.app_map.keys():
-                if key in command:
-                    app_name = self.app_map[key]
-                    break
-            
-            if not app_name:
+            entry = self.app_resolver.resolve(self._app_name_from_command(command))
+            if not entry:
                 return "I'm not sure which application you want to open."
             
             # Launch the application
-            try:
-                os.startfile(app_name)
-                return f"Opening {app_name}."
-            except Exception as e:
-                self.logger.error(f"Error launching application {app_name}: {str(e)}")
-                return f"Sorry, I couldn't open {app_name}."
+            if self.app_resolver.launch(entry):
+                return f"Opening {entry['alias']}."
+            return f"Sorry, I couldn't open {entry['alias']}."
                 
         except Exception as e:
             self.logger.error(f"Error in launch_application: {str(e)}")
@@ -678,62 +672,25 @@ class CommandHandler:
     def open_application(self, command):
         """Open applications or folders based on command"""
         try:
-            command = command.lower()
-            # Check if it's a folder path
-            for key, path in self.app_map.items():
-                if key in command and os.path.isdir(path):
-                    os.startfile(path)
-                    return f"Opening {key} folder."
-                    
-            # Check if it's an application
-            for key, app in self.app_map.items():
-                if key in command:
-                    try:
-                        os.startfile(app)
-                        return f"Opening {key}."
-                    except Exception as e:
-                        self.logger.error(f"Error opening {key}: {str(e)}")
-                        return f"Sorry, I couldn't open {key}."
-                        
-            return "I'm not sure what you want me to open."
+            entry = self.app_resolver.resolve(self._app_name_from_command(command))
+            if not entry:
+                return "I'm not sure what you want me to open."
+            
+            name = f"{entry['alias']} folder" if entry['kind'] == 'folder' else entry['alias']
+            if self.app_resolver.launch(entry):
+                return f"Opening {name}."
+            return f"Sorry, I couldn't open {name}."
             
         except Exception as e:
             self.logger.error(f"Error in open_application: {str(e)}")
             return f"Sorry, I couldn't process that command: {str(e)}"
 
-    def _register_commands(self):
-        """Register all available commands"""
-        try:
-            # Import all command classes
-            from .commands.music_command import MediaCommand
-            from .commands.weather_command import WeatherCommand
-            from .commands.web_search_command import WebSearchCommand
-            from .commands.wikipedia_command import WikipediaCommand
-            from .commands.time_command import TimeCommand
-            from .commands.system_command import SystemCommand
-            from .commands.help_command import HelpCommand
-            from .commands.youtube_command import YouTubeCommand
-            from .commands.search_commands import GoogleSearchCommand, NewsCommand
-            
-            # Register core commands with proper error handling
-            commands_to_register = [
-                ('media', MediaCommand),
-                ('weather', WeatherCommand),
-                ('time', TimeCommand),
-                ('web_search', WebSearchCommand),
-                ('wikipedia', WikipediaCommand),
-                ('system', SystemCommand),
-                ('help', HelpCommand),
-                ('youtube', YouTubeCommand),
-                ('google_search', GoogleSearchCommand),
-                ('news', NewsCommand)
-            ]
-            
-            for intent, command_class in commands_to_register:
-                try:
-                    self.command_registry.register(intent, command_class)
-                    self.logger.info(f"Successfully registered {intent} command")
-                except Exception as e:
-                    self.logger.error(f"Failed to register {intent} command: {str(e)}")
-        except Exception as e:
-            self.logger.error(f"Error in _register_commands: {str(e)}")
+    def add_custom_app(self, name: str, target: str):
+        """Register a user-defined application alias"""
+        self.custom_apps[name] = target
+        self.app_resolver.add_aliases({name: target})
+
+    def _app_name_from_command(self, command: str) -> str:
+        """Text after "open"/"launch"/"start", or the whole command"""
+        match = re.search(r'\b(?:open|launch|start)\s+(?:the\s+|my\s+)?(.+)', command.lower())
+        return match.group(1) if match else command
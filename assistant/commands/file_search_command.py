@@ -0,0 +1,54 @@
+from . import Command
+import os
+import re
+
+# Kinds of item that make a request about the user's own files rather than the web
+FILE_WORDS = r"(?:files?|documents?|folders?|pdfs?|notes|spreadsheets?|presentations?|photos?|pictures?|downloads)"
+
+# A file search verb at the start, then either files as the object ("search my files for taxes"), the
+# user's own item ending in a kind of file ("find my physics notes pdf") or a place on the computer
+FILE_SEARCH_PATTERNS = [
+    re.compile(r"^(?:find|locate|search(?:\s+for)?)\s+(?:my\s+|all\s+)?(?:files?|documents?|folders?)\b"),
+    re.compile(rf"^(?:find|locate|search(?:\s+for)?|where\s+is|where's)\s+my\s+.*\b{FILE_WORDS}$"),
+    re.compile(r"^(?:find|locate|search(?:\s+for)?|where\s+is|where's)\s+.+\b(?:on|in)\s+my\s+"
+               r"(?:computer|pc|laptop|files|documents|downloads|desktop)$"),
+]
+
+
+class FileSearchCommand(Command):
+    def validate(self, command: str) -> bool:
+        command = command.lower().strip(' ?.!')
+        return any(pattern.search(command) for pattern in FILE_SEARCH_PATTERNS)
+
+    def execute(self, command: str) -> str:
+        try:
+            file_system = getattr(self.handler, 'file_system', None)
+            if file_system is None or not hasattr(file_system, 'search_files'):
+                return "File search isn't available right now."
+
+            query = self._extract_query(command)
+            if not query:
+                return "What file should I look for?"
+
+            file_type = 'directory' if re.search(r'\bfolders?\b', command.lower()) else None
+            results = file_system.search_files(query, limit=5, file_type=file_type)
+            self.update_context('last_file_results', [result['path'] for result in results])
+            if not results:
+                if file_system.file_index.is_scanning():
+                    return f"I couldn't find anything matching '{query}' yet. I'm still indexing your files."
+                return f"I couldn't find any files matching '{query}'."
+
+            lines = [f"- {result['name']} (in {os.path.basename(result['folder']) or result['folder']})"
+                     for result in results]
+            return f"Here's what I found for '{query}':\n" + '\n'.join(lines)
+        except Exception as e:
+            print(f"Error in file search command: {str(e)}")
+            return f"I encountered an error searching your files: {str(e)}"
+
+    def _extract_query(self, command: str) -> str:
+        # Examples: "find my physics notes pdf", "where is the budget spreadsheet", "search my files for taxes"
+        query = command.lower().strip(' ?.!')
+        query = re.sub(r"^.*?\b(find|locate|where is|where's|search)\b", '', query)
+        query = re.sub(r'\b(my|the|a|an|for|in|on|computer|please|called|named|files?|folders?|documents?)\b',
+                       ' ', query)
+        return ' '.join(query.split())
@@ -24,6 +24,7 @@ System Control:
 - "Search web for [query]" - Search the web for information
 - "Wikipedia [query]" - Search Wikipedia for information
 - "Weather in [location]" - Get weather information
+- "Read my screen" - Read the text in the focused window
 
 Media Control:
 - "Play [song/artist]" - Play music
@@ -74,6 +75,7 @@ System Control Commands:
 • "Wikipedia [query]" - Search Wikipedia for information
 • "Weather in [location]" - Get weather information for a location
 • "Take a screenshot" - Capture the current screen
+• "Read my screen" - Read the text in the focused window
 """)
         system_text.config(state=tk.DISABLED)
         
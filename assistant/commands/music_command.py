@@ -3,7 +3,8 @@ from typing import Optional
 
 class MediaCommand(Command):
     def validate(self, command: str) -> bool:
-        return any(word in command for word in ['play', 'pause', 'stop', 'next', 'previous', 'volume', 'media'])
+        return any(word in command for word in ['play', 'pause', 'stop', 'next', 'previous', 'volume', 'media',
+                                                'shuffle', 'repeat'])
 
     def execute(self, command: str) -> str:
         try:
@@ -14,7 +15,12 @@ class MediaCommand(Command):
                 return f"Switched to {mode} media control mode."
                 
             # Handle dynamic media commands
-            if 'play' in command:
+            if 'shuffle' in command:
+                enabled = self.handler.music_controller.set_shuffle(False if 'off' in command else None)
+                return f"Shuffle {'on' if enabled else 'off'}."
+            elif 'repeat' in command:
+                return self._handle_repeat(command)
+            elif 'play' in command:
                 if 'playlist' in command:
                     return self._handle_playlist(command)
                 return self._handle_play(command)
@@ -54,6 +60,16 @@ class MediaCommand(Command):
         except Exception as e:
             return f"Failed to play media: {str(e)}"
 
+    def _handle_repeat(self, command: str) -> str:
+        if 'off' in command:
+            mode = 'off'
+        elif any(word in command.split() for word in ['one', 'song', 'track', 'this']):
+            mode = 'one'
+        else:
+            mode = 'all'
+        self.handler.music_controller.set_repeat(mode)
+        return {'off': "Repeat off.", 'one': "Repeating this track.", 'all': "Repeating the playlist."}[mode]
+
     def _handle_playlist(self, command: str) -> str:
         try:
             playlist = command.replace('play playlist', '').strip()
@@ -0,0 +1,25 @@
+from . import Command
+import re
+
+
+class ScreenReadCommand(Command):
+    def validate(self, command: str) -> bool:
+        command = command.lower()
+        return bool(re.search(r"\b(read|what's on|whats on|what is on)\b.*\bscreen\b", command))
+
+    def execute(self, command: str) -> str:
+        try:
+            screen_analyzer = getattr(self.handler, 'screen_analyzer', None)
+            if screen_analyzer is None:
+                return "Screen reading isn't available right now."
+
+            # Accessibility text when the application exposes it, otherwise OCR of the changed regions
+            text = screen_analyzer.read_screen_text()
+            if not text:
+                return "I couldn't read any text on your screen."
+            if len(text) > 1000:
+                text = text[:1000].rstrip() + '...'
+            return f"Here's the text on your screen:\n{text}"
+        except Exception as e:
+            print(f"Error in screen read command: {str(e)}")
+            return f"I encountered an error reading your screen: {str(e)}"
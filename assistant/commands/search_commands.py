@@ -47,9 +47,39 @@ class GoogleSearchCommand(CommandBase):
         
         if not query:
             return "I'm not sure what you want to search for."
+        
+        # "search again" / "search X again" is answered from history and cached results
+        entry = self._find_repeat(query)
+        if entry is None:
+            return "You haven't searched for anything yet."
+        if entry:
+            query = entry['query']
+        
+        results = self.search_service.search_cached(query)
+        if results:
+            return self._format_results(query, results)
             
-        # Perform search
+        # Opens the browser; results are fetched and cached in the background for next time
         return self.search_service.search_google(query, open_browser=True)
+    
+    def _find_repeat(self, query):
+        """History entry a "... again" query refers to: False if it is not a repeat, None if there is no history"""
+        match = re.match(r"^(?:(.+?)\s+)?again$", query, re.IGNORECASE)
+        if not match:
+            return False
+        target = match.group(1)
+        if not target or target.lower() in ('that', 'it', 'the same', 'the same thing'):
+            return self.search_service.find_in_history()
+        # Queries like "born again" are searches in their own right unless X was searched before
+        if self.search_service.find_in_history(query):
+            return False
+        return self.search_service.find_in_history(target) or False
+    
+    def _format_results(self, query, results):
+        response = f"Recent results for {query}:\n\n"
+        for i, result in enumerate(results[:5], 1):
+            response += f"{i}. {result['title']}\n   {result['link']}\n"
+        return response
 
 
 class NewsCommand(CommandBase):
@@ -1,8 +1,11 @@
 from . import Command
-import requests
 import json
 import os
+import re
 from datetime import datetime
+from ..lazy_import import lazy_import
+
+requests = lazy_import('requests')
 
 class WeatherCommand(Command):
     def __init__(self, handler):
@@ -18,6 +21,9 @@ class WeatherCommand(Command):
         try:
             # Extract location from command
             location = self._extract_location(command)
+            weather_service = getattr(self.handler, 'weather_service', None)
+            if 'forecast' in command.lower() and weather_service:
+                return weather_service.get_daily_forecast(location or None)
             if not location:
                 location = "current location"  # Default to current location
                 
@@ -35,13 +41,10 @@ class WeatherCommand(Command):
     def _extract_location(self, command: str) -> str:
         # Extract location from command
         # Examples: "weather in New York", "what's the weather like in London"
-        command = command.lower()
-        if "in" in command:
-            location = command.split("in")[-1].strip()
-            return location
-        elif "for" in command:
-            location = command.split("for")[-1].strip()
-            return location
+        # Match whole words so "forecast" is not read as "for ecast"
+        match = re.search(r"\b(?:in|for)\s+(.+)$", command.lower())
+        if match:
+            return match.group(1).strip()
         return ""
         
     def _get_weather(self, location: str) -> dict:
@@ -49,8 +52,14 @@ class WeatherCommand(Command):
             return self._get_mock_weather(location)
             
         try:
+            # Go through the shared weather service so repeat questions are served from its cache
+            weather_service = getattr(self.handler, 'weather_service', None)
+            if weather_service:
+                city = None if location == "current location" else location
+                return weather_service.get_current_data(city)
+            
             url = f"http://api.openweathermap.org/data/2.5/weather?q={location}&appid={self.api_key}&units=metric"
-            response = requests.get(url)
+            response = requests.get(url, timeout=5)
             if response.status_code == 200:
                 return response.json()
             else:
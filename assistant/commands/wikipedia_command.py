@@ -1,8 +1,20 @@
 from . import Command
-import wikipedia
 import webbrowser
+from ..wikipedia_client import WikipediaClient
 
 class WikipediaCommand(Command):
+    _fallback_client = None
+    
+    def _get_client(self) -> WikipediaClient:
+        """Use the shared client from ExternalServices so its cache is reused"""
+        external_services = getattr(self.handler, 'external_services', None)
+        client = getattr(external_services, 'wikipedia_client', None)
+        if client is None:
+            if WikipediaCommand._fallback_client is None:
+                WikipediaCommand._fallback_client = WikipediaClient()
+            client = WikipediaCommand._fallback_client
+        return client
+    
     def validate(self, command: str) -> bool:
         return 'wikipedia' in command.lower()
         
@@ -13,35 +25,23 @@ class WikipediaCommand(Command):
             if not query:
                 return "I couldn't understand what you want to search for on Wikipedia."
                 
-            # Try to get a summary from Wikipedia
-            try:
-                # Set language to English
-                wikipedia.set_lang("en")
-                
-                # Search for the query
-                search_results = wikipedia.search(query)
-                if not search_results:
-                    return f"I couldn't find any Wikipedia articles about '{query}'."
-                    
-                # Get the first result
-                page_title = search_results[0]
-                
-                # Get a summary of the page
-                summary = wikipedia.summary(page_title, sentences=3)
-                
-                # Open the Wikipedia page in a browser
-                page = wikipedia.page(page_title)
-                webbrowser.open(page.url)
-                
-                return f"Here's what I found about '{page_title}' on Wikipedia:\n\n{summary}\n\nI've opened the full article in your browser."
-            except wikipedia.exceptions.DisambiguationError as e:
+            # Resolve title, summary and URL in a single (cached) request
+            result = self._get_client().lookup(query, sentences=3)
+            status = result.get('status')
+            
+            if status == 'disambiguation':
                 # Handle disambiguation pages
-                options = e.options[:5]  # Limit to first 5 options
-                options_str = ", ".join(options)
+                options_str = ", ".join(result['options'][:5])  # Limit to first 5 options
                 return f"There are multiple Wikipedia articles related to '{query}'. Did you mean one of these: {options_str}?"
-            except wikipedia.exceptions.PageError:
-                # Handle page not found
-                return f"I couldn't find a Wikipedia article about '{query}'."
+            if status == 'not_found':
+                return f"I couldn't find any Wikipedia articles about '{query}'."
+            if status != 'success':
+                return f"I encountered an error searching Wikipedia: {result.get('message', 'unknown error')}"
+            
+            # Open the Wikipedia page in a browser
+            webbrowser.open(result['url'])
+            
+            return f"Here's what I found about '{result['title']}' on Wikipedia:\n\n{result['summary']}\n\nI've opened the full article in your browser."
                 
         except Exception as e:
             print(f"Error in Wikipedia command: {str(e)}")
@@ -1,9 +1,10 @@
 from . import Command
 import webbrowser
 import urllib.parse
-import requests
-import re
-from bs4 import BeautifulSoup  # Make sure to use BeautifulSoup
+from ..html_extraction import extract_youtube_video_ids
+from ..lazy_import import lazy_import
+
+requests = lazy_import('requests')
 
 class YouTubeCommand(Command):
     def validate(self, command: str) -> bool:
@@ -52,23 +53,11 @@ class YouTubeCommand(Command):
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
-            response = requests.get(url, headers=headers)
+            response = requests.get(url, headers=headers, timeout=10)
             
-            # Parse the response with BeautifulSoup for more reliable extraction
+            # Pull video IDs from the embedded ytInitialData, falling back to HTML parsing
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # First try to extract using data attributes (more reliable)
-                video_elements = soup.find_all('a', {'href': re.compile(r'/watch\?v=')})
-                if video_elements:
-                    for element in video_elements:
-                        href = element.get('href', '')
-                        if '/watch?v=' in href and 'list=' not in href:  # Avoid playlists
-                            video_id = href.split('/watch?v=')[1]
-                            return f"https://www.youtube.com/watch?v={video_id}"
-                
-                # Fallback to regex if BeautifulSoup approach fails
-                video_ids = re.findall(r"watch\?v=(\S{11})", response.text)
+                video_ids = extract_youtube_video_ids(response.text)
                 if video_ids:
                     return f"https://www.youtube.com/watch?v={video_ids[0]}"
             
@@ -0,0 +1,302 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .duplicate_finder import file_digest
+
+CHUNK_BYTES = 8 * 1024 * 1024
+PART_SUFFIX = '.part'
+
+
+class CopyCancelled(Exception):
+    pass
+
+
+class CopyJob:
+    """State of one copy or move, shared between the engine and its workers"""
+
+    def __init__(self, source: str, destination: str, move: bool, verify: bool):
+        self.id = uuid.uuid4().hex[:8]
+        self.source = source
+        self.destination = destination
+        self.move = move
+        self.verify = verify
+        self.status = 'pending'
+        self.error = None
+        self.total_bytes = 0
+        self.copied_bytes = 0
+        self.files_total = 0
+        self.files_done = 0
+        self.skipped: List[str] = []  # Symlinks that could not be recreated
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+        self.last_progress = 0.0
+        self.thread = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = (self.finished_at or time.time()) - self.started_at if self.started_at else 0
+        return {
+            'job_id': self.id, 'source': self.source, 'destination': self.destination,
+            'operation': 'move' if self.move else 'copy', 'status': self.status, 'error': self.error,
+            'copied_bytes': self.copied_bytes, 'total_bytes': self.total_bytes,
+            'files_done': self.files_done, 'files_total': self.files_total, 'skipped': list(self.skipped),
+            'percent': round(100 * self.copied_bytes / self.total_bytes, 1) if self.total_bytes else 100.0,
+            'bytes_per_second': int(self.copied_bytes / elapsed) if elapsed > 0 else 0
+        }
+
+
+class CopyEngine:
+    """Copies and moves files and folders on background threads.
+
+    Each file is written to "<name>.part" through os.copy_file_range or
+    os.sendfile where the platform has them (the kernel copies without a
+    round trip through Python), falling back to buffered reads, and renamed
+    into place once complete. Files of a folder are spread over a worker
+    pool so many small files do not serialize on latency. Progress is
+    emitted as 'copy_progress' events at most every progress_interval
+    seconds, and 'copy_complete' when a job ends. A cancelled or failed
+    job can be resumed: finished files are skipped and .part files are
+    continued from where they stopped. With verify, each copy is compared
+    to its source by BLAKE2 hash. Symlinks inside a folder are recreated
+    as symlinks; any that cannot be are listed as skipped in the job.
+    """
+
+    def __init__(self, events=None, max_workers: int = 4, progress_interval: float = 0.25):
+        self.events = events
+        self.max_workers = max_workers
+        self.progress_interval = progress_interval
+        self.jobs: Dict[str, CopyJob] = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='copy')
+
+    # Jobs
+
+    def start(self, source: str, destination: str, move: bool = False, verify: bool = False) -> str:
+        """Start copying (or moving) source to destination; returns the job id"""
+        job = CopyJob(os.path.abspath(source), os.path.abspath(destination), move, verify)
+        self.jobs[job.id] = job
+        self._launch(job)
+        return job.id
+
+    def resume(self, job_id: str) -> bool:
+        """Restart a cancelled or failed job, keeping what was already copied"""
+        job = self.jobs.get(job_id)
+        if not job or job.status not in ('cancelled', 'failed'):
+            return False
+        job.cancel_event.clear()
+        job.error = None
+        self._launch(job)
+        return True
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if not job or job.status not in ('pending', 'running'):
+            return False
+        job.cancel_event.set()
+        return True
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        job = self.jobs[job_id]
+        job.thread.join(timeout)
+        return job.to_dict()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        return [job.to_dict() for job in self.jobs.values()]
+
+    def _launch(self, job: CopyJob):
+        job.status = 'running'
+        job.thread = threading.Thread(target=self._run, args=(job,), daemon=True)
+        job.thread.start()
+
+    def _run(self, job: CopyJob):
+        job.started_at = time.time()
+        job.finished_at = None
+        try:
+            if job.move and self._try_rename(job):
+                job.status = 'completed'
+                return
+
+            job.skipped = []
+            plan = self._plan(job)
+            job.files_total = len(plan)
+            job.total_bytes = sum(size for _, _, size in plan)
+            job.files_done = 0
+            job.copied_bytes = 0
+
+            futures = [self.executor.submit(self._copy_file, job, src, dst) for src, dst, _ in plan]
+            errors = []
+            for future in futures:
+                try:
+                    future.result()
+                except CopyCancelled:
+                    pass
+                except Exception as e:
+                    errors.append(str(e))
+                    job.cancel_event.set()  # Stop the rest; the job can be resumed
+
+            if errors:
+                job.status, job.error = 'failed', errors[0]
+            elif job.cancel_event.is_set():
+                job.status = 'cancelled'
+            else:
+                if os.path.isdir(job.source):
+                    shutil.copystat(job.source, job.destination)
+                if job.move:
+                    self._remove_source(job.source)
+                job.status = 'completed'
+        except Exception as e:
+            logging.error(f"Copy job {job.id} failed: {str(e)}")
+            job.status, job.error = 'failed', str(e)
+        finally:
+            job.finished_at = time.time()
+            self._emit('copy_progress', job, force=True)
+            self._emit('copy_complete', job, force=True)
+
+    def _try_rename(self, job: CopyJob) -> bool:
+        """Moves within one filesystem are a rename"""
+        try:
+            if os.stat(job.source).st_dev != os.stat(os.path.dirname(job.destination)).st_dev:
+                return False
+            os.rename(job.source, job.destination)
+            return True
+        except OSError:
+            return False
+
+    def _plan(self, job: CopyJob) -> List[Tuple[str, str, int]]:
+        """(source, destination, size) for every file, creating destination folders and symlinks on the way"""
+        if not os.path.isdir(job.source):
+            return [(job.source, job.destination, os.stat(job.source).st_size)]
+
+        plan = []
+        for root, dirs, files in os.walk(job.source):
+            target_root = os.path.join(job.destination, os.path.relpath(root, job.source))
+            os.makedirs(target_root, exist_ok=True)
+            # os.walk lists symlinked folders without entering them
+            for name in dirs:
+                if os.path.islink(os.path.join(root, name)):
+                    self._copy_link(job, os.path.join(root, name), os.path.join(target_root, name))
+            for name in files:
+                src = os.path.join(root, name)
+                if os.path.islink(src):
+                    self._copy_link(job, src, os.path.join(target_root, name))
+                    continue
+                try:
+                    plan.append((src, os.path.join(target_root, name), os.stat(src).st_size))
+                except OSError as e:
+                    logging.warning(f"Skipping {src}: {str(e)}")
+        # Large files first, so a single big file does not finish alone at the end
+        plan.sort(key=lambda item: item[2], reverse=True)
+        return plan
+
+    def _copy_link(self, job: CopyJob, src: str, dst: str):
+        """Recreate a symlink with the same target, as shutil.copytree(symlinks=True) does"""
+        try:
+            if not os.path.lexists(dst):  # Left by an earlier run
+                os.symlink(os.readlink(src), dst, target_is_directory=os.path.isdir(src))
+        except OSError as e:
+            # e.g. Windows without the symlink privilege
+            logging.warning(f"Skipping symlink {src}: {str(e)}")
+            job.skipped.append(src)
+
+    def _remove_source(self, source: str):
+        if os.path.isdir(source):
+            shutil.rmtree(source)
+        else:
+            os.remove(source)
+
+    # Copying
+
+    def _copy_file(self, job: CopyJob, src: str, dst: str):
+        if job.cancel_event.is_set():
+            raise CopyCancelled()
+        src_stat = os.stat(src)
+        try:
+            dst_stat = os.stat(dst)
+            if dst_stat.st_size == src_stat.st_size and int(dst_stat.st_mtime) == int(src_stat.st_mtime):
+                self._advance(job, src_stat.st_size, file_done=True)  # Done by an earlier run
+                return
+        except OSError:
+            pass
+
+        part = dst + PART_SUFFIX
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        if offset > src_stat.st_size:
+            offset = 0
+        self._advance(job, offset)
+
+        src_fd = os.open(src, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            dst_fd = os.open(part, os.O_WRONLY | os.O_CREAT | getattr(os, 'O_BINARY', 0))
+            try:
+                os.ftruncate(dst_fd, offset)
+                self._copy_range(job, src_fd, dst_fd, offset, src_stat.st_size)
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+
+        shutil.copystat(src, part)
+        if job.verify and file_digest(src) != file_digest(part):
+            os.remove(part)
+            raise IOError(f"Checksum mismatch copying {src}")
+        os.replace(part, dst)
+        self._advance(job, 0, file_done=True)
+
+    def _copy_range(self, job: CopyJob, src_fd: int, dst_fd: int, offset: int, size: int):
+        """Copy bytes [offset, size) in chunks, checking for cancellation between them"""
+        copy_file_range = getattr(os, 'copy_file_range', None)
+        sendfile = getattr(os, 'sendfile', None) if os.name == 'posix' else None
+        while offset < size:
+            if job.cancel_event.is_set():
+                raise CopyCancelled()
+            count = min(CHUNK_BYTES, size - offset)
+            copied = 0
+            if copy_file_range:
+                try:
+                    copied = copy_file_range(src_fd, dst_fd, count, offset, offset)
+                except OSError:
+                    copy_file_range = None  # e.g. across filesystems on older kernels
+            if not copied and sendfile:
+                try:
+                    os.lseek(dst_fd, offset, os.SEEK_SET)
+                    copied = sendfile(dst_fd, src_fd, offset, count)
+                except OSError:
+                    sendfile = None  # Platforms where the target must be a socket
+            if not copied:
+                os.lseek(src_fd, offset, os.SEEK_SET)
+                os.lseek(dst_fd, offset, os.SEEK_SET)
+                data = os.read(src_fd, count)
+                copied = os.write(dst_fd, data) if data else 0
+            if not copied:
+                raise IOError("Source file shrank while copying")
+            offset += copied
+            self._advance(job, copied)
+
+    def _advance(self, job: CopyJob, copied: int, file_done: bool = False):
+        with job.lock:
+            job.copied_bytes += copied
+            if file_done:
+                job.files_done += 1
+        self._emit('copy_progress', job)
+
+    def _emit(self, event_type: str, job: CopyJob, force: bool = False):
+        if not self.events:
+            return
+        now = time.time()
+        if not force and now - job.last_progress < self.progress_interval:
+            return
+        job.last_progress = now
+        try:
+            self.events.emit(event_type, job.to_dict())
+        except Exception as e:
+            logging.error(f"Error emitting {event_type}: {str(e)}")
@@ -1,16 +1,15 @@
-from .search_service import SearchService
-from .news_service import NewsService
-from .feature_toggle import FeatureToggleManager
-from .web_browser import BrowserFrame   
 from typing import Dict, Any, Optional, Type
 from functools import lru_cache
 import logging
+import threading
 
 class DependencyContainer:
     def __init__(self):
         self._services: Dict[str, Any] = {}
         self._factories: Dict[str, callable] = {}
         self._logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._creation_locks: Dict[str, threading.RLock] = {}
         
     def register_service(self, name: str, service: Any):
         """Register a service instance with the container"""
@@ -18,7 +17,7 @@ class DependencyContainer:
         self._logger.debug(f"Registered service: {name}")
         
     def register_factory(self, name: str, factory: callable):
-        """Register a factory function that creates a service"""
+        """Register a factory function that creates the service the first time it is requested"""
         self._factories[name] = factory
         self._logger.debug(f"Registered factory: {name}")
         
@@ -28,14 +27,21 @@ class DependencyContainer:
         if name in self._services:
             return self._services[name]
         if name in self._factories:
-            try:
-                service = self._factories[name]()
-                self._services[name] = service
-                self._logger.debug(f"Created service from factory: {name}")
-                return service
-            except Exception as e:
-                self._logger.error(f"Error creating service {name}: {str(e)}")
-                raise
+            # One lock per service, so a slow factory (or one waiting on a
+            # startup task) only blocks lookups of that same service
+            with self._lock:
+                creation_lock = self._creation_locks.setdefault(name, threading.RLock())
+            with creation_lock:
+                if name in self._services:  # Created by another thread meanwhile
+                    return self._services[name]
+                try:
+                    service = self._factories[name]()
+                    self._services[name] = service
+                    self._logger.debug(f"Created service from factory: {name}")
+                    return service
+                except Exception as e:
+                    self._logger.error(f"Error creating service {name}: {str(e)}")
+                    raise
         raise KeyError(f"Service {name} not found")
         
     def has_service(self, name: str) -> bool:
@@ -0,0 +1,240 @@
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+import time
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .cache import CACHE_DIR
+
+PARTIAL_BYTES = 64 * 1024  # Hashed from each end of a file for the partial hash
+CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    """BLAKE2 hash of a whole file, read through mmap in CHUNK_BYTES pieces"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, len(mapped), CHUNK_BYTES):
+                    digest.update(view[offset:offset + CHUNK_BYTES])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+class DuplicateFinder:
+    """Finds files with identical contents in stages that each read more of fewer files.
+
+    Files are grouped by size, then by a BLAKE2 hash of their first and
+    last 64 KiB, and only files still sharing a partial hash are hashed in
+    full (over mmap'd chunks). Hashing runs in a thread pool, since it is
+    mostly I/O and hashlib releases the GIL on large buffers. Hashes are
+    kept in SQLite keyed by (device, inode, mtime, size), so repeat scans
+    only read files that changed. A file's older rows are dropped when it
+    is hashed again, and rows no scan has seen for max_age_days are pruned.
+    """
+
+    def __init__(self, db_path=None, max_workers: int = 4, max_age_days: float = 90):
+        self.db_path = str(db_path or CACHE_DIR / 'file_hashes.db')
+        self.max_workers = max_workers
+        self.max_age = max_age_days * 24 * 3600
+        self.lock = threading.Lock()
+        self.stats = {'hashed_partial': 0, 'hashed_full': 0, 'cache_hits': 0}
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._initialize_database()
+
+    @contextmanager
+    def _get_cursor(self):
+        """Context manager for database connections"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        try:
+            yield cursor
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"File hash cache error: {str(e)}")
+            raise
+        finally:
+            conn.close()
+
+    def _initialize_database(self):
+        with self._get_cursor() as c:
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute('''CREATE TABLE IF NOT EXISTS hashes
+                        (dev INTEGER NOT NULL,
+                        inode INTEGER NOT NULL,
+                        mtime_ns INTEGER NOT NULL,
+                        size INTEGER NOT NULL,
+                        partial TEXT,
+                        full TEXT,
+                        last_seen REAL NOT NULL DEFAULT 0,
+                        PRIMARY KEY (dev, inode, mtime_ns, size))''')
+            c.execute("PRAGMA table_info(hashes)")
+            if 'last_seen' not in [row[1] for row in c.fetchall()]:
+                # Caches from before pruning: count existing rows as seen now
+                c.execute("ALTER TABLE hashes ADD COLUMN last_seen REAL NOT NULL DEFAULT 0")
+                c.execute("UPDATE hashes SET last_seen = ?", (time.time(),))
+            c.execute("CREATE INDEX IF NOT EXISTS idx_hashes_last_seen ON hashes(last_seen)")
+
+    # Hashing
+
+    def partial_hash(self, path: str, size: int) -> str:
+        """Hash of the first and last PARTIAL_BYTES; the full hash for files no larger than that"""
+        digest = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            digest.update(f.read(PARTIAL_BYTES))
+            if size > 2 * PARTIAL_BYTES:
+                f.seek(-PARTIAL_BYTES, os.SEEK_END)
+                digest.update(f.read(PARTIAL_BYTES))
+            elif size > PARTIAL_BYTES:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    def full_hash(self, path: str) -> str:
+        return file_digest(path)
+
+    # Cache
+
+    def _load_cached(self, keys: List[Tuple[int, int, int, int]]) -> Dict[tuple, Tuple[Optional[str], Optional[str]]]:
+        cached = {}
+        with self._get_cursor() as c:
+            for start in range(0, len(keys), 200):
+                batch = keys[start:start + 200]
+                where = ' OR '.join('(dev = ? AND inode = ? AND mtime_ns = ? AND size = ?)' for _ in batch)
+                c.execute(f"SELECT dev, inode, mtime_ns, size, partial, full FROM hashes WHERE {where}",
+                          [value for key in batch for value in key])
+                for dev, inode, mtime_ns, size, partial, full in c.fetchall():
+                    cached[(dev, inode, mtime_ns, size)] = (partial, full)
+        return cached
+
+    def _store(self, rows: List[tuple]):
+        """Save (dev, inode, mtime_ns, size, partial, full) rows as seen now, replacing older versions of each file"""
+        if not rows:
+            return
+        now = time.time()
+        with self._get_cursor() as c:
+            c.executemany('''INSERT INTO hashes (dev, inode, mtime_ns, size, partial, full, last_seen)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)
+                            ON CONFLICT(dev, inode, mtime_ns, size) DO UPDATE SET
+                            partial=COALESCE(excluded.partial, partial), full=COALESCE(excluded.full, full),
+                            last_seen=excluded.last_seen''',
+                          [(*row, now) for row in rows])
+            # A file that changed leaves a row under its old mtime or size that can never match again
+            c.executemany('''DELETE FROM hashes WHERE dev = ? AND inode = ? AND (mtime_ns != ? OR size != ?)''',
+                          [row[:4] for row in rows])
+            # Files deleted, or outside every folder scanned lately
+            c.execute("DELETE FROM hashes WHERE last_seen < ?", (now - self.max_age,))
+
+    # Grouping
+
+    def _file_key(self, path: str, st: os.stat_result) -> Optional[Tuple[int, int, int, int]]:
+        """(device, inode, mtime, size) cache key for a file.
+
+        os.DirEntry.stat() leaves device and inode at 0 on Windows, so the
+        file is stat'ed again to get them. Where the filesystem has no file
+        ids at all, the inode is replaced by a negative hash of the path,
+        which keeps cache keys apart but cannot detect hard links.
+        """
+        if not st.st_ino:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+        if st.st_ino:
+            return st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size
+        path_id = int.from_bytes(hashlib.blake2b(os.path.normcase(os.path.abspath(path)).encode(),
+                                                 digest_size=7).digest(), 'big')
+        return st.st_dev, -1 - path_id, st.st_mtime_ns, st.st_size
+
+    def _fill_hashes(self, executor, files: List[Tuple[str, tuple]], cache: Dict[tuple, list], field: int):
+        """Compute missing partial (field 0) or full (field 1) hashes for files in parallel"""
+        missing = [(path, key) for path, key in files if cache[key][field] is None]
+        with self.lock:
+            self.stats['cache_hits'] += len(files) - len(missing)
+            self.stats['hashed_full' if field else 'hashed_partial'] += len(missing)
+        if field == 0:
+            futures = [executor.submit(self.partial_hash, path, key[3]) for path, key in missing]
+        else:
+            futures = [executor.submit(self.full_hash, path) for path, _ in missing]
+        for future, (path, key) in zip(futures, missing):
+            try:
+                cache[key][field] = future.result()
+            except OSError as e:
+                logging.debug(f"Could not hash {path}: {str(e)}")
+
+    def _group_by(self, files: List[Tuple[str, tuple]], cache: Dict[tuple, list], field: int) -> List[list]:
+        """Groups of two or more files sharing size and hash"""
+        groups = defaultdict(list)
+        for path, key in files:
+            if cache[key][field] is not None:
+                groups[(key[3], cache[key][field])].append((path, key))
+        return [group for group in groups.values() if len(group) > 1]
+
+    def find(self, files: Iterable[Tuple[str, os.stat_result]], min_size: int = 1) -> List[Dict[str, object]]:
+        """Groups of identical files from (path, stat) pairs, largest wasted space first"""
+        by_size = defaultdict(list)
+        for path, st in files:
+            if st.st_size >= min_size:
+                by_size[st.st_size].append((path, st))
+
+        candidates = []
+        seen_inodes = set()
+        for group in by_size.values():
+            if len(group) < 2:
+                continue
+            keyed = []
+            for path, st in group:
+                key = self._file_key(path, st)
+                if key is None:
+                    continue
+                if key[1] >= 0:
+                    if key[:2] in seen_inodes:
+                        continue  # Hard links to one file are not duplicates
+                    seen_inodes.add(key[:2])
+                keyed.append((path, key))
+            if len(keyed) > 1:
+                candidates.extend(keyed)
+        if not candidates:
+            return []
+
+        cached = self._load_cached([key for _, key in candidates])
+        cache = {key: list(cached.get(key, (None, None))) for _, key in candidates}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='hash') as executor:
+            self._fill_hashes(executor, candidates, cache, 0)
+            needs_full = []
+            for group in self._group_by(candidates, cache, 0):
+                for path, key in group:
+                    if key[3] <= PARTIAL_BYTES * 2:
+                        cache[key][1] = cache[key][0]  # The partial hash already covered the whole file
+                    else:
+                        needs_full.append((path, key))
+            self._fill_hashes(executor, needs_full, cache, 1)
+
+        duplicates = []
+        for group in self._group_by([item for item in candidates if cache[item[1]][1] is not None], cache, 1):
+            size = group[0][1][3]
+            duplicates.append({'hash': cache[group[0][1]][1], 'size': size,
+                               'paths': sorted(path for path, _ in group), 'wasted': size * (len(group) - 1)})
+
+        # Every candidate is written, unchanged ones too, to mark it as seen
+        self._store([(*key, partial, full) for key, (partial, full) in cache.items()])
+        duplicates.sort(key=lambda group: group['wasted'], reverse=True)
+        return duplicates
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._get_cursor() as c:
+            c.execute("SELECT COUNT(*) FROM hashes")
+            cached = c.fetchone()[0]
+        return {'cached_hashes': cached, **self.stats}
@@ -1,9 +1,11 @@
 import os
-import wolframalpha
-import wikipedia
-import cv2
 import pyjokes
 from typing import Optional, Dict, Any
+from .lazy_import import lazy_import
+from .wikipedia_client import WikipediaClient
+
+wolframalpha = lazy_import('wolframalpha')
+cv2 = lazy_import('cv2')
 
 class ExternalServices:
     def __init__(self, config: Dict[str, Any]):
@@ -17,7 +19,7 @@ class ExternalServices:
         self.wolfram_client = wolframalpha.Client(wolfram_app_id) if wolfram_app_id else None
         
         # Configure Wikipedia
-        wikipedia.set_lang('en')
+        self.wikipedia_client = WikipediaClient(language='en')
         
         # Initialize camera for image capture
         self.camera = None
@@ -81,20 +83,20 @@ class ExternalServices:
 
     def wikipedia_search(self, query: str) -> dict:
         """Search Wikipedia and return article summary and URL"""
-        try:
-            # Search Wikipedia
-            page = wikipedia.page(query)
+        # Search Wikipedia (one request, served from cache for known topics)
+        result = self.wikipedia_client.lookup(query, sentences=3)
+        status = result.get('status')
+        if status == 'success':
             return {
-                'summary': wikipedia.summary(query, sentences=3),
-                'url': page.url
+                'summary': result['summary'],
+                'url': result['url']
             }
-        except wikipedia.exceptions.DisambiguationError as e:
-            options = ', '.join(e.options[:5])
+        if status == 'disambiguation':
+            options = ', '.join(result['options'][:5])
             raise Exception(f"Multiple matches found. Please be more specific. Options: {options}")
-        except wikipedia.exceptions.PageError:
+        if status == 'not_found':
             raise Exception(f"No Wikipedia page found for '{query}'")
-        except Exception as e:
-            raise Exception(f"Error searching Wikipedia: {str(e)}")
+        raise Exception(f"Error searching Wikipedia: {result.get('message', 'unknown error')}")
 
 
     def capture_image(self, save_path: Optional[str] = None) -> str:
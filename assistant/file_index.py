@@ -0,0 +1,319 @@
+import os
+import re
+import sqlite3
+import stat
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .cache import CACHE_DIR
+from .fuzzy_matcher import normalize
+
+# Folders that hold tooling rather than anything a user would ask for by name
+SKIPPED_FOLDERS = {'node_modules', '__pycache__', '$RECYCLE.BIN', 'System Volume Information'}
+
+# Bump when the files table or its FTS columns change; older databases are rebuilt by the next scan
+INDEX_SCHEMA_VERSION = 2
+
+
+class FileIndex:
+    """Persistent index of file and folder names under a set of root folders.
+
+    Entries live in SQLite with an FTS5 table over the name (split into
+    words, so "PhysicsNotes_2024.pdf" matches "physics notes"), the parent
+    folders from the indexed root down (so "home" or the user name does
+    not match everything) and the extension. Scans only write rows whose mtime or size
+    changed and drop paths that disappeared; apply_changes() takes batches
+    from a FileWatcher between scans. If SQLite was built without FTS5,
+    searches fall back to LIKE.
+    """
+
+    def __init__(self, db_path=None, batch_size: int = 1000):
+        self.db_path = str(db_path or CACHE_DIR / 'file_index.db')
+        self.batch_size = batch_size
+        self.fts_enabled = False
+        self.scan_lock = threading.Lock()
+        self.scan_thread = None
+        self.last_scan = {}
+        self.roots = set()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._initialize_database()
+
+    @contextmanager
+    def _get_cursor(self):
+        """Context manager for database connections"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        try:
+            yield cursor
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"File index error: {str(e)}")
+            raise
+        finally:
+            conn.close()
+
+    def _initialize_database(self):
+        with self._get_cursor() as c:
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA user_version")
+            if c.fetchone()[0] < INDEX_SCHEMA_VERSION:
+                for trigger in ('files_ai', 'files_ad', 'files_au'):
+                    c.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+                c.execute("DROP TABLE IF EXISTS files_fts")
+                c.execute("DROP TABLE IF EXISTS files")
+                c.execute(f"PRAGMA user_version = {INDEX_SCHEMA_VERSION}")
+            c.execute('''CREATE TABLE IF NOT EXISTS files
+                        (id INTEGER PRIMARY KEY,
+                        path TEXT UNIQUE NOT NULL,
+                        folder TEXT NOT NULL,
+                        name TEXT NOT NULL,
+                        words TEXT NOT NULL,
+                        folder_words TEXT NOT NULL,
+                        ext TEXT,
+                        type TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        mtime REAL NOT NULL)''')
+            c.execute("CREATE INDEX IF NOT EXISTS idx_files_folder ON files(folder)")
+
+            try:
+                c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+                            words, folder_words, ext,
+                            content='files', content_rowid='id',
+                            tokenize='unicode61 remove_diacritics 2', prefix='2 3')''')
+                # Keep the external-content FTS table in step with files
+                c.execute('''CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+                            INSERT INTO files_fts(rowid, words, folder_words, ext)
+                            VALUES (new.id, new.words, new.folder_words, new.ext);
+                            END''')
+                c.execute('''CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+                            INSERT INTO files_fts(files_fts, rowid, words, folder_words, ext)
+                            VALUES ('delete', old.id, old.words, old.folder_words, old.ext);
+                            END''')
+                c.execute('''CREATE TRIGGER IF NOT EXISTS files_au AFTER UPDATE ON files BEGIN
+                            INSERT INTO files_fts(files_fts, rowid, words, folder_words, ext)
+                            VALUES ('delete', old.id, old.words, old.folder_words, old.ext);
+                            INSERT INTO files_fts(rowid, words, folder_words, ext)
+                            VALUES (new.id, new.words, new.folder_words, new.ext);
+                            END''')
+                self.fts_enabled = True
+            except sqlite3.OperationalError as e:
+                logging.warning(f"FTS5 unavailable, file search will use LIKE: {str(e)}")
+
+    # Scanning
+
+    def _is_skipped_name(self, name: str) -> bool:
+        return name.startswith('.') or name in SKIPPED_FOLDERS
+
+    def _root_for(self, path: str) -> Optional[str]:
+        """The innermost indexed root containing path"""
+        roots = [root for root in self.roots if path == root or path.startswith(root.rstrip(os.sep) + os.sep)]
+        return max(roots, key=len) if roots else None
+
+    def _is_skipped(self, path: str) -> bool:
+        """Whether a path lies in, or is, a folder _walk() skips, judged below its indexed root"""
+        root = self._root_for(path)
+        relative = os.path.relpath(path, root) if root else os.path.splitdrive(path)[1]
+        return any(self._is_skipped_name(part) for part in relative.split(os.sep) if part and part != '.')
+
+    def _walk(self, root: str) -> Iterable[Tuple[str, os.stat_result]]:
+        """(path, stat) for every file and folder under root, skipping hidden and tooling folders"""
+        stack = [root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if self._is_skipped_name(entry.name):
+                            continue
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        if stat.S_ISDIR(st.st_mode):
+                            stack.append(entry.path)
+                        elif not stat.S_ISREG(st.st_mode):
+                            continue
+                        yield entry.path, st
+            except OSError as e:
+                logging.debug(f"Skipping unreadable folder: {str(e)}")
+
+    def _file_row(self, path: str, st: os.stat_result) -> tuple:
+        name = os.path.basename(path)
+        is_dir = stat.S_ISDIR(st.st_mode)
+        ext = None if is_dir else os.path.splitext(name)[1].lstrip('.').lower() or None
+        folder = os.path.dirname(path)
+        # Folder names from the root itself down: "Documents/Physics", not "/home/alex/Documents/Physics"
+        root = self._root_for(path)
+        relative = os.path.relpath(folder, os.path.dirname(root)) if root and path != root else os.path.basename(folder)
+        folder_words = ' '.join(normalize(part) for part in relative.split(os.sep) if part and part != '.')
+        return (path, folder, name, normalize(name) or name.lower(), folder_words, ext,
+                'directory' if is_dir else 'file', 0 if is_dir else st.st_size, st.st_mtime)
+
+    def _upsert(self, cursor, rows: List[tuple]):
+        cursor.executemany('''INSERT INTO files (path, folder, name, words, folder_words, ext, type, size, mtime)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            ON CONFLICT(path) DO UPDATE SET
+                            folder_words=excluded.folder_words, type=excluded.type, size=excluded.size,
+                            mtime=excluded.mtime''', rows)
+
+    def scan(self, root: str) -> Dict[str, int]:
+        """Bring the index for root up to date, writing only new or changed entries"""
+        root = os.path.abspath(root)
+        self.roots.add(root)
+        return self._scan_folder(root)
+
+    def _scan_folder(self, root: str) -> Dict[str, int]:
+        with self.scan_lock:
+            with self._get_cursor() as c:
+                c.execute("SELECT path, mtime, size FROM files WHERE path LIKE ? ESCAPE '\\'",
+                          (self._like_prefix(root),))
+                known = {path: (mtime, size) for path, mtime, size in c.fetchall()}
+
+            seen = set()
+            pending = []
+            stats = {'scanned': 0, 'updated': 0, 'removed': 0}
+            for path, st in self._walk(root):
+                stats['scanned'] += 1
+                seen.add(path)
+                size = 0 if stat.S_ISDIR(st.st_mode) else st.st_size
+                if known.get(path) == (st.st_mtime, size):
+                    continue
+                pending.append(self._file_row(path, st))
+                if len(pending) >= self.batch_size:
+                    with self._get_cursor() as c:
+                        self._upsert(c, pending)
+                    stats['updated'] += len(pending)
+                    pending = []
+
+            removed = [(path,) for path in known if path not in seen]
+            with self._get_cursor() as c:
+                if pending:
+                    self._upsert(c, pending)
+                if removed:
+                    c.executemany("DELETE FROM files WHERE path = ?", removed)
+            stats['updated'] += len(pending)
+            stats['removed'] = len(removed)
+            self.last_scan[root] = stats
+            return stats
+
+    def start_scan(self, roots: List[str], callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                   before_scan: Optional[Callable[[], None]] = None) -> bool:
+        """Scan roots one after another in a background thread; returns False if a scan is already running.
+
+        before_scan runs first on the same thread, e.g. to start watching the roots.
+        """
+        if self.is_scanning():
+            return False
+
+        def run():
+            if before_scan:
+                try:
+                    before_scan()
+                except Exception as e:
+                    logging.error(f"File index preparation failed: {str(e)}")
+            results = {}
+            for root in roots:
+                try:
+                    results[root] = self.scan(root)
+                    logging.info(f"File index scan of {root}: {results[root]}")
+                except Exception as e:
+                    logging.error(f"File index scan of {root} failed: {str(e)}")
+            if callback:
+                callback(results)
+
+        self.scan_thread = threading.Thread(target=run, daemon=True)
+        self.scan_thread.start()
+        return True
+
+    def is_scanning(self) -> bool:
+        return bool(self.scan_thread and self.scan_thread.is_alive())
+
+    def apply_changes(self, changes: Dict[str, str]) -> Dict[str, int]:
+        """Apply a batch of {path: 'created' | 'modified' | 'deleted'} changes in one transaction.
+
+        Folders that appeared (e.g. moved in whole) are scanned. Paths in
+        hidden or tooling folders are ignored, as they are by scan().
+        """
+        rows, removed, folders = [], [], []
+        for path, kind in changes.items():
+            path = os.path.abspath(path)
+            if self._is_skipped(path):
+                continue
+            if kind == 'deleted':
+                removed.append(path)
+                continue
+            try:
+                st = os.stat(path, follow_symlinks=False)
+            except OSError:
+                removed.append(path)
+                continue
+            rows.append(self._file_row(path, st))
+            if stat.S_ISDIR(st.st_mode) and kind == 'created':
+                folders.append(path)
+
+        with self.scan_lock:
+            with self._get_cursor() as c:
+                for path in removed:
+                    c.execute("DELETE FROM files WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+                              (path, self._like_prefix(path)))
+                if rows:
+                    self._upsert(c, rows)
+        stats = {'updated': len(rows), 'removed': len(removed)}
+        for folder in folders:
+            stats['updated'] += self._scan_folder(folder)['updated']
+        return stats
+
+    # Lookups
+
+    def _like_prefix(self, folder: str) -> str:
+        escaped = folder.rstrip(os.sep).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return escaped + ('\\\\' if os.sep == '\\' else os.sep) + '%'
+
+    def _fts_query(self, words: List[str], operator: str = ' ') -> str:
+        """FTS5 query that prefix-matches the words; all of them by default"""
+        return operator.join(f'"{word}"*' for word in words)
+
+    def _rows_to_files(self, rows) -> List[Dict[str, Any]]:
+        fields = ('path', 'name', 'folder', 'type', 'size', 'modified')
+        return [dict(zip(fields, row)) for row in rows]
+
+    def search(self, text: str, limit: int = 20, file_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Files and folders whose name, folder or extension match text, best matches first.
+
+        Entries matching every word rank first; if none do, entries matching
+        any word are returned. file_type restricts results to 'file' or 'directory'.
+        """
+        words = re.findall(r'[^\W_]+', text.lower())
+        if not words:
+            return []
+        type_filter = "AND f.type = ?" if file_type else ""
+        type_args = (file_type,) if file_type else ()
+
+        with self._get_cursor() as c:
+            if not self.fts_enabled:
+                where = ' AND '.join("(f.words LIKE ? OR f.ext = ?)" for _ in words)
+                args = [arg for word in words for arg in (f"%{word}%", word)]
+                c.execute(f'''SELECT f.path, f.name, f.folder, f.type, f.size, f.mtime FROM files f
+                            WHERE {where} {type_filter} ORDER BY f.mtime DESC LIMIT ?''',
+                          (*args, *type_args, limit))
+                return self._rows_to_files(c.fetchall())
+
+            for operator in (' ', ' OR '):
+                c.execute(f'''SELECT f.path, f.name, f.folder, f.type, f.size, f.mtime
+                            FROM files_fts JOIN files f ON f.id = files_fts.rowid
+                            WHERE files_fts MATCH ? {type_filter}
+                            ORDER BY bm25(files_fts, 10.0, 2.0, 5.0), f.mtime DESC LIMIT ?''',
+                          (self._fts_query(words, operator), *type_args, limit))
+                rows = c.fetchall()
+                if rows or len(words) == 1:
+                    return self._rows_to_files(rows)
+            return []
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._get_cursor() as c:
+            c.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files WHERE type = 'file'")
+            files, total_size = c.fetchone()
+        return {'files': files, 'total_size': total_size, 'fts_enabled': self.fts_enabled,
+                'scanning': self.is_scanning(), 'last_scan': self.last_scan}
@@ -1,15 +1,32 @@
+import fnmatch
+import heapq
 import os
 import platform
 import shutil
+import stat
 from pathlib import Path
-from typing import List, Dict, Optional, Union
+from typing import Any, Iterator, List, Dict, Optional, Union
 import psutil
+from .copy_engine import CopyEngine
+from .duplicate_finder import DuplicateFinder
+from .file_index import FileIndex
+from .file_watcher import shared_watcher
+from .path_policy import PathPolicy
 
 class FileSystemHandler:
-    def __init__(self):
+    def __init__(self, events=None, config=None):
         self.system_dirs = self._get_system_directories()
         self.user_home = str(Path.home())
         self._initialize_safe_paths()
+        security = config.get('security', {}) if hasattr(config, 'get') else {}
+        self.path_policy = self._build_path_policy(security or {})
+        # Names under the safe paths are indexed in the background for search_files()
+        self.file_index = FileIndex()
+        self.watcher = shared_watcher()
+        self.start_indexing()
+        self.duplicate_finder = DuplicateFinder()
+        # Copies and moves report progress as 'copy_progress' / 'copy_complete' events
+        self.copy_engine = CopyEngine(events)
 
     def _get_system_directories(self) -> List[str]:
         """Get system-critical directories that should be protected"""
@@ -36,62 +53,185 @@ class FileSystemHandler:
         for path in self.safe_paths.values():
             os.makedirs(path, exist_ok=True)
 
+    def start_indexing(self) -> bool:
+        """Bring the file index up to date and keep it current; returns False if already scanning"""
+        roots = list(self.safe_paths.values())
+        # Watches are added on the scan thread, since without watchdog each one walks its folder
+        return self.file_index.start_scan(roots, before_scan=lambda: self._watch_roots(roots))
+
+    def _watch_roots(self, roots: List[str]):
+        for root in roots:
+            # Shared with other services, so a folder they already watch (e.g. ~/Music) is walked once
+            self.watcher.watch(root, self._on_file_changes, poll_interval=300)
+
+    def _on_file_changes(self, changes: Dict[str, str]):
+        try:
+            self.file_index.apply_changes(changes)
+        except Exception as e:
+            print(f"Error updating file index: {str(e)}")
+
+    def search_files(self, query: str, limit: int = 20, file_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Indexed files and folders under the safe paths matching query, best matches first"""
+        try:
+            return self.file_index.search(query, limit=limit, file_type=file_type)
+        except Exception as e:
+            print(f"Error searching files: {str(e)}")
+            return []
+
+    def _build_path_policy(self, security: Dict[str, Any]) -> PathPolicy:
+        """Compile system directories and config security.blocked_paths/allowed_paths into one policy"""
+        allowed = list(security.get('allowed_paths', []))
+        if allowed:
+            allowed += list(self.safe_paths.values())  # Always reachable when access is restricted
+        return PathPolicy(blocked_roots=self.system_dirs + list(security.get('blocked_paths', [])),
+                          allowed_roots=allowed)
+
     def is_path_safe(self, path: str) -> bool:
-        """Check if a path is safe to access"""
+        """Check if a path is safe to access
+
+        A policy lookup only; permission problems surface as errors from the operation itself.
+        """
         try:
-            path = os.path.abspath(path)
-            
-            # Check for system directories
-            if any(path.lower().startswith(sys_dir.lower()) for sys_dir in self.system_dirs):
-                return False
-            
-            # Check for suspicious patterns
-            suspicious_patterns = ['%temp%', 'system32', 'windows']
-            if any(pattern in path.lower() for pattern in suspicious_patterns):
-                return False
-            
-            # Check if path exists and is accessible
-            if os.path.exists(path):
-                return os.access(path, os.R_OK)
-            
-            # If path doesn't exist, check parent directory
-            parent = os.path.dirname(path)
-            return os.access(parent, os.W_OK)
+            return self.path_policy.is_allowed(path)
         except Exception:
             return False
 
-    def list_directory(self, path: Optional[str] = None) -> Dict[str, Union[str, List[str], str]]:
-        """List contents of a directory with detailed information"""
+    def _entry_info(self, entry: os.DirEntry, st: Optional[os.stat_result] = None) -> Dict[str, Union[str, int, float]]:
+        """Item details from a scandir entry with a single stat call"""
+        st = st or entry.stat()
+        is_dir = stat.S_ISDIR(st.st_mode)
+        return {
+            'name': entry.name,
+            'path': entry.path,
+            'type': 'directory' if is_dir else 'file',
+            'size': 0 if is_dir else st.st_size,
+            'modified': st.st_mtime
+        }
+
+    def iter_directory(self, path: Optional[str] = None, page_size: int = 500) -> Iterator[List[Dict]]:
+        """Yield the contents of a directory in pages of at most page_size items.
+
+        Only one page is held in memory at a time. Raises PermissionError if
+        the path is not safe to access.
+        """
+        path = os.path.abspath(path or self.user_home)
+        if not self.is_path_safe(path):
+            raise PermissionError('Access denied: Path is not safe or accessible')
+
+        page = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    page.append(self._entry_info(entry))
+                except OSError:
+                    continue  # Vanished or broken symlink
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+        if page:
+            yield page
+
+    def walk(self, path: Optional[str] = None, max_depth: Optional[int] = None, pattern: Optional[str] = None,
+             min_size: Optional[int] = None, max_size: Optional[int] = None,
+             include_dirs: bool = False) -> Iterator[Dict[str, Union[str, int, float]]]:
+        """Recursively yield items under path, depth first, filtered as they are found.
+
+        pattern is a case-insensitive glob matched against item names and
+        size filters apply to files only. Symlinked directories are not
+        followed. Raises PermissionError if the path is not safe to access.
+        """
+        pattern = pattern.lower() if pattern else None
+        for entry, st, depth in self._scan_tree(path, max_depth):
+            if pattern and not fnmatch.fnmatchcase(entry.name.lower(), pattern):
+                continue
+            info = self._entry_info(entry, st)
+            if info['type'] == 'directory':
+                if include_dirs:
+                    yield dict(info, depth=depth)
+                continue
+            if (min_size is not None and info['size'] < min_size) or \
+                    (max_size is not None and info['size'] > max_size):
+                continue
+            yield dict(info, depth=depth)
+
+    def _scan_tree(self, path: Optional[str], max_depth: Optional[int] = None) -> Iterator[tuple]:
+        """(entry, stat, depth) for everything under a safe path, stat'ing each entry once"""
+        path = os.path.abspath(path or self.user_home)
+        if not self.is_path_safe(path):
+            raise PermissionError('Access denied: Path is not safe or accessible')
+
+        stack = [(path, 0)]
+        while stack:
+            directory, depth = stack.pop()
+            try:
+                it = os.scandir(directory)
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    try:
+                        st = entry.stat()
+                        if stat.S_ISDIR(st.st_mode) and (max_depth is None or depth < max_depth) \
+                                and not entry.is_symlink():
+                            stack.append((entry.path, depth + 1))
+                    except OSError:
+                        continue
+                    yield entry, st, depth
+
+    def find_duplicates(self, path: Optional[str] = None, min_size: int = 1) -> Dict[str, Any]:
+        """Groups of files with identical contents under path, largest wasted space first"""
         try:
-            if not path:
-                path = self.user_home
-            path = os.path.abspath(path)
+            files = ((entry.path, st) for entry, st, _ in self._scan_tree(path) if stat.S_ISREG(st.st_mode))
+            groups = self.duplicate_finder.find(files, min_size=min_size)
+            return {
+                'path': os.path.abspath(path or self.user_home),
+                'groups': groups,
+                'wasted_space': sum(group['wasted'] for group in groups)
+            }
+        except PermissionError as e:
+            return {'error': str(e)}
+        except Exception as e:
+            return {'error': f'Failed to find duplicates: {str(e)}'}
 
-            if not self.is_path_safe(path):
-                return {'error': 'Access denied: Path is not safe or accessible'}
+    def find_large_files(self, path: Optional[str] = None, min_size: int = 100 * 1024 * 1024,
+                         limit: int = 20) -> Dict[str, Any]:
+        """The largest files of at least min_size bytes under path"""
+        try:
+            files = heapq.nlargest(limit, self.walk(path, min_size=min_size), key=lambda item: item['size'])
+            return {'path': os.path.abspath(path or self.user_home), 'items': files}
+        except PermissionError as e:
+            return {'error': str(e)}
+        except Exception as e:
+            return {'error': f'Failed to find large files: {str(e)}'}
+
+    def list_directory(self, path: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Union[str, List[str], str]]:
+        """List contents of a directory with detailed information
+
+        At most limit items are returned; totals still cover the whole directory.
+        """
+        try:
+            path = os.path.abspath(path or self.user_home)
 
             items = []
             total_size = 0
-            for entry in os.scandir(path):
-                try:
-                    item_info = {
-                        'name': entry.name,
-                        'type': 'directory' if entry.is_dir() else 'file',
-                        'size': 0 if entry.is_dir() else entry.stat().st_size,
-                        'modified': entry.stat().st_mtime
-                    }
-                    items.append(item_info)
-                    if not entry.is_dir():
-                        total_size += entry.stat().st_size
-                except Exception as e:
-                    continue
+            count = 0
+            for page in self.iter_directory(path):
+                for item in page:
+                    count += 1
+                    total_size += item['size']
+                    if limit is None or len(items) < limit:
+                        items.append(item)
 
             return {
                 'path': path,
                 'items': items,
+                'item_count': count,
+                'truncated': count > len(items),
                 'total_size': total_size,
                 'free_space': psutil.disk_usage(path).free
             }
+        except PermissionError as e:
+            return {'error': str(e)}
         except Exception as e:
             return {'error': f'Failed to list directory: {str(e)}'}
 
@@ -123,25 +263,26 @@ class FileSystemHandler:
         except Exception as e:
             return {'error': f'Failed to delete item: {str(e)}'}
 
-    def move_item(self, source: str, destination: str) -> Dict[str, str]:
-        """Move a file or directory safely"""
-        try:
-            source = os.path.abspath(source)
-            destination = os.path.abspath(destination)
+    def move_item(self, source: str, destination: str, background: bool = False,
+                  verify: bool = False) -> Dict[str, str]:
+        """Move a file or directory safely
 
-            if not (self.is_path_safe(source) and self.is_path_safe(destination)):
-                return {'error': 'Access denied: One or both paths are not safe'}
+        With background the move runs on the copy engine and the result
+        carries a job_id for get_transfer_status(), cancel_transfer() and
+        resume_transfer(); otherwise this waits for it to finish.
+        """
+        return self._transfer(source, destination, move=True, background=background, verify=verify)
 
-            if os.path.exists(destination):
-                return {'error': 'Destination already exists'}
+    def copy_item(self, source: str, destination: str, background: bool = False,
+                  verify: bool = False) -> Dict[str, str]:
+        """Copy a file or directory safely
 
-            shutil.move(source, destination)
-            return {'success': f'Moved {source} to {destination}'}
-        except Exception as e:
-            return {'error': f'Failed to move item: {str(e)}'}
+        See move_item() for background and verify.
+        """
+        return self._transfer(source, destination, move=False, background=background, verify=verify)
 
-    def copy_item(self, source: str, destination: str) -> Dict[str, str]:
-        """Copy a file or directory safely"""
+    def _transfer(self, source: str, destination: str, move: bool, background: bool, verify: bool) -> Dict[str, str]:
+        action = 'move' if move else 'copy'
         try:
             source = os.path.abspath(source)
             destination = os.path.abspath(destination)
@@ -152,13 +293,29 @@ class FileSystemHandler:
             if os.path.exists(destination):
                 return {'error': 'Destination already exists'}
 
-            if os.path.isdir(source):
-                shutil.copytree(source, destination)
-            else:
-                shutil.copy2(source, destination)
-            return {'success': f'Copied {source} to {destination}'}
+            job_id = self.copy_engine.start(source, destination, move=move, verify=verify)
+            if background:
+                return {'success': f'Started to {action} {source} to {destination}', 'job_id': job_id}
+
+            job = self.copy_engine.wait(job_id)
+            if job['status'] != 'completed':
+                return {'error': f"Failed to {action} item: {job['error'] or job['status']}", 'job_id': job_id}
+            return {'success': f"{'Moved' if move else 'Copied'} {source} to {destination}"}
         except Exception as e:
-            return {'error': f'Failed to copy item: {str(e)}'}
+            return {'error': f'Failed to {action} item: {str(e)}'}
+
+    def get_transfer_status(self, job_id: Optional[str] = None) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Progress of one copy or move, or of all of them"""
+        if job_id is None:
+            return self.copy_engine.list_jobs()
+        return self.copy_engine.get_job(job_id) or {'error': f'Unknown transfer: {job_id}'}
+
+    def cancel_transfer(self, job_id: str) -> bool:
+        return self.copy_engine.cancel(job_id)
+
+    def resume_transfer(self, job_id: str) -> bool:
+        """Continue a cancelled or failed copy or move, skipping what was already copied"""
+        return self.copy_engine.resume(job_id)
 
     def get_file_info(self, path: str) -> Dict[str, Union[str, int, float]]:
         """Get detailed information about a file or directory"""
@@ -0,0 +1,306 @@
+import os
+import threading
+import time
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+CREATED = 'created'
+MODIFIED = 'modified'
+DELETED = 'deleted'
+
+
+class _Subscriber:
+    """One callback on a watched folder and the changes collected for it since the last flush"""
+
+    def __init__(self, root: str, callback: Callable[[Dict[str, str]], None],
+                 extensions: Optional[Tuple[str, ...]], recursive: bool):
+        self.root = root
+        self.callback = callback
+        self.extensions = extensions
+        self.recursive = recursive
+        self.pending: Dict[str, str] = {}
+        self.first_pending_at = None
+        self.timer = None
+
+    def accepts(self, path: str, is_directory: bool) -> bool:
+        if not self.recursive and os.path.dirname(path) != self.root:
+            return False
+        # Directory events matter for moves and deletes of whole folders
+        return is_directory or not self.extensions or path.lower().endswith(self.extensions)
+
+
+class _Watch:
+    """One watched folder, observed (or walked) once however many subscribers it has"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.subscribers: List[_Subscriber] = []
+        self.observer_watch = None
+        self.snapshot: Dict[str, Tuple[float, int]] = {}
+        self.poll_interval = None
+        self.next_poll = 0.0
+
+    @property
+    def recursive(self) -> bool:
+        return any(subscriber.recursive for subscriber in self.subscribers)
+
+
+class FileWatcher:
+    """Delivers debounced batches of filesystem changes for watched folders.
+
+    Uses watchdog (inotify, FSEvents, ReadDirectoryChangesW) when installed
+    and falls back to periodically diffing a stat snapshot otherwise. Events
+    for a folder are collected until it has been quiet for `debounce`
+    seconds (or `max_delay` has passed since the first one), then handed to
+    its callback as one {path: 'created' | 'modified' | 'deleted'} dict, so
+    copying an album in results in a single update. Moves are reported as a
+    delete of the old path and a create of the new one. Several callbacks
+    can watch the same folder; it is still observed, or walked, only once.
+    Use shared_watcher() so services watching overlapping folders share one.
+    """
+
+    def __init__(self, debounce: float = 1.0, max_delay: float = 10.0, poll_interval: float = 30.0):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.watches: Dict[str, _Watch] = {}
+        self.lock = threading.RLock()
+        self.observer = None
+        self.poll_thread = None
+        self.stop_event = threading.Event()
+        self.backend = None
+
+    # Watch management
+
+    def watch(self, path: str, callback: Callable[[Dict[str, str]], None],
+              extensions: Optional[Iterable[str]] = None, recursive: bool = True,
+              poll_interval: Optional[float] = None) -> bool:
+        """Start delivering changes under path to callback; replaces an existing watch by the same callback.
+
+        poll_interval overrides the watcher's default for this folder when
+        polling; a folder with several callbacks is polled at the shortest.
+        """
+        path = os.path.abspath(path)
+        if not os.path.isdir(path):
+            logging.warning(f"Cannot watch missing folder: {path}")
+            return False
+
+        self.unwatch(path, callback)
+        subscriber = _Subscriber(path, callback, tuple(ext.lower() for ext in extensions) if extensions else None,
+                                 recursive)
+        interval = poll_interval or self.poll_interval
+        with self.lock:
+            watch = self.watches.get(path)
+            is_new = watch is None
+            if is_new:
+                watch = self.watches[path] = _Watch(path)
+            was_recursive = watch.recursive
+            watch.subscribers.append(subscriber)
+            watch.poll_interval = min(watch.poll_interval or interval, interval)
+            watch.next_poll = min(watch.next_poll or float('inf'), time.monotonic() + watch.poll_interval)
+        self._start_backend()
+
+        if is_new or watch.recursive != was_recursive:
+            if self.backend == 'watchdog':
+                self._schedule(watch)
+            else:
+                watch.snapshot = self._snapshot(watch)
+        return True
+
+    def is_watching(self, path: str) -> bool:
+        with self.lock:
+            return os.path.abspath(path) in self.watches
+
+    def unwatch(self, path: str, callback: Optional[Callable[[Dict[str, str]], None]] = None) -> None:
+        """Stop delivering changes under path to callback, or to every callback if none is given"""
+        path = os.path.abspath(path)
+        with self.lock:
+            watch = self.watches.get(path)
+            if watch is None:
+                return
+            removed = [subscriber for subscriber in watch.subscribers
+                       if callback is None or subscriber.callback == callback]
+            watch.subscribers = [subscriber for subscriber in watch.subscribers if subscriber not in removed]
+            if not watch.subscribers:
+                self.watches.pop(path, None)
+        for subscriber in removed:
+            if subscriber.timer:
+                subscriber.timer.cancel()
+        if not watch.subscribers:
+            self._unschedule(watch)
+
+    def _schedule(self, watch: _Watch):
+        self._unschedule(watch)
+        watch.observer_watch = self.observer.schedule(self._make_handler(watch), watch.path,
+                                                      recursive=watch.recursive)
+
+    def _unschedule(self, watch: _Watch):
+        if watch.observer_watch is not None and self.observer is not None:
+            try:
+                self.observer.unschedule(watch.observer_watch)
+            except Exception as e:
+                logging.debug(f"Error unscheduling watch on {watch.path}: {str(e)}")
+        watch.observer_watch = None
+
+    def stop(self) -> None:
+        """Stop watching everything, discarding undelivered changes"""
+        for path in list(self.watches):
+            self.unwatch(path)
+        self.stop_event.set()
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer = None
+        self.poll_thread = None
+        self.backend = None
+
+    def _start_backend(self):
+        with self.lock:
+            if self.backend:
+                return
+            self.stop_event.clear()
+            try:
+                from watchdog.observers import Observer
+                self.observer = Observer()
+                self.observer.daemon = True
+                self.observer.start()
+                self.backend = 'watchdog'
+            except Exception as e:
+                logging.info(f"watchdog unavailable ({str(e)}), polling every {self.poll_interval}s")
+                self.poll_thread = threading.Thread(target=self._poll_loop, daemon=True)
+                self.poll_thread.start()
+                self.backend = 'polling'
+
+    # Event collection and debouncing
+
+    def _record(self, watch: _Watch, path: str, kind: str, is_directory: bool = False):
+        with self.lock:
+            subscribers = list(watch.subscribers)
+        for subscriber in subscribers:
+            if subscriber.accepts(path, is_directory):
+                self._record_for(subscriber, path, kind)
+
+    def _record_for(self, subscriber: _Subscriber, path: str, kind: str):
+        with self.lock:
+            previous = subscriber.pending.get(path)
+            if previous == CREATED and kind == MODIFIED:
+                kind = CREATED  # Still new as far as the consumer is concerned
+            elif previous == CREATED and kind == DELETED:
+                subscriber.pending.pop(path)  # Came and went within one batch
+                return
+            elif previous == DELETED and kind == CREATED:
+                kind = MODIFIED  # Replaced in place
+            subscriber.pending[path] = kind
+
+            now = time.monotonic()
+            if subscriber.first_pending_at is None:
+                subscriber.first_pending_at = now
+            if subscriber.timer:
+                subscriber.timer.cancel()
+            delay = min(self.debounce, max(0.0, subscriber.first_pending_at + self.max_delay - now))
+            subscriber.timer = threading.Timer(delay, self._flush, args=(subscriber,))
+            subscriber.timer.daemon = True
+            subscriber.timer.start()
+
+    def _flush(self, subscriber: _Subscriber):
+        with self.lock:
+            changes, subscriber.pending = subscriber.pending, {}
+            subscriber.first_pending_at = None
+            subscriber.timer = None
+            watch = self.watches.get(subscriber.root)
+            if watch is None or subscriber not in watch.subscribers:
+                return
+        if not changes:
+            return
+        try:
+            subscriber.callback(changes)
+        except Exception as e:
+            logging.error(f"File watcher callback failed for {subscriber.root}: {str(e)}")
+
+    def _make_handler(self, watch: _Watch):
+        from watchdog.events import FileSystemEventHandler
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                watcher._record(watch, event.src_path, CREATED, event.is_directory)
+
+            def on_modified(self, event):
+                if not event.is_directory:
+                    watcher._record(watch, event.src_path, MODIFIED)
+
+            def on_deleted(self, event):
+                watcher._record(watch, event.src_path, DELETED, event.is_directory)
+
+            def on_moved(self, event):
+                watcher._record(watch, event.src_path, DELETED, event.is_directory)
+                if event.dest_path.startswith(watch.path + os.sep):
+                    watcher._record(watch, event.dest_path, CREATED, event.is_directory)
+
+        return Handler()
+
+    # Polling fallback
+
+    def _snapshot(self, watch: _Watch) -> Dict[str, Tuple[float, int]]:
+        """Every file's (mtime, size); subscribers filter by extension when changes are recorded"""
+        snapshot = {}
+        recursive = watch.recursive
+        stack = [watch.path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if recursive:
+                                    stack.append(entry.path)
+                            else:
+                                stat = entry.stat()
+                                snapshot[entry.path] = (stat.st_mtime, stat.st_size)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return snapshot
+
+    def _poll_loop(self):
+        while not self.stop_event.wait(self._next_poll_delay()):
+            now = time.monotonic()
+            with self.lock:
+                watches = [watch for watch in self.watches.values() if watch.next_poll <= now]
+            for watch in watches:
+                watch.next_poll = time.monotonic() + watch.poll_interval
+                current = self._snapshot(watch)
+                previous = watch.snapshot
+                watch.snapshot = current
+                for path, signature in current.items():
+                    if path not in previous:
+                        self._record(watch, path, CREATED)
+                    elif previous[path] != signature:
+                        self._record(watch, path, MODIFIED)
+                for path in previous.keys() - current.keys():
+                    self._record(watch, path, DELETED)
+
+    def _next_poll_delay(self) -> float:
+        with self.lock:
+            due = [watch.next_poll for watch in self.watches.values()]
+        return max(0.0, min(due) - time.monotonic()) if due else self.poll_interval
+
+    def get_status(self) -> Dict[str, object]:
+        with self.lock:
+            return {'backend': self.backend, 'watched': list(self.watches),
+                    'pending': {path: sum(len(subscriber.pending) for subscriber in watch.subscribers)
+                                for path, watch in self.watches.items()}}
+
+
+_shared_watcher = None
+_shared_lock = threading.Lock()
+
+
+def shared_watcher() -> FileWatcher:
+    """The process-wide watcher, so services watching the same folder share its observer or walk"""
+    global _shared_watcher
+    with _shared_lock:
+        if _shared_watcher is None:
+            _shared_watcher = FileWatcher()
+        return _shared_watcher
@@ -0,0 +1,142 @@
+import heapq
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+# Spelling rules applied before vowels are dropped; order matters
+_PHONETIC_RULES = [
+    (re.compile(r'^(kn|gn|pn|wr)'), lambda m: m.group(1)[1]),
+    (re.compile(r'ph'), 'f'),
+    (re.compile(r'ck|ch|q'), 'k'),
+    (re.compile(r'c(?=[eiy])'), 's'),
+    (re.compile(r'c'), 'k'),
+    (re.compile(r'dg'), 'j'),
+    (re.compile(r'gh'), ''),
+    (re.compile(r'x'), 'ks'),
+    (re.compile(r'z'), 's'),
+    (re.compile(r'v'), 'f'),
+]
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents, file extensions and separators such as '_' and '-'"""
+    text = os.path.splitext(text)[0] if re.search(r'\.\w{2,4}$', text) else text
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text).lower()  # CamelCase file names
+    return ' '.join(re.findall(r'[a-z0-9]+', text))
+
+
+@lru_cache(maxsize=65536)
+def phonetic_key(word: str) -> str:
+    """Rough sound-alike key: common spelling rules, then drop vowels after the first letter"""
+    if not word or word.isdigit():
+        return word
+    for pattern, replacement in _PHONETIC_RULES:
+        word = pattern.sub(replacement, word)
+    if not word:
+        return word
+    key = word[0] + re.sub(r'[aeiouyhw]', '', word[1:])
+    return re.sub(r'(.)\1+', r'\1', key)
+
+
+def phonetic_text(normalized: str) -> str:
+    return ' '.join(phonetic_key(word) for word in normalized.split())
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of each word, padded so short words and word starts count"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class FuzzyMatcher:
+    """Approximate string lookup over a fixed set of entries using trigram indexes.
+
+    Every entry is indexed twice: by the trigrams of its normalized text and
+    by the trigrams of its phonetic form, so both typos ("jakson") and
+    sound-alike spellings ("fone") find it. Candidates are gathered from the
+    inverted index, skipping trigrams common to a large share of entries
+    unless the query has nothing rarer, and ranked by Dice similarity.
+    Rebuilding swaps in a new index atomically, so searches never block.
+    """
+
+    def __init__(self, common_ratio: float = 0.02, max_candidates: int = 50):
+        self.common_ratio = common_ratio
+        self.max_candidates = max_candidates
+        self._index = self._empty_index()
+        self.build_lock = threading.Lock()
+
+    def _empty_index(self) -> Dict[str, object]:
+        return {'keys': [], 'texts': [], 'phonetic_texts': [], 'plain': {}, 'phonetic': {}}
+
+    def __len__(self) -> int:
+        return len(self._index['keys'])
+
+    def build(self, entries: Iterable[Tuple[Hashable, str]]) -> int:
+        """Replace the index with (key, text) entries; returns the number indexed"""
+        with self.build_lock:
+            index = self._empty_index()
+            plain, phonetic = defaultdict(list), defaultdict(list)
+            for key, text in entries:
+                normalized = normalize(text)
+                if not normalized:
+                    continue
+                doc_id = len(index['keys'])
+                index['keys'].append(key)
+                phonetic_form = phonetic_text(normalized)
+                index['texts'].append(normalized)
+                index['phonetic_texts'].append(phonetic_form)
+                for gram in trigrams(normalized):
+                    plain[gram].append(doc_id)
+                for gram in trigrams(phonetic_form):
+                    phonetic[gram].append(doc_id)
+            index['plain'] = dict(plain)
+            index['phonetic'] = dict(phonetic)
+            self._index = index
+            return len(index['keys'])
+
+    def _count_shared(self, counts: Counter, grams: set, postings: Dict[str, List[int]], total: int):
+        lists = [postings[gram] for gram in grams if gram in postings]
+        if not lists:
+            return
+        limit = max(self.common_ratio * total, 50)
+        rare = [posting for posting in lists if len(posting) <= limit]
+        counts.update(chain.from_iterable(rare or [min(lists, key=len)]))
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.35) -> List[Tuple[Hashable, float]]:
+        """Best matching keys with Dice similarity scores in [0, 1], highest first"""
+        index = self._index
+        total = len(index['keys'])
+        normalized = normalize(query)
+        if not total or not normalized:
+            return []
+
+        plain_grams = trigrams(normalized)
+        phonetic_grams = trigrams(phonetic_text(normalized))
+        counts = Counter()
+        self._count_shared(counts, plain_grams, index['plain'], total)
+        self._count_shared(counts, phonetic_grams, index['phonetic'], total)
+        shortlist = heapq.nlargest(self.max_candidates, counts.items(), key=itemgetter(1))
+
+        scored = []
+        for doc_id, _ in shortlist:
+            # Exact trigram overlap on the shortlist, including common trigrams skipped above
+            doc_plain = trigrams(index['texts'][doc_id])
+            plain_score = 2 * len(plain_grams & doc_plain) / (len(plain_grams) + len(doc_plain))
+            doc_phonetic = trigrams(index['phonetic_texts'][doc_id])
+            phonetic_score = 2 * len(phonetic_grams & doc_phonetic) / (len(phonetic_grams) + len(doc_phonetic))
+            score = max(plain_score, 0.9 * phonetic_score)
+            if score >= min_score:
+                scored.append((score, doc_id))
+
+        scored.sort(reverse=True)
+        return [(index['keys'][doc_id], round(score, 3)) for score, doc_id in scored[:limit]]
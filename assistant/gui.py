@@ -3,6 +3,7 @@ from tkinter import ttk, scrolledtext
 from ttkthemes import ThemedTk
 import threading
 import math
+import re
 from .web_browser import BrowserFrame
 from .feature_toggle import FeatureToggleManager
 
@@ -25,6 +26,9 @@ class AssistantGUI:
             self.event_system.subscribe('session_change', self.handle_session_change)
             self.event_system.subscribe('backup_complete', self.handle_backup_complete)
             self.event_system.subscribe('system_error', self.handle_system_error)
+            self.event_system.subscribe('service_ready', self.handle_service_ready)
+            self.event_system.subscribe('service_failed', self.handle_service_failed)
+            self.event_system.subscribe('startup_complete', self.handle_startup_complete)
         
         # Initialize variables for settings first
         self.voice_resp_var = tk.BooleanVar(value=self.config['voice_response'])
@@ -77,6 +81,9 @@ class AssistantGUI:
         self.input_field = ttk.Entry(self.main_frame, style='Custom.TEntry')
         self.input_field.pack(fill=tk.X, padx=5, pady=5)
         self.input_field.bind('<Return>', self.process_input)
+        # Inline completion from past searches; Tab accepts the suggestion
+        self.input_field.bind('<KeyRelease>', self._autocomplete_input)
+        self.input_field.bind('<Tab>', self._accept_completion)
         
         # Create custom style for input field with proper colors
         style = ttk.Style()
@@ -218,30 +225,15 @@ class AssistantGUI:
         country = self.news_country_var.get()
         category = self.news_category_var.get()
         
-        # Show loading message
-        self.news_area.config(state=tk.NORMAL)
-        self.news_area.delete(1.0, tk.END)
-        self.news_area.insert(tk.END, "Loading news...")
-        self.news_area.config(state=tk.DISABLED)
+        # Show cached headlines straight away, even if stale
+        cached_summary = news_service.get_cached_summary(country, category)
+        self._update_news_area(cached_summary or "Loading news...")
         
-        # Fetch news in a separate thread
-        threading.Thread(
-            target=self._fetch_news_thread,
-            args=(country, category),
-            daemon=True
-        ).start()
-
-    def _fetch_news_thread(self, country, category):
-        """Fetch news in a background thread"""
-        try:
-            news_service = self.container.get_service('news_service')
-            news_summary = news_service.get_news_summary(country, category)
-            
-            # Update UI with news
-            self.root.after(0, self._update_news_area, news_summary)
-        except Exception as e:
-            error_message = f"Error fetching news: {str(e)}"
-            self.root.after(0, self.show_error, error_message)
+        # Refresh in the background; the news area updates when fresh headlines arrive
+        news_service.refresh_summary_async(
+            country, category,
+            callback=lambda summary: self.root.after(0, self._update_news_area, summary)
+        )
 
     def _update_news_area(self, content):
         """Update news area with content"""
@@ -322,6 +314,23 @@ class AssistantGUI:
         """Handle system-level errors"""
         error_message = data.get('message', 'Unknown system error')
         self.show_error(error_message)
+
+    # Startup events arrive from worker threads, so widgets are updated via after()
+
+    def handle_service_ready(self, data):
+        """Show which service just finished starting"""
+        name = data.get('name', '').replace('_', ' ')
+        self.root.after(0, lambda: self.status_bar.config(text=f"Loaded {name}..."))
+
+    def handle_service_failed(self, data):
+        """Report a service that could not start"""
+        message = f"{data.get('name', 'service')} failed to start: {data.get('error')}"
+        self.root.after(0, self.show_error, message)
+
+    def handle_startup_complete(self, data):
+        """Return the status bar to normal once every service has started"""
+        if not data.get('failed'):
+            self.root.after(0, lambda: self.status_bar.config(text="Ready"))
     
     def run(self):
         self.root.mainloop()
@@ -330,7 +339,10 @@ class AssistantGUI:
         if not self.command_handler:
             self.show_error("Command handler not initialized")
             return
-            
+        
+        # A suggested completion is only taken with Tab, so drop it before reading the entry
+        if self.input_field.selection_present():
+            self.input_field.delete(tk.SEL_FIRST, tk.END)
         text = self.input_field.get().strip()
         if not text:
             return
@@ -345,6 +357,36 @@ class AssistantGUI:
             daemon=True
         ).start()
     
+    def _autocomplete_input(self, event):
+        """Complete a search command from the search history index, without any network access"""
+        if event.keysym in ('BackSpace', 'Delete', 'Left', 'Right', 'Up', 'Down', 'Home', 'End',
+                            'Return', 'Tab', 'Escape') or len(event.char) != 1:
+            return
+        search_service = self.container.get_service('search_service') if self.container else None
+        if not search_service:
+            return
+        
+        if self.input_field.selection_present():
+            self.input_field.delete(tk.SEL_FIRST, tk.END)
+        text = self.input_field.get()
+        match = re.match(r"^((?:search|google|look up|find)(?:\s+for)?\s+)(.+)$", text, re.IGNORECASE)
+        if not match:
+            return
+        command_prefix, query = match.groups()
+        
+        for suggestion in search_service.suggest(query, limit=1):
+            if len(suggestion) > len(query) and suggestion.lower().startswith(query.lower()):
+                self.input_field.insert(tk.END, suggestion[len(query):])
+                self.input_field.select_range(len(command_prefix) + len(query), tk.END)
+                self.input_field.icursor(len(command_prefix) + len(query))
+    
+    def _accept_completion(self, event):
+        if self.input_field.selection_present():
+            self.input_field.select_clear()
+            self.input_field.icursor(tk.END)
+            return 'break'
+        return None
+    
     def process_command(self, text):
         """Process a command from the user input"""
         if not text:
@@ -0,0 +1,198 @@
+import json
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+VIDEO_ID = r'[A-Za-z0-9_-]{11}'
+
+
+class HTMLExtractor:
+    """Runs registered extractors for a page kind until one returns results.
+
+    Cheap extractors that scan for known JSON blobs are registered first; full
+    HTML parsers (selectolax, lxml, then BeautifulSoup's html.parser) are only
+    fallbacks. Extractors whose optional dependency is missing are skipped.
+    """
+
+    def __init__(self):
+        self._extractors: Dict[str, List[Tuple[str, Callable[[str], List[Any]]]]] = {}
+        self.last_used: Dict[str, str] = {}
+
+    def register(self, kind: str, name: str, func: Callable[[str], List[Any]], first: bool = False) -> None:
+        """Register an extractor for a page kind, after existing ones unless first is set"""
+        extractors = self._extractors.setdefault(kind, [])
+        extractors[:] = [item for item in extractors if item[0] != name]
+        if first:
+            extractors.insert(0, (name, func))
+        else:
+            extractors.append((name, func))
+
+    def get_extractors(self, kind: str) -> List[Tuple[str, Callable[[str], List[Any]]]]:
+        return list(self._extractors.get(kind, []))
+
+    def extract(self, kind: str, html: str) -> List[Any]:
+        for name, func in self._extractors.get(kind, []):
+            try:
+                results = func(html)
+            except ImportError:
+                continue
+            except Exception as e:
+                print(f"HTML extractor {name} failed: {str(e)}")
+                continue
+            if results:
+                self.last_used[kind] = name
+                return results
+        return []
+
+
+# YouTube result pages
+
+def _unique(items: List[str]) -> List[str]:
+    seen = set()
+    return [item for item in items if not (item in seen or seen.add(item))]
+
+
+def youtube_ids_from_renderers(html: str) -> List[str]:
+    """Scan the embedded ytInitialData for videoRenderer entries without decoding it"""
+    return _unique(re.findall(r'"videoRenderer":\{"videoId":"(' + VIDEO_ID + ')"', html))
+
+
+def youtube_ids_from_initial_data(html: str) -> List[str]:
+    """Decode only the ytInitialData JSON blob and walk it for video renderers"""
+    match = re.search(r'(?:var\s+ytInitialData|window\["ytInitialData"\])\s*=\s*', html)
+    if not match:
+        return []
+    data, _ = json.JSONDecoder().raw_decode(html, match.end())
+
+    video_ids = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            renderer = node.get('videoRenderer')
+            if isinstance(renderer, dict) and renderer.get('videoId'):
+                video_ids.append(renderer['videoId'])
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return _unique(video_ids)
+
+
+def _video_ids_from_hrefs(hrefs) -> List[str]:
+    video_ids = []
+    for href in hrefs:
+        if href and '/watch?v=' in href and 'list=' not in href:  # Avoid playlists
+            match = re.match(VIDEO_ID, href.split('/watch?v=')[1])
+            if match:
+                video_ids.append(match.group(0))
+    return _unique(video_ids)
+
+
+def youtube_ids_selectolax(html: str) -> List[str]:
+    from selectolax.parser import HTMLParser
+    tree = HTMLParser(html)
+    return _video_ids_from_hrefs(node.attributes.get('href') for node in tree.css('a[href*="/watch?v="]'))
+
+
+def youtube_ids_lxml(html: str) -> List[str]:
+    from lxml import html as lxml_html
+    tree = lxml_html.fromstring(html)
+    return _video_ids_from_hrefs(tree.xpath('//a[contains(@href, "/watch?v=")]/@href'))
+
+
+def youtube_ids_html_parser(html: str) -> List[str]:
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    return _video_ids_from_hrefs(a.get('href', '') for a in soup.find_all('a', {'href': re.compile(r'/watch\?v=')}))
+
+
+def youtube_ids_loose_regex(html: str) -> List[str]:
+    """Last resort: any watch link anywhere in the page"""
+    return _unique(re.findall(r"watch\?v=(" + VIDEO_ID + ")", html))
+
+
+# Google result pages
+
+def _clean_google_link(link: str) -> str:
+    if link and link.startswith('/url?q='):
+        link = link.split('/url?q=')[1].split('&')[0]
+    return link
+
+
+def google_results_selectolax(html: str) -> List[Dict[str, str]]:
+    from selectolax.parser import HTMLParser
+    results = []
+    for result in HTMLParser(html).css('div.g'):
+        title_element = result.css_first('h3')
+        link_element = result.css_first('a')
+        snippet_element = result.css_first('div.VwiC3b')
+        if title_element and link_element and link_element.attributes.get('href'):
+            results.append({
+                'title': title_element.text(),
+                'link': _clean_google_link(link_element.attributes.get('href')),
+                'snippet': snippet_element.text() if snippet_element else ""
+            })
+    return results
+
+
+def _class_xpath(class_name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def google_results_lxml(html: str) -> List[Dict[str, str]]:
+    from lxml import html as lxml_html
+    results = []
+    for result in lxml_html.fromstring(html).xpath(f"//div[{_class_xpath('g')}]"):
+        titles = result.xpath('.//h3')
+        links = result.xpath('.//a[@href]')
+        snippets = result.xpath(f".//div[{_class_xpath('VwiC3b')}]")
+        if titles and links:
+            results.append({
+                'title': titles[0].text_content(),
+                'link': _clean_google_link(links[0].get('href')),
+                'snippet': snippets[0].text_content() if snippets else ""
+            })
+    return results
+
+
+def google_results_html_parser(html: str) -> List[Dict[str, str]]:
+    from bs4 import BeautifulSoup
+    results = []
+    for result in BeautifulSoup(html, 'html.parser').select('div.g'):
+        title_element = result.select_one('h3')
+        link_element = result.select_one('a')
+        snippet_element = result.select_one('div.VwiC3b')
+        if title_element and link_element and link_element.get('href'):
+            results.append({
+                'title': title_element.get_text(),
+                'link': _clean_google_link(link_element.get('href')),
+                'snippet': snippet_element.get_text() if snippet_element else ""
+            })
+    return results
+
+
+default_extractor = HTMLExtractor()
+for _name, _func in [
+    ('renderer_regex', youtube_ids_from_renderers),
+    ('initial_data_json', youtube_ids_from_initial_data),
+    ('selectolax', youtube_ids_selectolax),
+    ('lxml', youtube_ids_lxml),
+    ('html.parser', youtube_ids_html_parser),
+    ('loose_regex', youtube_ids_loose_regex),
+]:
+    default_extractor.register('youtube_videos', _name, _func)
+for _name, _func in [
+    ('selectolax', google_results_selectolax),
+    ('lxml', google_results_lxml),
+    ('html.parser', google_results_html_parser),
+]:
+    default_extractor.register('google_results', _name, _func)
+
+
+def extract_youtube_video_ids(html: str) -> List[str]:
+    """Video IDs from a YouTube results page, in page order"""
+    return default_extractor.extract('youtube_videos', html)
+
+
+def extract_google_results(html: str) -> List[Dict[str, str]]:
+    """Title, link and snippet for each organic result on a Google results page"""
+    return default_extractor.extract('google_results', html)
@@ -0,0 +1,47 @@
+import importlib
+import logging
+import threading
+import time
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a module that is imported on first attribute access.
+
+    Lets a service module keep "cv2.imread(...)"-style call sites while
+    only paying for the import, and only failing on a missing package,
+    when the feature is actually used.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    logging.debug(f"Imported {self.__name__} on first use in "
+                                  f"{(time.perf_counter() - started) * 1000:.0f} ms")
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Module proxy for name (e.g. 'cv2' or 'PIL.Image') that imports it when first used"""
+    return LazyModule(name)
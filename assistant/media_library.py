@@ -0,0 +1,345 @@
+import os
+import re
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .cache import CACHE_DIR
+
+MEDIA_EXTENSIONS = ('.mp3', '.wav', '.ogg', '.flac', '.m4a', '.opus', '.mp4', '.avi', '.mkv')
+
+
+class MediaLibrary:
+    """Persistent index of local media files with their tags.
+
+    Tracks live in SQLite with an FTS5 table over title, artist, album and
+    file name, so lookups stay fast on large libraries. A background scan
+    only reads tags for files whose mtime or size changed since the last
+    scan, and drops files that have disappeared. Tags are read with mutagen
+    when it is installed; otherwise they are guessed from "Artist - Title"
+    file names. If SQLite was built without FTS5, searches fall back to LIKE.
+    """
+
+    def __init__(self, db_path=None, batch_size: int = 500):
+        self.db_path = str(db_path or CACHE_DIR / 'media_library.db')
+        self.batch_size = batch_size
+        self.fts_enabled = False
+        self.scan_lock = threading.Lock()
+        self.scan_thread = None
+        self.last_scan = {}
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._initialize_database()
+
+    @contextmanager
+    def _get_cursor(self):
+        """Context manager for database connections"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        try:
+            yield cursor
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Media library error: {str(e)}")
+            raise
+        finally:
+            conn.close()
+
+    def _initialize_database(self):
+        with self._get_cursor() as c:
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute('''CREATE TABLE IF NOT EXISTS tracks
+                        (id INTEGER PRIMARY KEY,
+                        path TEXT UNIQUE NOT NULL,
+                        folder TEXT NOT NULL,
+                        filename TEXT NOT NULL,
+                        title TEXT,
+                        artist TEXT,
+                        album TEXT,
+                        duration REAL,
+                        mtime REAL NOT NULL,
+                        size INTEGER NOT NULL)''')
+            c.execute("CREATE INDEX IF NOT EXISTS idx_tracks_folder ON tracks(folder)")
+            c.execute("CREATE INDEX IF NOT EXISTS idx_tracks_artist ON tracks(artist COLLATE NOCASE)")
+
+            try:
+                c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts USING fts5(
+                            title, artist, album, filename,
+                            content='tracks', content_rowid='id',
+                            tokenize='unicode61 remove_diacritics 2', prefix='2 3')''')
+                # Keep the external-content FTS table in step with tracks
+                c.execute('''CREATE TRIGGER IF NOT EXISTS tracks_ai AFTER INSERT ON tracks BEGIN
+                            INSERT INTO tracks_fts(rowid, title, artist, album, filename)
+                            VALUES (new.id, new.title, new.artist, new.album, new.filename);
+                            END''')
+                c.execute('''CREATE TRIGGER IF NOT EXISTS tracks_ad AFTER DELETE ON tracks BEGIN
+                            INSERT INTO tracks_fts(tracks_fts, rowid, title, artist, album, filename)
+                            VALUES ('delete', old.id, old.title, old.artist, old.album, old.filename);
+                            END''')
+                c.execute('''CREATE TRIGGER IF NOT EXISTS tracks_au AFTER UPDATE ON tracks BEGIN
+                            INSERT INTO tracks_fts(tracks_fts, rowid, title, artist, album, filename)
+                            VALUES ('delete', old.id, old.title, old.artist, old.album, old.filename);
+                            INSERT INTO tracks_fts(rowid, title, artist, album, filename)
+                            VALUES (new.id, new.title, new.artist, new.album, new.filename);
+                            END''')
+                self.fts_enabled = True
+            except sqlite3.OperationalError as e:
+                logging.warning(f"FTS5 unavailable, media search will use LIKE: {str(e)}")
+
+    # Tag reading
+
+    def read_tags(self, path: str) -> Dict[str, Any]:
+        """Read title, artist, album and duration from a media file"""
+        tags = self._tags_from_filename(path)
+        try:
+            import mutagen
+        except ImportError:
+            return tags
+
+        try:
+            media = mutagen.File(path, easy=True)
+        except Exception as e:
+            logging.debug(f"Could not read tags from {path}: {str(e)}")
+            return tags
+        if media is None:
+            return tags
+
+        for field in ('title', 'artist', 'album'):
+            values = media.get(field) if hasattr(media, 'get') else None
+            if values:
+                tags[field] = str(values[0]).strip() or tags[field]
+        if getattr(media, 'info', None) is not None and getattr(media.info, 'length', None):
+            tags['duration'] = float(media.info.length)
+        return tags
+
+    def _tags_from_filename(self, path: str) -> Dict[str, Any]:
+        name = os.path.splitext(os.path.basename(path))[0]
+        name = re.sub(r'^\d+[\s.\-_]+', '', name).replace('_', ' ')  # Leading track numbers
+        artist, separator, title = name.partition(' - ')
+        if not separator and name.count('-') == 1:
+            artist, separator, title = name.partition('-')  # "Artist-Title"
+        if not separator:
+            artist, title = None, name
+        return {'title': title.strip(), 'artist': artist.strip() if artist else None,
+                'album': os.path.basename(os.path.dirname(path)) or None, 'duration': None}
+
+    # Scanning
+
+    def _walk_media(self, root: str) -> Iterable[os.DirEntry]:
+        stack = [root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if not entry.name.startswith('.'):
+                                    stack.append(entry.path)
+                            elif entry.name.lower().endswith(MEDIA_EXTENSIONS):
+                                yield entry
+                        except OSError:
+                            continue
+            except OSError as e:
+                logging.debug(f"Skipping unreadable folder: {str(e)}")
+
+    def _track_row(self, path: str, stat: os.stat_result) -> tuple:
+        tags = self.read_tags(path)
+        return (path, os.path.dirname(path), os.path.basename(path), tags['title'], tags['artist'],
+                tags['album'], tags['duration'], stat.st_mtime, stat.st_size)
+
+    def _upsert(self, cursor, rows: List[tuple]):
+        cursor.executemany('''INSERT INTO tracks (path, folder, filename, title, artist, album, duration, mtime, size)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            ON CONFLICT(path) DO UPDATE SET
+                            title=excluded.title, artist=excluded.artist, album=excluded.album,
+                            duration=excluded.duration, mtime=excluded.mtime, size=excluded.size''', rows)
+
+    def scan(self, root: str, progress: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+        """Bring the index for root up to date, reading tags only for new or changed files"""
+        root = os.path.abspath(root)
+        with self.scan_lock:
+            with self._get_cursor() as c:
+                c.execute("SELECT path, mtime, size FROM tracks WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+                          (root, self._like_prefix(root)))
+                known = {path: (mtime, size) for path, mtime, size in c.fetchall()}
+
+            seen = set()
+            pending = []
+            stats = {'scanned': 0, 'updated': 0, 'removed': 0}
+            for entry in self._walk_media(root):
+                stats['scanned'] += 1
+                seen.add(entry.path)
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if known.get(entry.path) == (stat.st_mtime, stat.st_size):
+                    continue
+                pending.append(self._track_row(entry.path, stat))
+                if len(pending) >= self.batch_size:
+                    with self._get_cursor() as c:
+                        self._upsert(c, pending)
+                    stats['updated'] += len(pending)
+                    pending = []
+                    if progress:
+                        progress(stats['scanned'])
+
+            removed = [(path,) for path in known if path not in seen]
+            with self._get_cursor() as c:
+                if pending:
+                    self._upsert(c, pending)
+                if removed:
+                    c.executemany("DELETE FROM tracks WHERE path = ?", removed)
+            stats['updated'] += len(pending)
+            stats['removed'] = len(removed)
+            self.last_scan = {'root': root, **stats}
+            return stats
+
+    def start_scan(self, root: str, callback: Optional[Callable[[Dict[str, int]], None]] = None) -> bool:
+        """Scan root in a background thread; returns False if a scan is already running"""
+        if self.scan_thread and self.scan_thread.is_alive():
+            return False
+
+        def run():
+            try:
+                stats = self.scan(root)
+                logging.info(f"Media library scan of {root}: {stats}")
+                if callback:
+                    callback(stats)
+            except Exception as e:
+                logging.error(f"Media library scan failed: {str(e)}")
+
+        self.scan_thread = threading.Thread(target=run, daemon=True)
+        self.scan_thread.start()
+        return True
+
+    def is_scanning(self) -> bool:
+        return bool(self.scan_thread and self.scan_thread.is_alive())
+
+    def update_file(self, path: str) -> bool:
+        """Index or re-index a single file; returns False if it is not a media file"""
+        path = os.path.abspath(path)
+        if not path.lower().endswith(MEDIA_EXTENSIONS):
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.remove_path(path)
+            return False
+        with self._get_cursor() as c:
+            self._upsert(c, [self._track_row(path, stat)])
+        return True
+
+    def apply_changes(self, changes: Dict[str, str]) -> Dict[str, int]:
+        """Apply a batch of {path: 'created' | 'modified' | 'deleted'} changes in one transaction.
+
+        Folders that appeared (e.g. moved in whole) are scanned.
+        """
+        rows, removed, folders = [], [], []
+        for path, kind in changes.items():
+            path = os.path.abspath(path)
+            if kind == 'deleted':
+                removed.append(path)
+            elif os.path.isdir(path):
+                folders.append(path)
+            elif path.lower().endswith(MEDIA_EXTENSIONS):
+                try:
+                    rows.append(self._track_row(path, os.stat(path)))
+                except OSError:
+                    removed.append(path)
+
+        with self.scan_lock:
+            with self._get_cursor() as c:
+                for path in removed:
+                    c.execute("DELETE FROM tracks WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+                              (path, self._like_prefix(path)))
+                if rows:
+                    self._upsert(c, rows)
+        stats = {'updated': len(rows), 'removed': len(removed)}
+        for folder in folders:
+            stats['updated'] += self.scan(folder)['updated']
+        return stats
+
+    def remove_path(self, path: str) -> int:
+        """Drop a file, or every file under a folder, from the index"""
+        path = os.path.abspath(path)
+        with self._get_cursor() as c:
+            c.execute("DELETE FROM tracks WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+                      (path, self._like_prefix(path)))
+            return c.rowcount
+
+    # Lookups
+
+    def _like_prefix(self, folder: str) -> str:
+        escaped = folder.rstrip(os.sep).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return escaped + ('\\\\' if os.sep == '\\' else os.sep) + '%'
+
+    def _fts_query(self, text: str, column: Optional[str] = None) -> Optional[str]:
+        """Turn free text into an FTS5 query that prefix-matches every word"""
+        words = re.findall(r'\w+', text.lower())
+        if not words:
+            return None
+        query = ' '.join(f'"{word}"*' for word in words)
+        return f"{column} : ({query})" if column else query
+
+    def _rows_to_tracks(self, rows) -> List[Dict[str, Any]]:
+        fields = ('path', 'title', 'artist', 'album', 'duration')
+        return [dict(zip(fields, row)) for row in rows]
+
+    def search(self, text: str, field: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Find tracks whose title, artist, album or file name match text, best matches first.
+
+        field restricts matching to one of 'title', 'artist' or 'album'.
+        """
+        if field not in (None, 'title', 'artist', 'album'):
+            raise ValueError(f"Unknown media field: {field}")
+
+        with self._get_cursor() as c:
+            if self.fts_enabled:
+                query = self._fts_query(text, field)
+                if not query:
+                    return []
+                c.execute('''SELECT t.path, t.title, t.artist, t.album, t.duration
+                            FROM tracks_fts JOIN tracks t ON t.id = tracks_fts.rowid
+                            WHERE tracks_fts MATCH ? ORDER BY bm25(tracks_fts, 10.0, 5.0, 2.0, 1.0)
+                            LIMIT ?''', (query, limit))
+            else:
+                pattern = f"%{text.strip()}%"
+                columns = [field] if field else ['title', 'artist', 'album', 'filename']
+                where = ' OR '.join(f"{column} LIKE ?" for column in columns)
+                c.execute(f'''SELECT path, title, artist, album, duration FROM tracks
+                            WHERE {where} LIMIT ?''', (*[pattern] * len(columns), limit))
+            return self._rows_to_tracks(c.fetchall())
+
+    def tracks_in_folder(self, folder: str, recursive: bool = False) -> List[Dict[str, Any]]:
+        """Indexed tracks in a folder, ordered by file name"""
+        folder = os.path.abspath(folder)
+        with self._get_cursor() as c:
+            if recursive:
+                c.execute('''SELECT path, title, artist, album, duration FROM tracks
+                            WHERE path LIKE ? ESCAPE '\\' ORDER BY path''', (self._like_prefix(folder),))
+            else:
+                c.execute('''SELECT path, title, artist, album, duration FROM tracks
+                            WHERE folder = ? ORDER BY filename''', (folder,))
+            return self._rows_to_tracks(c.fetchall())
+
+    def match_entries(self) -> List[tuple]:
+        """(path, "artist title") pairs for building a fuzzy matcher"""
+        with self._get_cursor() as c:
+            c.execute("SELECT path, artist, title, filename FROM tracks")
+            return [(path, f"{artist or ''} {title or filename}") for path, artist, title, filename in c.fetchall()]
+
+    def get_track(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._get_cursor() as c:
+            c.execute("SELECT path, title, artist, album, duration FROM tracks WHERE path = ?", (path,))
+            rows = self._rows_to_tracks(c.fetchall())
+        return rows[0] if rows else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._get_cursor() as c:
+            c.execute("SELECT COUNT(*), COUNT(DISTINCT artist), COALESCE(SUM(duration), 0) FROM tracks")
+            tracks, artists, duration = c.fetchone()
+        return {'tracks': tracks, 'artists': artists, 'total_duration': duration,
+                'fts_enabled': self.fts_enabled, 'scanning': self.is_scanning(), 'last_scan': self.last_scan}
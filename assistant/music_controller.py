@@ -1,12 +1,16 @@
 import webbrowser
 import urllib.parse
-import requests
-from bs4 import BeautifulSoup
-import re
-import pygame
 import os
-import glob
-import pyautogui
+import threading
+from .html_extraction import extract_youtube_video_ids
+from .media_library import MediaLibrary, MEDIA_EXTENSIONS
+from .file_watcher import shared_watcher, DELETED
+from .fuzzy_matcher import FuzzyMatcher
+from .playback_engine import PlaybackEngine, REPEAT_ALL
+from .lazy_import import lazy_import
+
+requests = lazy_import('requests')
+pyautogui = lazy_import('pyautogui')
 
 class MediaController:
     def __init__(self, config=None):
@@ -22,9 +26,18 @@ class MediaController:
         self.playlist = []
         self.current_track = 0
         self.paused = False
-        self.config = None  # Will be set after initialization
-        self.music_path = None
         self.is_system_control = False  # Flag to determine if we're controlling system media
+        self.library = MediaLibrary()
+        # Keeps the index and the loaded playlist current as files come and go
+        self.watcher = shared_watcher()
+        self.playlist_folder = None  # Folder the current playlist was loaded from, if any
+        self.playlist_lock = threading.Lock()
+        # Tolerates transcription mistakes in spoken titles and artists
+        self.matcher = FuzzyMatcher()
+        self.matcher_thread = None
+        self.matcher_stale = False
+        # Loads and advances tracks on its own thread; controls here never block
+        self.engine = PlaybackEngine(on_track_change=self._on_track_change)
         
     def set_music_path(self):
         """Set the music path from config or use default"""
@@ -67,6 +80,11 @@ class MediaController:
             os.makedirs(self.music_path, exist_ok=True)
             
         print(f"Media path set to: {self.music_path}")
+        
+        # Bring the library index up to date without blocking startup
+        self.rebuild_matcher()
+        self.library.start_scan(self.music_path, callback=self._on_scan_complete)
+        self.watcher.watch(self.music_path, self._on_media_changes, extensions=MEDIA_EXTENSIONS)
     
     # Universal media control methods
     def play(self):
@@ -76,11 +94,11 @@ class MediaController:
         
         # Local playback logic
         if self.paused:
-            pygame.mixer.music.unpause()
-            self.paused = False
-        elif not pygame.mixer.music.get_busy() and self.playlist:
-            pygame.mixer.music.load(self.playlist[self.current_track])
-            pygame.mixer.music.play()
+            return self.resume()
+        if not self.engine.order and self.playlist:
+            self.engine.set_queue(self.playlist, self.current_track)
+        else:
+            self.engine.play()
         return True
     
     def pause(self):
@@ -89,9 +107,17 @@ class MediaController:
             return self.system_play_pause()
         
         # Local playback logic
-        if pygame.mixer.music.get_busy() and not self.paused:
-            pygame.mixer.music.pause()
-            self.paused = True
+        self.engine.pause()
+        self.paused = True
+        return True
+    
+    def resume(self):
+        """Resume paused media (local or system)"""
+        if self.is_system_control:
+            return self.system_play_pause()
+        
+        self.engine.resume()
+        self.paused = False
         return True
     
     def stop(self):
@@ -100,7 +126,7 @@ class MediaController:
             return self.system_stop()
         
         # Local playback logic
-        pygame.mixer.music.stop()
+        self.engine.stop()
         self.paused = False
         return True
     
@@ -113,9 +139,8 @@ class MediaController:
         if not self.playlist:
             return False
             
-        self.current_track = (self.current_track + 1) % len(self.playlist)
-        pygame.mixer.music.load(self.playlist[self.current_track])
-        pygame.mixer.music.play()
+        self.engine.next()
+        self.paused = False
         return True
     
     def previous_track(self):
@@ -127,19 +152,27 @@ class MediaController:
         if not self.playlist:
             return False
             
-        self.current_track = (self.current_track - 1) % len(self.playlist)
-        pygame.mixer.music.load(self.playlist[self.current_track])
-        pygame.mixer.music.play()
+        self.engine.previous()
+        self.paused = False
         return True
     
+    def set_shuffle(self, enabled=None):
+        """Turn shuffle on or off, or toggle it when enabled is None; returns the new setting"""
+        enabled = not self.engine.shuffle if enabled is None else enabled
+        self.engine.set_shuffle(enabled)
+        return enabled
+    
+    def set_repeat(self, mode=REPEAT_ALL):
+        """Set repeat to 'off', 'one' (current track) or 'all' (whole playlist)"""
+        self.engine.set_repeat(mode)
+        return mode
+    
     def volume_up(self):
         """Increase volume (local or system)"""
         if self.is_system_control:
             return self.system_volume_up()
         
-        # Local volume control would go here
-        current_volume = pygame.mixer.music.get_volume()
-        pygame.mixer.music.set_volume(min(current_volume + 0.1, 1.0))
+        self.engine.adjust_volume(0.1)
         return True
     
     def volume_down(self):
@@ -147,9 +180,7 @@ class MediaController:
         if self.is_system_control:
             return self.system_volume_down()
         
-        # Local volume control would go here
-        current_volume = pygame.mixer.music.get_volume()
-        pygame.mixer.music.set_volume(max(current_volume - 0.1, 0.0))
+        self.engine.adjust_volume(-0.1)
         return True
     
     def set_volume(self, level):
@@ -159,10 +190,13 @@ class MediaController:
             return False
         
         # Local volume control
-        volume = max(0, min(level, 100)) / 100.0
-        pygame.mixer.music.set_volume(volume)
+        self.engine.set_volume(max(0, min(level, 100)) / 100.0)
         return True
     
+    def _on_track_change(self, index, path):
+        self.current_track = index
+        self.paused = False
+    
     # System-specific media control methods
     def system_play_pause(self):
         """Send play/pause media key to control system-wide media playback"""
@@ -208,15 +242,109 @@ class MediaController:
             folder_path = self.music_path
             
         print(f"Loading playlist from: {folder_path}")
-        self.playlist = []
+        folder_path = os.path.abspath(folder_path)
+        playlist = [track['path'] for track in self.library.tracks_in_folder(folder_path)]
+        
+        if not playlist:
+            # Folder not indexed yet (or outside the library): list it directly
+            try:
+                with os.scandir(folder_path) as entries:
+                    playlist = sorted(entry.path for entry in entries
+                                      if entry.is_file() and entry.name.lower().endswith(MEDIA_EXTENSIONS))
+            except OSError as e:
+                print(f"Error loading playlist: {str(e)}")
         
-        # Find all media files
-        for ext in ['.mp3', '.wav', '.ogg', '.mp4', '.avi', '.mkv']:
-            self.playlist.extend(glob.glob(os.path.join(folder_path, f"*{ext}")))
+        with self.playlist_lock:
+            self.playlist = playlist
+            self.playlist_folder = folder_path
             
         print(f"Found {len(self.playlist)} media files")
         return len(self.playlist) > 0
     
+    def find_media_files(self, media_name, field=None):
+        """Find media files by name (or by artist/album with field) using the library index"""
+        if self.music_path is None:
+            self.set_music_path()
+            
+        matches = [track['path'] for track in self.library.search(media_name, field=field)]
+        if matches:
+            return matches
+        
+        if field is None:
+            # Nothing matches every word: rank near misses instead
+            matches = [path for path, _ in self.matcher.search(media_name, limit=20)]
+        if matches or not self.library.is_scanning():
+            return matches
+        
+        # The first scan is still running: fall back to matching file names in the loaded folder
+        if not self.playlist:
+            self.load_playlist()
+        return [media_path for media_path in self.playlist
+                if media_name.lower() in os.path.basename(media_path).lower()]
+    
+    def rebuild_matcher(self):
+        """Rebuild the fuzzy matcher from the library index in the background"""
+        if self.matcher_thread and self.matcher_thread.is_alive():
+            self.matcher_stale = True  # Rebuild again once the running build finishes
+            return
+        
+        def build():
+            while True:
+                self.matcher_stale = False
+                try:
+                    self.matcher.build(self.library.match_entries())
+                except Exception as e:
+                    print(f"Error building media matcher: {str(e)}")
+                if not self.matcher_stale:
+                    break
+        
+        self.matcher_thread = threading.Thread(target=build, daemon=True)
+        self.matcher_thread.start()
+    
+    def _on_scan_complete(self, stats):
+        if stats['updated'] or stats['removed']:
+            self.rebuild_matcher()
+    
+    def _play_matches(self, matches, folder=None):
+        with self.playlist_lock:
+            self.current_track = 0
+            self.playlist = matches
+            self.playlist_folder = folder
+        self.engine.set_queue(matches)
+        self.paused = False
+        return True
+    
+    def _on_media_changes(self, changes):
+        """Apply a debounced batch of file changes to the library index and the loaded playlist"""
+        try:
+            stats = self.library.apply_changes(changes)
+            print(f"Media library updated: {stats}")
+            self.rebuild_matcher()
+        except Exception as e:
+            print(f"Error updating media library: {str(e)}")
+        
+        removed = [path for path, kind in changes.items() if kind == DELETED]
+        with self.playlist_lock:
+            previous_playlist = self.playlist
+            current_path = self.playlist[self.current_track] if self.playlist else None
+            playlist = [media_path for media_path in self.playlist
+                        if not any(media_path == path or media_path.startswith(path + os.sep) for path in removed)]
+            if self.playlist_folder:
+                added = [path for path, kind in changes.items()
+                         if kind != DELETED and os.path.dirname(path) == self.playlist_folder
+                         and path.lower().endswith(MEDIA_EXTENSIONS) and path not in playlist]
+                playlist = sorted(playlist + added)
+            
+            # Keep pointing at the track that was current
+            if current_path in playlist:
+                self.current_track = playlist.index(current_path)
+            else:
+                self.current_track = min(self.current_track, max(len(playlist) - 1, 0))
+            self.playlist = playlist
+        
+        if playlist != previous_playlist and self.engine.tracks == previous_playlist:
+            self.engine.update_queue(playlist)
+    
     def play_media(self, media_name):
         """Play media by name"""
         try:
@@ -226,57 +354,31 @@ class MediaController:
                 return False
                 
             # Load and play the first match
-            pygame.mixer.music.load(matches[0])
-            pygame.mixer.music.play()
-            self.current_track = 0
-            self.playlist = matches
-            return True
+            return self._play_matches(matches)
         except Exception as e:
             print(f"Error playing media: {str(e)}")
             return False
-        if self.music_path is None:
-            self.set_music_path()
-            
-        # Find the media in the directory
-        for ext in ['.mp3', '.wav', '.ogg', '.mp4', '.avi', '.mkv']:
-            matches = glob.glob(os.path.join(self.music_path, f"*{media_name}*{ext}"))
-            if matches:
-                pygame.mixer.music.load(matches[0])
-                pygame.mixer.music.play()
-                return True
-                
-        # If not found, try loading playlist and finding there
-        if not self.playlist:
-            self.load_playlist()
-            
-        for media_path in self.playlist:
-            if media_name.lower() in os.path.basename(media_path).lower():
-                pygame.mixer.music.load(media_path)
-                pygame.mixer.music.play()
-                return True
-                
-        return False
     
-    def play_by_artist(self, artist_name):
-        """Play media by a specific artist"""
-        if self.music_path is None:
-            self.set_music_path()
-            
-        # Load playlist if not already loaded
-        if not self.playlist:
-            self.load_playlist()
-            
-        # Find media by artist
-        artist_media = []
-        for media_path in self.playlist:
-            if artist_name.lower() in os.path.basename(media_path).lower():
-                artist_media.append(media_path)
-                
-        if artist_media:
-            pygame.mixer.music.load(artist_media[0])
-            pygame.mixer.music.play()
-            return True
-        return False
+    def play_by_artist(self, artist_name, title=None):
+        """Play media by a specific artist, optionally a specific title of theirs"""
+        try:
+            if title:
+                # "beat it by michael jackson": rank tracks on title and artist together
+                artist_media = self.find_media_files(f"{title} {artist_name}")
+            else:
+                # Artist tags first, then file names such as "Artist - Title.mp3"
+                artist_media = self.find_media_files(artist_name, field='artist') or self.find_media_files(artist_name)
+                if artist_media and not self.library.search(artist_name, field='artist', limit=1):
+                    # Fuzzy hit: play everything by the artist it resolved to
+                    track = self.library.get_track(artist_media[0])
+                    if track and track['artist']:
+                        artist_media = self.find_media_files(track['artist'], field='artist') or artist_media
+            if artist_media:
+                return self._play_matches(artist_media)
+            return False
+        except Exception as e:
+            print(f"Error playing media by artist: {str(e)}")
+            return False
     
     def play_playlist(self, playlist_name):
         """Play a specific playlist"""
@@ -287,9 +389,7 @@ class MediaController:
         playlist_path = os.path.join(self.music_path, playlist_name)
         if os.path.isdir(playlist_path):
             if self.load_playlist(playlist_path):
-                pygame.mixer.music.load(self.playlist[0])
-                pygame.mixer.music.play()
-                return True
+                return self._play_matches(self.playlist, folder=self.playlist_folder)
         return False
     
     def toggle_control_mode(self):
@@ -327,12 +427,11 @@ class MediaController:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
-            response = requests.get(url, headers=headers)
+            response = requests.get(url, headers=headers, timeout=10)
             
             # Parse the response
             if response.status_code == 200:
-                # Extract video ID using regex
-                video_ids = re.findall(r"watch\?v=(\S{11})", response.text)
+                video_ids = extract_youtube_video_ids(response.text)
                 if video_ids:
                     # Return the URL of the first video
                     return f"https://www.youtube.com/watch?v={video_ids[0]}"
@@ -1,7 +1,10 @@
-import requests
 import json
-from datetime import datetime
+from collections import Counter
 import threading
+from .cache import TTLCache, CACHE_DIR
+from .lazy_import import lazy_import
+
+requests = lazy_import('requests')
 
 class NewsService:
     def __init__(self, container=None):
@@ -11,6 +14,7 @@ class NewsService:
         
         # Get API key from config
         self.api_key = self.config_manager.config.get('news_api_key', '') if self.config_manager else ''
+        news_config = self.config_manager.config.get('news', {}) if self.config_manager else {}
         self.base_url = "https://newsapi.org/v2/"
         
         # News categories
@@ -34,10 +38,119 @@ class NewsService:
             "br": "Brazil"
         }
         
-        # Cache for news
-        self.news_cache = {}
-        self.cache_expiry = 30 * 60  # 30 minutes in seconds
-        self.last_fetch_time = {}
+        # Cache for news; stale entries are served while a refresh runs in the background
+        self.cache_expiry = news_config.get('cache_ttl_minutes', 30) * 60
+        self.news_cache = TTLCache(
+            max_entries=news_config.get('cache_max_entries', 64),
+            ttl=self.cache_expiry,
+            persist_path=CACHE_DIR / 'news.json'
+        )
+        self.refreshing = {}  # cache key -> callbacks waiting on the in-flight refresh
+        self.refresh_lock = threading.Lock()
+        
+        # Track the most requested country/category pairs for prefetching
+        self.request_counts_file = CACHE_DIR / 'news_requests.json'
+        self.request_counts = Counter(self._load_request_counts())
+        self.prefetch_interval = news_config.get('prefetch_interval_minutes', 20) * 60
+        self.prefetch_top = news_config.get('prefetch_top', 3)
+        self.prefetch_timer = None
+        if self.api_key and news_config.get('prefetch', True):
+            # First pass shortly after startup, then on the regular interval
+            self.start_prefetch(delay=5)
+    
+    def _load_request_counts(self):
+        """Load request counts persisted alongside the cache"""
+        try:
+            if self.request_counts_file.exists():
+                with open(self.request_counts_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error loading news request counts: {str(e)}")
+        return {}
+    
+    def _save_cache(self):
+        """Persist cached headlines and request counts to disk"""
+        self.news_cache.save()
+        try:
+            with open(self.request_counts_file, 'w', encoding='utf-8') as f:
+                json.dump(dict(self.request_counts), f)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error saving news request counts: {str(e)}")
+    
+    def _headlines_key(self, country, category, query):
+        return f"headlines_{country}_{category}_{query}"
+    
+    def _process_articles(self, articles):
+        """Reduce API articles to the fields the assistant uses"""
+        processed_articles = []
+        for article in articles:
+            processed_articles.append({
+                "title": article.get("title", ""),
+                "description": article.get("description", ""),
+                "source": (article.get("source") or {}).get("name", ""),
+                "url": article.get("url", ""),
+                "published_at": article.get("publishedAt", ""),
+                "content": article.get("content", "")
+            })
+        return processed_articles
+    
+    def _fetch_articles(self, endpoint, params):
+        """Fetch and process articles, returning None on failure so errors are not cached"""
+        try:
+            response = requests.get(f"{self.base_url}{endpoint}", params=params, timeout=10)
+            data = response.json()
+            
+            if response.status_code == 200 and data.get("status") == "ok":
+                return self._process_articles(data.get("articles", []))
+            
+            error_message = f"Error fetching news: {data.get('message', 'Unknown error')}"
+            if self.logger:
+                self.logger.error(error_message)
+            return None
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"News API error: {str(e)}")
+            return None
+    
+    def _refresh(self, cache_key, endpoint, params, callback=None):
+        """Fetch articles for a cache key and store them, joining any refresh already in flight"""
+        with self.refresh_lock:
+            if cache_key in self.refreshing:
+                if callback:
+                    self.refreshing[cache_key].append(callback)
+                return None
+            self.refreshing[cache_key] = [callback] if callback else []
+        articles = None
+        try:
+            articles = self._fetch_articles(endpoint, params)
+            if articles is not None:
+                self.news_cache.set(cache_key, articles)
+                self._save_cache()
+            return articles
+        finally:
+            with self.refresh_lock:
+                callbacks = self.refreshing.pop(cache_key, [])
+            for waiting_callback in callbacks:
+                waiting_callback(articles)
+    
+    def _refresh_in_background(self, cache_key, endpoint, params, callback=None):
+        threading.Thread(target=self._refresh, args=(cache_key, endpoint, params, callback),
+                         daemon=True).start()
+    
+    def _headline_params(self, country, category, query):
+        params = {
+            "country": country,
+            "apiKey": self.api_key
+        }
+        
+        if category:
+            params["category"] = category
+            
+        if query:
+            params["q"] = query
+        return params
     
     def get_top_headlines(self, country="us", category=None, query=None, max_results=5):
         """
@@ -52,61 +165,21 @@ class NewsService:
         Returns:
             list: List of news articles
         """
-        # Check if we have cached results that are still valid
-        cache_key = f"headlines_{country}_{category}_{query}"
-        current_time = datetime.now().timestamp()
+        cache_key = self._headlines_key(country, category, query)
+        if not query:
+            self.request_counts[f"{country}|{category or ''}"] += 1
+        params = self._headline_params(country, category, query)
         
-        if (cache_key in self.news_cache and 
-            cache_key in self.last_fetch_time and
-            current_time - self.last_fetch_time[cache_key] < self.cache_expiry):
-            return self.news_cache[cache_key][:max_results]
-        
-        # Build request parameters
-        params = {
-            "country": country,
-            "apiKey": self.api_key
-        }
-        
-        if category:
-            params["category"] = category
-            
-        if query:
-            params["q"] = query
+        # Serve cached results immediately; refresh stale ones in the background
+        entry = self.news_cache.get_entry(cache_key)
+        if entry is not None:
+            articles, age = entry
+            if age > self.cache_expiry:
+                self._refresh_in_background(cache_key, "top-headlines", params)
+            return articles[:max_results]
         
-        try:
-            response = requests.get(f"{self.base_url}top-headlines", params=params)
-            data = response.json()
-            
-            if response.status_code == 200 and data.get("status") == "ok":
-                articles = data.get("articles", [])
-                
-                # Process articles
-                processed_articles = []
-                for article in articles:
-                    processed_articles.append({
-                        "title": article.get("title", ""),
-                        "description": article.get("description", ""),
-                        "source": article.get("source", {}).get("name", ""),
-                        "url": article.get("url", ""),
-                        "published_at": article.get("publishedAt", ""),
-                        "content": article.get("content", "")
-                    })
-                
-                # Cache the results
-                self.news_cache[cache_key] = processed_articles
-                self.last_fetch_time[cache_key] = current_time
-                
-                return processed_articles[:max_results]
-            else:
-                error_message = f"Error fetching news: {data.get('message', 'Unknown error')}"
-                if self.logger:
-                    self.logger.error(error_message)
-                return []
-                
-        except Exception as e:
-            if self.logger:
-                self.logger.error(f"News API error: {str(e)}")
-            return []
+        articles = self._refresh(cache_key, "top-headlines", params)
+        return (articles or [])[:max_results]
     
     def get_everything(self, query, sources=None, domains=None, from_date=None, to_date=None, language="en", sort_by="publishedAt", max_results=5):
         """
@@ -125,14 +198,7 @@ class NewsService:
         Returns:
             list: List of news articles
         """
-        # Check if we have cached results that are still valid
         cache_key = f"everything_{query}_{sources}_{domains}_{from_date}_{to_date}_{language}_{sort_by}"
-        current_time = datetime.now().timestamp()
-        
-        if (cache_key in self.news_cache and 
-            cache_key in self.last_fetch_time and
-            current_time - self.last_fetch_time[cache_key] < self.cache_expiry):
-            return self.news_cache[cache_key][:max_results]
         
         # Build request parameters
         params = {
@@ -154,40 +220,15 @@ class NewsService:
         if to_date:
             params["to"] = to_date
         
-        try:
-            response = requests.get(f"{self.base_url}everything", params=params)
-            data = response.json()
-            
-            if response.status_code == 200 and data.get("status") == "ok":
-                articles = data.get("articles", [])
-                
-                # Process articles
-                processed_articles = []
-                for article in articles:
-                    processed_articles.append({
-                        "title": article.get("title", ""),
-                        "description": article.get("description", ""),
-                        "source": article.get("source", {}).get("name", ""),
-                        "url": article.get("url", ""),
-                        "published_at": article.get("publishedAt", ""),
-                        "content": article.get("content", "")
-                    })
-                
-                # Cache the results
-                self.news_cache[cache_key] = processed_articles
-                self.last_fetch_time[cache_key] = current_time
-                
-                return processed_articles[:max_results]
-            else:
-                error_message = f"Error fetching news: {data.get('message', 'Unknown error')}"
-                if self.logger:
-                    self.logger.error(error_message)
-                return []
-                
-        except Exception as e:
-            if self.logger:
-                self.logger.error(f"News API error: {str(e)}")
-            return []
+        entry = self.news_cache.get_entry(cache_key)
+        if entry is not None:
+            articles, age = entry
+            if age > self.cache_expiry:
+                self._refresh_in_background(cache_key, "everything", params)
+            return articles[:max_results]
+        
+        articles = self._refresh(cache_key, "everything", params)
+        return (articles or [])[:max_results]
     
     def get_news_sources(self, category=None, language=None, country=None):
         """
@@ -216,7 +257,7 @@ class NewsService:
             params["country"] = country
         
         try:
-            response = requests.get(f"{self.base_url}sources", params=params)
+            response = requests.get(f"{self.base_url}sources", params=params, timeout=10)
             data = response.json()
             
             if response.status_code == 200 and data.get("status") == "ok":
@@ -250,7 +291,34 @@ class NewsService:
     def get_news_summary(self, country="us", category=None, max_results=5):
         """Get a formatted summary of top news"""
         articles = self.get_top_headlines(country, category, max_results=max_results)
+        return self._format_summary(articles, country, category)
+    
+    def get_cached_summary(self, country="us", category=None, max_results=5):
+        """Get a summary from cache only, or None if nothing has been cached yet"""
+        entry = self.news_cache.get_entry(self._headlines_key(country, category, None))
+        if entry is None:
+            return None
+        return self._format_summary(entry[0][:max_results], country, category)
+    
+    def refresh_summary_async(self, country="us", category=None, callback=None, max_results=5):
+        """Refresh headlines in the background and pass the new summary to callback"""
+        self.request_counts[f"{country}|{category or ''}"] += 1
         
+        cache_key = self._headlines_key(country, category, None)
+        
+        def on_refreshed(articles):
+            if not callback:
+                return
+            if articles is not None:
+                callback(self._format_summary(articles[:max_results], country, category))
+            elif cache_key not in self.news_cache:
+                # Nothing to fall back on, so report the failure
+                callback(self._format_summary([], country, category))
+        
+        self._refresh_in_background(cache_key, "top-headlines",
+                                    self._headline_params(country, category, None), on_refreshed)
+    
+    def _format_summary(self, articles, country, category):
         if not articles:
             return "Sorry, I couldn't fetch the latest news at this time."
         
@@ -264,4 +332,32 @@ class NewsService:
             source = article.get("source", "")
             summary += f"{i}. {title} ({source})\n"
         
-        return summary
\ No newline at end of file
+        return summary
+    
+    def start_prefetch(self, delay=None):
+        """Periodically refresh the most requested headline combinations"""
+        self.stop_prefetch()
+        self.prefetch_timer = threading.Timer(
+            self.prefetch_interval if delay is None else delay, self._prefetch_cycle)
+        self.prefetch_timer.daemon = True
+        self.prefetch_timer.start()
+    
+    def stop_prefetch(self):
+        if self.prefetch_timer:
+            self.prefetch_timer.cancel()
+            self.prefetch_timer = None
+    
+    def _prefetch_cycle(self):
+        try:
+            self.prefetch_popular()
+        finally:
+            self.start_prefetch()
+    
+    def prefetch_popular(self):
+        """Refresh the top requested country/category pairs that are stale or missing"""
+        for combo, _ in self.request_counts.most_common(self.prefetch_top):
+            country, _, category = combo.partition("|")
+            category = category or None
+            cache_key = self._headlines_key(country, category, None)
+            if not self.news_cache.is_fresh(cache_key):
+                self._refresh(cache_key, "top-headlines", self._headline_params(country, category, None))
@@ -0,0 +1,83 @@
+import os
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+ALLOW = 'allow'
+BLOCK = 'block'
+
+# Substrings that mark a path as off limits wherever they appear
+SUSPICIOUS_PATTERNS = ('%temp%', 'system32', 'windows')
+
+
+class PathPolicy:
+    """Precompiled allow/block decisions for filesystem paths.
+
+    Allowed and blocked roots are stored in a trie keyed by path component,
+    and the deepest root above a path decides: a blocked root inside an
+    allowed one is blocked, and an allowed root inside a blocked one is
+    allowed. If no allowed roots are configured, everything not blocked is
+    allowed. Matching is case-insensitive and by whole components, so
+    blocking /bin does not block /binaries. The decision for each directory
+    is memoized, so checking the entries of a directory costs one cache hit
+    plus a look at the entry's own name.
+    """
+
+    def __init__(self, blocked_roots: Iterable[str] = (), allowed_roots: Iterable[str] = (),
+                 suspicious_patterns: Iterable[str] = SUSPICIOUS_PATTERNS, cache_size: int = 4096):
+        self.trie: Dict[str, Any] = {'rule': None, 'children': {}}
+        self.suspicious_patterns = tuple(pattern.lower() for pattern in suspicious_patterns)
+        self.has_allowed_roots = False
+        for root in blocked_roots:
+            self._add_root(root, BLOCK)
+        for root in allowed_roots:
+            self._add_root(root, ALLOW)
+            self.has_allowed_roots = True
+        self._directory_decision = lru_cache(maxsize=cache_size)(self._decide_directory)
+
+    def _normalize(self, path: str) -> str:
+        return os.path.abspath(os.path.expandvars(os.path.expanduser(path))).lower()
+
+    def _components(self, key: str) -> Tuple[str, ...]:
+        drive, rest = os.path.splitdrive(key)
+        parts = [part for part in rest.replace('\\', '/').split('/') if part]
+        return (drive,) + tuple(parts) if drive else tuple(parts)
+
+    def _add_root(self, root: str, rule: str):
+        if not root:
+            return
+        node = self.trie
+        for part in self._components(self._normalize(root)):
+            node = node['children'].setdefault(part, {'rule': None, 'children': {}})
+        node['rule'] = rule
+
+    def _is_suspicious(self, text: str) -> bool:
+        return any(pattern in text for pattern in self.suspicious_patterns)
+
+    def _decide_directory(self, key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """(allowed, trie node for key or None) for a normalized directory"""
+        node, rule = self.trie, self.trie['rule']
+        for part in self._components(key):
+            node = node['children'].get(part) if node else None
+            if node and node['rule']:
+                rule = node['rule']
+        allowed = rule == ALLOW or (rule is None and not self.has_allowed_roots)
+        return allowed and not self._is_suspicious(key), node
+
+    def is_allowed(self, path: str) -> bool:
+        key = self._normalize(path)
+        parent, name = os.path.split(key)
+        if not name:
+            return self._directory_decision(key)[0]
+
+        allowed, node = self._directory_decision(parent)
+        child = node['children'].get(name) if node else None
+        if child and child['rule']:
+            allowed = child['rule'] == ALLOW and not self._is_suspicious(parent)
+        return allowed and not self._is_suspicious(name)
+
+    def clear_cache(self):
+        self._directory_decision.cache_clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        info = self._directory_decision.cache_info()
+        return {'hits': info.hits, 'misses': info.misses, 'cached_directories': info.currsize}
@@ -0,0 +1,308 @@
+import os
+import queue
+import random
+import threading
+import logging
+from typing import Callable, Dict, List, Optional
+
+from .lazy_import import lazy_import
+
+pygame = lazy_import('pygame')
+
+REPEAT_OFF = 'off'
+REPEAT_ONE = 'one'
+REPEAT_ALL = 'all'
+
+
+def _pygame_error():
+    """pygame.error for an except clause, or an empty tuple (matching nothing) if pygame cannot be imported"""
+    try:
+        return pygame.error
+    except ImportError:
+        return ()
+
+
+class PlaybackEngine:
+    """Plays a track queue on pygame.mixer.music from its own worker thread.
+
+    Control methods only enqueue a request and return immediately, so file
+    loading never happens on the command thread. While a track plays, the
+    next one is read ahead into the OS cache and handed to
+    pygame.mixer.music.queue(), so the mixer switches to it without a gap;
+    the worker notices the switch from get_pos() restarting and queues the
+    one after. If queueing is unavailable, the next track is started as
+    soon as the mixer goes idle. Only the worker changes the queue state;
+    it swaps tracks, order and position under state_lock so status reads
+    from other threads see them consistently.
+    """
+
+    def __init__(self, on_track_change: Optional[Callable[[int, str], None]] = None, poll_interval: float = 0.1):
+        self.on_track_change = on_track_change
+        self.poll_interval = poll_interval
+        self.tracks: List[str] = []
+        self.order: List[int] = []  # Play order as indexes into tracks
+        self.position = 0  # Index into order
+        self.shuffle = False
+        self.repeat = REPEAT_OFF
+        self.playing = False
+        self.paused = False
+        self.queued_position = None  # Position handed to mixer.music.queue, if any
+        self.last_pos = 0
+        self.state_lock = threading.Lock()
+        self.commands = queue.Queue()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    # Non-blocking controls
+
+    def set_queue(self, tracks: List[str], start_index: int = 0, play: bool = True):
+        self.commands.put(('set_queue', (list(tracks), start_index, play)))
+
+    def update_queue(self, tracks: List[str]):
+        """Replace the tracks without interrupting the current one"""
+        self.commands.put(('update_queue', (list(tracks),)))
+
+    def play(self):
+        self.commands.put(('play', ()))
+
+    def pause(self):
+        self.commands.put(('pause', ()))
+
+    def resume(self):
+        self.commands.put(('resume', ()))
+
+    def stop(self):
+        self.commands.put(('stop', ()))
+
+    def next(self):
+        self.commands.put(('skip', (1,)))
+
+    def previous(self):
+        self.commands.put(('skip', (-1,)))
+
+    def set_shuffle(self, enabled: bool):
+        self.commands.put(('set_shuffle', (enabled,)))
+
+    def set_repeat(self, mode: str):
+        if mode not in (REPEAT_OFF, REPEAT_ONE, REPEAT_ALL):
+            raise ValueError(f"Unknown repeat mode: {mode}")
+        self.commands.put(('set_repeat', (mode,)))
+
+    def set_volume(self, volume: float):
+        self.commands.put(('set_volume', (max(0.0, min(volume, 1.0)),)))
+
+    def adjust_volume(self, delta: float):
+        self.commands.put(('adjust_volume', (delta,)))
+
+    def current_index(self) -> Optional[int]:
+        """Index into tracks of the current track"""
+        with self.state_lock:
+            return self._current_index()
+
+    def _current_index(self) -> Optional[int]:
+        if not self.order:
+            return None
+        return self.order[min(self.position, len(self.order) - 1)]
+
+    def get_status(self) -> Dict[str, object]:
+        with self.state_lock:
+            index = self._current_index()
+            track = self.tracks[index] if index is not None and index < len(self.tracks) else None
+            position, length = self.position, len(self.order)
+        return {
+            'track': track,
+            'position': position,
+            'length': length,
+            'playing': self.playing,
+            'paused': self.paused,
+            'shuffle': self.shuffle,
+            'repeat': self.repeat,
+            'next_queued': self.queued_position is not None
+        }
+
+    # Worker
+
+    def _run(self):
+        while True:
+            try:
+                name, args = self.commands.get(timeout=self.poll_interval)
+            except queue.Empty:
+                name, args = None, ()
+            try:
+                if name:
+                    getattr(self, f"_do_{name}")(*args)
+                self._check_progress()
+            except _pygame_error() as e:
+                logging.error(f"Playback error: {str(e)}")
+                self.playing = False
+            except Exception as e:
+                # Including a missing pygame: the worker must survive so later commands are still handled
+                logging.error(f"Playback engine error: {str(e)}")
+
+    def _ensure_mixer(self):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+
+    def _build_order(self, keep_index: Optional[int], tracks: Optional[List[str]] = None):
+        """Rebuild the play order, optionally for new tracks, keeping keep_index current"""
+        tracks = self.tracks if tracks is None else tracks
+        order = list(range(len(tracks)))
+        if self.shuffle:
+            random.shuffle(order)
+            if keep_index is not None and keep_index in order:
+                # Current track stays first so shuffling never interrupts it
+                order.remove(keep_index)
+                order.insert(0, keep_index)
+        with self.state_lock:
+            self.tracks, self.order = tracks, order
+            self.position = order.index(keep_index) if keep_index in order else 0
+
+    def _next_position(self, step: int = 1, manual: bool = False) -> Optional[int]:
+        if not self.order:
+            return None
+        if self.repeat == REPEAT_ONE and not manual:
+            return self.position
+        position = self.position + step
+        if 0 <= position < len(self.order):
+            return position
+        if self.repeat == REPEAT_ALL or manual:
+            return position % len(self.order)
+        return None
+
+    def _start(self, position: int):
+        self._ensure_mixer()
+        with self.state_lock:
+            self.position = position
+        path = self.tracks[self.order[position]]
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.play()
+        self.playing, self.paused = True, False
+        self.last_pos = 0
+        self.queued_position = None
+        self._notify()
+        self._queue_next()
+
+    def _queue_next(self):
+        """Hand the following track to the mixer so it starts without a gap"""
+        position = self._next_position()
+        if position is None:
+            return
+        path = self.tracks[self.order[position]]
+        self._read_ahead(path)
+        try:
+            pygame.mixer.music.queue(path)
+            self.queued_position = position
+        except _pygame_error() as e:
+            # Format the mixer cannot queue: start it when the current track ends instead
+            logging.debug(f"Could not queue {path}: {str(e)}")
+            self.queued_position = None
+
+    def _read_ahead(self, path: str):
+        """Pull the file into the OS page cache so the switch does not wait on the disk"""
+        def read():
+            try:
+                with open(path, 'rb') as f:
+                    while f.read(1 << 20):
+                        pass
+            except OSError:
+                pass
+        threading.Thread(target=read, daemon=True).start()
+
+    def _check_progress(self):
+        if not self.playing or self.paused or not pygame.mixer.get_init():
+            return
+        if not pygame.mixer.music.get_busy():
+            # Track ended with nothing queued
+            position = self._next_position()
+            if position is None:
+                self.playing = False
+                self.queued_position = None
+            else:
+                self._start(position)
+            return
+
+        pos = pygame.mixer.music.get_pos()
+        if self.queued_position is not None and 0 <= pos < self.last_pos:
+            # The mixer moved on to the queued track
+            with self.state_lock:
+                self.position = self.queued_position
+            self.queued_position = None
+            self._notify()
+            self._queue_next()
+        self.last_pos = pos
+
+    def _notify(self):
+        if self.on_track_change and self.order:
+            index = self.order[self.position]
+            try:
+                self.on_track_change(index, self.tracks[index])
+            except Exception as e:
+                logging.error(f"Track change callback failed: {str(e)}")
+
+    def _do_set_queue(self, tracks, start_index, play):
+        existing = [path for path in tracks if os.path.exists(path)] if tracks else []
+        start_index = tracks[start_index] if tracks and 0 <= start_index < len(tracks) else None
+        keep_index = existing.index(start_index) if start_index in existing else (0 if existing else None)
+        self._build_order(keep_index, existing)
+        if play and self.order:
+            self._start(self.position)
+        elif not self.order:
+            self._do_stop()
+
+    def _do_update_queue(self, tracks):
+        current = self._current_index()
+        current_path = self.tracks[current] if current is not None and current < len(self.tracks) else None
+        tracks = list(tracks)
+        keep_index = tracks.index(current_path) if current_path in tracks else None
+        self._build_order(keep_index, tracks)
+        if self.playing and keep_index is not None:
+            # Re-queue, since the previously queued track may have gone
+            self._queue_next()
+
+    def _do_play(self):
+        if self.paused:
+            self._do_resume()
+        elif not self.playing and self.order:
+            self._start(self.position)
+
+    def _do_pause(self):
+        if self.playing and not self.paused:
+            pygame.mixer.music.pause()
+            self.paused = True
+
+    def _do_resume(self):
+        if self.paused:
+            pygame.mixer.music.unpause()
+            self.paused = False
+
+    def _do_stop(self):
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop()
+        self.playing, self.paused = False, False
+        self.queued_position = None
+
+    def _do_skip(self, step):
+        position = self._next_position(step, manual=True)
+        if position is not None:
+            self._start(position)
+
+    def _do_set_shuffle(self, enabled):
+        if enabled == self.shuffle:
+            return
+        self.shuffle = enabled
+        self._build_order(self._current_index())
+        if self.playing:
+            self._queue_next()
+
+    def _do_set_repeat(self, mode):
+        self.repeat = mode
+        if self.playing:
+            self._queue_next()
+
+    def _do_set_volume(self, volume):
+        self._ensure_mixer()
+        pygame.mixer.music.set_volume(volume)
+
+    def _do_adjust_volume(self, delta):
+        self._ensure_mixer()
+        pygame.mixer.music.set_volume(max(0.0, min(pygame.mixer.music.get_volume() + delta, 1.0)))
@@ -0,0 +1,135 @@
+import time
+from collections import deque
+from threading import Lock
+from typing import Any, Dict, Optional
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker guarding a single provider"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, base_cooldown: float = 30.0, max_cooldown: float = 300.0):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.cooldown = base_cooldown
+        self.opened_at = 0.0
+        self.trial_in_progress = False
+
+    def _refresh(self):
+        """Move an open breaker to half-open once its cooldown has elapsed"""
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = self.HALF_OPEN
+            self.trial_in_progress = False
+
+    def can_attempt(self) -> bool:
+        """Check whether a request may be sent without reserving the trial slot"""
+        self._refresh()
+        if self.state == self.CLOSED:
+            return True
+        return self.state == self.HALF_OPEN and not self.trial_in_progress
+
+    def begin_attempt(self) -> bool:
+        """Reserve the right to send a request, claiming the trial slot when half-open"""
+        if not self.can_attempt():
+            return False
+        if self.state == self.HALF_OPEN:
+            self.trial_in_progress = True
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.cooldown = self.base_cooldown
+        self.trial_in_progress = False
+
+    def record_failure(self, error_rate_tripped: bool = False) -> bool:
+        """Record a failure and return True if the breaker has just opened"""
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN:
+            # Failed trial: back off harder before the next probe
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            return self._open()
+        if self.state == self.CLOSED and (self.consecutive_failures >= self.failure_threshold or error_rate_tripped):
+            return self._open()
+        return False
+
+    def _open(self) -> bool:
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.trial_in_progress = False
+        return True
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker will allow a trial request"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+
+class ProviderHealth:
+    """Rolling latency and error-rate statistics for one AI provider"""
+
+    def __init__(self, window: int = 50, min_samples: int = 5, max_error_rate: float = 0.5,
+                 failure_threshold: int = 3, base_cooldown: float = 30.0, max_cooldown: float = 300.0):
+        self.window = window
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.samples = deque(maxlen=window)
+        self.breaker = CircuitBreaker(failure_threshold, base_cooldown, max_cooldown)
+        self.lock = Lock()
+
+    def can_attempt(self) -> bool:
+        with self.lock:
+            return self.breaker.can_attempt()
+
+    def begin_attempt(self) -> bool:
+        with self.lock:
+            return self.breaker.begin_attempt()
+
+    def record_success(self, latency: float):
+        with self.lock:
+            self.samples.append((latency, True))
+            self.breaker.record_success()
+
+    def record_failure(self, latency: float) -> bool:
+        """Record a failed call and return True if it opened the breaker"""
+        with self.lock:
+            self.samples.append((latency, False))
+            return self.breaker.record_failure(self._error_rate() > self.max_error_rate)
+
+    def _error_rate(self) -> float:
+        if len(self.samples) < self.min_samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def p95_latency(self) -> Optional[float]:
+        """95th percentile latency of successful calls in the window"""
+        with self.lock:
+            latencies = sorted(latency for latency, ok in self.samples if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def retry_in(self) -> float:
+        with self.lock:
+            return self.breaker.retry_in()
+
+    def get_stats(self) -> Dict[str, Any]:
+        p95 = self.p95_latency()
+        with self.lock:
+            self.breaker._refresh()
+            return {
+                'state': self.breaker.state,
+                'samples': len(self.samples),
+                'error_rate': round(self._error_rate(), 3),
+                'p95_latency_ms': round(p95 * 1000, 1) if p95 is not None else None,
+                'consecutive_failures': self.breaker.consecutive_failures,
+                'retry_in': round(self.breaker.retry_in(), 1)
+            }
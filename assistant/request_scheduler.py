@@ -0,0 +1,247 @@
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock, Timer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class RateLimiter:
+    """Token bucket limiting how many requests a provider may start per minute"""
+
+    def __init__(self, requests_per_minute: float):
+        self.capacity = max(1.0, float(requests_per_minute))
+        self.refill_rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is available and return the time spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.refill_rate
+            time.sleep(delay)
+            waited += delay
+
+
+class ProviderMetrics:
+    """Queue depth and wait-time counters for a single provider"""
+
+    def __init__(self, window: int = 100):
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.submitted = 0
+        self.coalesced = 0
+        self.batched = 0
+        self.batches = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_times = deque(maxlen=window)
+
+    def snapshot(self) -> Dict[str, Any]:
+        waits = list(self.wait_times)
+        return {
+            'queue_depth': self.queue_depth,
+            'in_flight': self.in_flight,
+            'submitted': self.submitted,
+            'coalesced': self.coalesced,
+            'batched': self.batched,
+            'batches': self.batches,
+            'completed': self.completed,
+            'failed': self.failed,
+            'avg_wait_ms': round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+            'max_wait_ms': round(max(waits) * 1000, 2) if waits else 0.0
+        }
+
+
+class RequestScheduler:
+    """Coalesces identical in-flight prompts, micro-batches local model requests
+    and enforces per-provider concurrency limits and rate budgets"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.default_concurrency = config.get('default_concurrency', 2)
+        self.concurrency = config.get('max_concurrency', {})
+        self.rate_budgets = config.get('requests_per_minute', {})
+        self.batch_window = config.get('batch_window_ms', 20) / 1000.0
+        self.max_batch_size = config.get('max_batch_size', 8)
+
+        self.lock = Lock()
+        self.executor = ThreadPoolExecutor(max_workers=config.get('max_workers', 8),
+                                           thread_name_prefix='ai-request')
+        self.in_flight: Dict[Tuple, Future] = {}
+        self.pending_batches: Dict[Tuple[str, str], List[Tuple[Tuple, str, Future, float]]] = {}
+        self.batch_timers: Dict[Tuple[str, str], Timer] = {}
+        self.slots: Dict[str, Any] = {}
+        self.limiters: Dict[str, RateLimiter] = {}
+        self.metrics: Dict[str, ProviderMetrics] = defaultdict(ProviderMetrics)
+
+    def _get_slot(self, provider: str):
+        """Get the semaphore bounding concurrent calls to a provider"""
+        with self.lock:
+            if provider not in self.slots:
+                limit = self.concurrency.get(provider, self.default_concurrency)
+                self.slots[provider] = BoundedSemaphore(max(1, int(limit)))
+            return self.slots[provider]
+
+    def _get_limiter(self, provider: str) -> Optional[RateLimiter]:
+        """Get the rate limiter for a provider, if it has a budget configured"""
+        budget = self.rate_budgets.get(provider)
+        if not budget:
+            return None
+        with self.lock:
+            if provider not in self.limiters:
+                self.limiters[provider] = RateLimiter(budget)
+            return self.limiters[provider]
+
+    def submit(self, provider: str, task_type: str, text: str,
+               call: Callable[[str], Any],
+               batch_call: Optional[Callable[[List[str]], List[Any]]] = None) -> Future:
+        """Schedule a request and return a future for its result.
+
+        Identical prompts already in flight share the existing future. When
+        batch_call is given, requests for the same provider and task type that
+        arrive within the batch window are dispatched together.
+        """
+        key = (provider, task_type, text)
+        with self.lock:
+            stats = self.metrics[provider]
+            existing = self.in_flight.get(key)
+            if existing is not None:
+                stats.coalesced += 1
+                return existing
+
+            future = Future()
+            self.in_flight[key] = future
+            stats.submitted += 1
+            stats.queue_depth += 1
+            submitted_at = time.monotonic()
+
+            if batch_call is None:
+                self.executor.submit(self._run_single, key, call, future, submitted_at)
+                return future
+
+            batch_key = (provider, task_type)
+            batch = self.pending_batches.setdefault(batch_key, [])
+            batch.append((key, text, future, submitted_at))
+            if len(batch) >= self.max_batch_size:
+                self._cancel_timer(batch_key)
+                ready = self.pending_batches.pop(batch_key)
+            else:
+                ready = None
+                if batch_key not in self.batch_timers:
+                    timer = Timer(self.batch_window, self._flush_batch, args=(batch_key, batch_call))
+                    timer.daemon = True
+                    self.batch_timers[batch_key] = timer
+                    timer.start()
+
+        if ready:
+            self.executor.submit(self._run_batch, provider, ready, batch_call)
+        return future
+
+    def run(self, provider: str, task_type: str, text: str,
+            call: Callable[[str], Any],
+            batch_call: Optional[Callable[[List[str]], List[Any]]] = None,
+            timeout: Optional[float] = None) -> Any:
+        """Submit a request and block until its result is available"""
+        return self.submit(provider, task_type, text, call, batch_call).result(timeout=timeout)
+
+    def _cancel_timer(self, batch_key: Tuple[str, str]):
+        timer = self.batch_timers.pop(batch_key, None)
+        if timer:
+            timer.cancel()
+
+    def _flush_batch(self, batch_key: Tuple[str, str], batch_call: Callable[[List[str]], List[Any]]):
+        """Dispatch whatever has accumulated once the batch window closes"""
+        with self.lock:
+            self.batch_timers.pop(batch_key, None)
+            ready = self.pending_batches.pop(batch_key, None)
+        if ready:
+            self.executor.submit(self._run_batch, batch_key[0], ready, batch_call)
+
+    def _start(self, provider: str, submitted_at: List[float]):
+        """Wait for a concurrency slot and rate budget, then record wait times"""
+        slot = self._get_slot(provider)
+        slot.acquire()
+        limiter = self._get_limiter(provider)
+        if limiter:
+            limiter.acquire()
+        started_at = time.monotonic()
+        with self.lock:
+            stats = self.metrics[provider]
+            stats.queue_depth -= len(submitted_at)
+            stats.in_flight += len(submitted_at)
+            for queued_at in submitted_at:
+                stats.wait_times.append(started_at - queued_at)
+        return slot
+
+    def _finish(self, provider: str, keys: List[Tuple], failed: bool):
+        with self.lock:
+            stats = self.metrics[provider]
+            stats.in_flight -= len(keys)
+            if failed:
+                stats.failed += len(keys)
+            else:
+                stats.completed += len(keys)
+            for key in keys:
+                self.in_flight.pop(key, None)
+
+    def _run_single(self, key: Tuple, call: Callable[[str], Any], future: Future, submitted_at: float):
+        provider, _, text = key
+        slot = self._start(provider, [submitted_at])
+        failed = False
+        try:
+            result = call(text)
+        except Exception as e:
+            failed = True
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            slot.release()
+            self._finish(provider, [key], failed)
+
+    def _run_batch(self, provider: str, batch: List[Tuple[Tuple, str, Future, float]],
+                   batch_call: Callable[[List[str]], List[Any]]):
+        slot = self._start(provider, [entry[3] for entry in batch])
+        keys = [entry[0] for entry in batch]
+        with self.lock:
+            stats = self.metrics[provider]
+            stats.batches += 1
+            if len(batch) > 1:
+                stats.batched += len(batch)
+        failed = False
+        try:
+            results = batch_call([entry[1] for entry in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch returned {len(results)} results for {len(batch)} requests")
+        except Exception as e:
+            failed = True
+            for entry in batch:
+                entry[2].set_exception(e)
+        else:
+            for entry, result in zip(batch, results):
+                entry[2].set_result(result)
+        finally:
+            slot.release()
+            self._finish(provider, keys, failed)
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get queue depth, wait times and coalescing counters per provider"""
+        with self.lock:
+            return {provider: stats.snapshot() for provider, stats in self.metrics.items()}
+
+    def shutdown(self):
+        """Stop accepting work and release worker threads"""
+        with self.lock:
+            for timer in self.batch_timers.values():
+                timer.cancel()
+            self.batch_timers.clear()
+        self.executor.shutdown(wait=False)
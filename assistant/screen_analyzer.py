@@ -1,10 +1,209 @@
-import cv2
-import numpy as np
-import pyautogui
-from PIL import Image
-import pytesseract
+from __future__ import annotations
+
+import hashlib
+import os
+import platform
+import re
+import shutil
+import subprocess
+import threading
+import time
+import psutil
 from datetime import datetime
-from typing import Dict, Any, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple, Optional
+from .cache import TTLCache
+from .lazy_import import lazy_import
+
+# Imaging and OCR libraries load on first capture rather than at startup
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+pyautogui = lazy_import('pyautogui')
+pytesseract = lazy_import('pytesseract')
+
+class ScreenChangeDetector:
+    """Tells whether a screen capture differs from the previous one, and where.
+
+    A 64-bit difference hash of the whole screen catches large changes
+    (switching windows, scrolling) almost for free. When it matches, the
+    screen is compared tile by tile on a downscaled copy, so that small
+    edits such as a typed word still mark their tile dirty.
+    """
+
+    def __init__(self, tile_size: int = 256, scale: int = 8, pixel_threshold: int = 12, hash_threshold: int = 6):
+        self.tile_size = tile_size
+        self.scale = scale
+        self.pixel_threshold = pixel_threshold
+        self.hash_threshold = hash_threshold
+        self.previous_hash = None
+        self.previous_small = None
+
+    def perceptual_hash(self, gray: np.ndarray) -> int:
+        """Difference hash: sign of horizontal gradients on a 9x8 thumbnail"""
+        thumbnail = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+        bits = (thumbnail[:, 1:] > thumbnail[:, :-1]).flatten()
+        return int(''.join('1' if bit else '0' for bit in bits), 2)
+
+    def tiles(self, shape: Tuple[int, int]) -> List[Tuple[int, int, int, int]]:
+        """(x, y, width, height) of each tile, in full-resolution pixels"""
+        height, width = shape[:2]
+        return [(x, y, min(self.tile_size, width - x), min(self.tile_size, height - y))
+                for y in range(0, height, self.tile_size) for x in range(0, width, self.tile_size)]
+
+    def _tile_region(self, small: np.ndarray, tile: Tuple[int, int, int, int]) -> np.ndarray:
+        """The part of a downscaled image covering a full-resolution tile"""
+        x, y, width, height = tile
+        return small[y // self.scale:-(-(y + height) // self.scale), x // self.scale:-(-(x + width) // self.scale)]
+
+    def compare(self, gray: np.ndarray) -> Dict[str, Any]:
+        """Compare a grayscale capture with the previous one and remember it for next time"""
+        small = cv2.resize(gray, (max(1, gray.shape[1] // self.scale), max(1, gray.shape[0] // self.scale)),
+                           interpolation=cv2.INTER_AREA)
+        image_hash = self.perceptual_hash(small)
+        tiles = self.tiles(gray.shape)
+
+        if self.previous_small is None or self.previous_small.shape != small.shape:
+            dirty = tiles
+        elif bin(image_hash ^ self.previous_hash).count('1') > self.hash_threshold:
+            dirty = tiles
+        else:
+            difference = cv2.absdiff(small, self.previous_small)
+            dirty = [tile for tile in tiles if self._tile_region(difference, tile).max(initial=0) > self.pixel_threshold]
+
+        self.previous_hash = image_hash
+        self.previous_small = small
+        return {'changed': bool(dirty), 'dirty_tiles': dirty, 'tile_count': len(tiles), 'hash': image_hash}
+
+    def reset(self):
+        self.previous_hash = None
+        self.previous_small = None
+
+
+class IncrementalOCR:
+    """OCR that only re-reads the parts of the screen that changed.
+
+    Text regions are found with a morphological pass over the capture
+    (gradient, Otsu threshold, then a wide closing that merges characters
+    into lines and blocks). Each region's text is cached by a hash of its
+    pixels, and regions lying entirely in tiles the change detector saw as
+    clean keep their text without hashing. Uncached regions are OCR'd in
+    parallel on a thread pool (each pytesseract call runs its own
+    tesseract process). When too many regions are new, as on the first
+    capture, one full-screen image_to_data pass is split across the
+    regions instead of paying a process start per region.
+    """
+
+    def __init__(self, max_workers: int = None, cache_size: int = 2048, max_regions_per_pass: int = 24):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_regions_per_pass = max_regions_per_pass
+        self.executor = None
+        self.text_cache = TTLCache(max_entries=cache_size, ttl=float('inf'))
+        self.previous_regions: Dict[Tuple[int, int, int, int], str] = {}
+        self.stats = {'regions': 0, 'cache_hits': 0, 'reused_clean': 0, 'ocr_calls': 0, 'full_passes': 0}
+
+    def find_text_regions(self, gray: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Bounding boxes (x, y, width, height) of text lines and blocks"""
+        small = cv2.pyrDown(gray)
+        gradient = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+        _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        connected = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (15, 3)))
+        contours, _ = cv2.findContours(connected, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        height, width = gray.shape[:2]
+        regions = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            if w < 4 or h < 4:
+                continue
+            # Back to full resolution with a little padding for tesseract
+            x0, y0 = max(0, x * 2 - 4), max(0, y * 2 - 4)
+            x1, y1 = min(width, (x + w) * 2 + 4), min(height, (y + h) * 2 + 4)
+            regions.append((x0, y0, x1 - x0, y1 - y0))
+        return self._reading_order(regions)
+
+    def _reading_order(self, regions: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+        # Group into rows by vertical position, then left to right
+        return sorted(regions, key=lambda region: (region[1] // 16, region[0]))
+
+    def _overlaps(self, region, tile) -> bool:
+        return (region[0] < tile[0] + tile[2] and tile[0] < region[0] + region[2] and
+                region[1] < tile[1] + tile[3] and tile[1] < region[1] + region[3])
+
+    def _crop(self, gray: np.ndarray, region: Tuple[int, int, int, int]) -> np.ndarray:
+        x, y, w, h = region
+        return gray[y:y + h, x:x + w]
+
+    def _region_key(self, crop: np.ndarray) -> str:
+        return f"{crop.shape[0]}x{crop.shape[1]}:{hashlib.blake2b(crop.tobytes(), digest_size=16).hexdigest()}"
+
+    def _ocr_region(self, crop: np.ndarray) -> str:
+        return pytesseract.image_to_string(crop, config='--psm 6').strip()
+
+    def _ocr_full(self, gray: np.ndarray, regions: List[Tuple[int, int, int, int]]) -> Dict[int, str]:
+        """One full-screen pass, with words assigned to the regions containing them"""
+        data = pytesseract.image_to_data(gray, output_type=pytesseract.Output.DICT)
+        lines: Dict[int, Dict[Tuple[int, int, int], List[str]]] = {}
+        for i, word in enumerate(data['text']):
+            if not word.strip():
+                continue
+            center_x = data['left'][i] + data['width'][i] // 2
+            center_y = data['top'][i] + data['height'][i] // 2
+            for index, (x, y, w, h) in enumerate(regions):
+                if x <= center_x < x + w and y <= center_y < y + h:
+                    line = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+                    lines.setdefault(index, {}).setdefault(line, []).append(word)
+                    break
+        return {index: '\n'.join(' '.join(words) for _, words in sorted(region_lines.items()))
+                for index, region_lines in lines.items()}
+
+    def extract(self, gray: np.ndarray, dirty_tiles: Optional[List[Tuple[int, int, int, int]]] = None) -> str:
+        """Text of the whole capture; dirty_tiles limits re-reading to those areas (None means everything)"""
+        regions = self.find_text_regions(gray)
+        texts: Dict[int, str] = {}
+        keys: Dict[int, str] = {}
+        pending = []
+        for index, region in enumerate(regions):
+            if (dirty_tiles is not None and region in self.previous_regions
+                    and not any(self._overlaps(region, tile) for tile in dirty_tiles)):
+                texts[index] = self.previous_regions[region]
+                self.stats['reused_clean'] += 1
+                continue
+            keys[index] = self._region_key(self._crop(gray, region))
+            cached = self.text_cache.get(keys[index])
+            if cached is not None:
+                texts[index] = cached
+                self.stats['cache_hits'] += 1
+            else:
+                pending.append(index)
+
+        if len(pending) > self.max_regions_per_pass:
+            self.stats['full_passes'] += 1
+            full_texts = self._ocr_full(gray, [regions[index] for index in pending])
+            for position, index in enumerate(pending):
+                texts[index] = full_texts.get(position, '')
+        elif pending:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ocr')
+            futures = {index: self.executor.submit(self._ocr_region, self._crop(gray, regions[index]))
+                       for index in pending}
+            for index, future in futures.items():
+                try:
+                    texts[index] = future.result()
+                except Exception as e:
+                    print(f"Error extracting text from region: {str(e)}")
+                    texts[index] = ''
+            self.stats['ocr_calls'] += len(pending)
+
+        for index in pending:
+            self.text_cache.set(keys[index], texts[index])
+        self.stats['regions'] += len(regions)
+        self.previous_regions = {region: texts[index] for index, region in enumerate(regions)}
+        return '\n'.join(texts[index] for index in range(len(regions)) if texts.get(index))
+
+    def reset(self):
+        self.previous_regions = {}
+        self.text_cache.clear()
+
 
 class ScreenAnalyzer:
     def __init__(self, config: Dict[str, Any]):
@@ -13,6 +212,25 @@ class ScreenAnalyzer:
         self.context_history = []
         self.max_history = 10
         
+        # Skip OCR when the screen has not changed since the last analysis
+        self.change_detector = ScreenChangeDetector()
+        # When it has, only re-read the text regions that changed
+        self.ocr = IncrementalOCR()
+        self.analysis_lock = threading.Lock()  # Background sampling and on-demand analysis share state
+        self.last_ocr_text = None
+        
+        # OCR is the last resort: window info and accessibility text come first
+        analysis_config = config.get('screen_analysis', {}) if hasattr(config, 'get') else {}
+        self.ocr_by_default = analysis_config.get('ocr_by_default', False)
+        self.use_accessibility = analysis_config.get('accessibility', True)
+        self.max_accessible_nodes = analysis_config.get('max_accessible_nodes', 1500)
+        self.max_accessible_chars = analysis_config.get('max_accessible_chars', 4000)
+        # Snapshot reads reuse the focused window info this long instead of querying it again
+        self.window_info_max_age = analysis_config.get('window_info_max_age_seconds', 5)
+        self._window_info = None
+        self._window_info_at = 0.0
+        self.metrics = {'analyses': 0, 'ocr_runs': 0, 'ocr_skipped': 0, 'dirty_tiles': 0, 'tiles': 0}
+        
     def capture_screen_region(self, region: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
         """Capture the screen or a specific region"""
         try:
@@ -35,27 +253,162 @@ class ScreenAnalyzer:
             print(f"Error extracting text: {str(e)}")
             return ""
 
-    def analyze_screen_content(self) -> Dict[str, Any]:
-        """Analyze the current screen content and return relevant information"""
+    def extract_changed_text(self, gray: np.ndarray, dirty_tiles=None) -> str:
+        """Extract text region by region, re-reading only regions that changed"""
         try:
-            # Capture the current screen
-            screen = self.capture_screen_region()
-            if screen is None:
-                return {}
+            return self.ocr.extract(gray, dirty_tiles)
+        except Exception as e:
+            print(f"Error extracting text: {str(e)}")
+            return ""
+
+    def get_active_window_info(self, max_age: float = 0) -> Dict[str, Any]:
+        """Title, process name and ids of the focused window, without touching the screen contents.
+
+        With max_age, a result read within that many seconds is returned instead of querying again
+        (on Linux each query runs xprop twice).
+        """
+        if max_age and self._window_info and time.monotonic() - self._window_info_at < max_age:
+            return self._window_info
+        info = {'window_title': "Unknown", 'process_name': None, 'pid': None, 'handle': None}
+        try:
+            system = platform.system()
+            if system == 'Windows':
+                import ctypes
+                from ctypes import wintypes
+                user32 = ctypes.windll.user32
+                hwnd = user32.GetForegroundWindow()
+                if hwnd:
+                    buffer = ctypes.create_unicode_buffer(user32.GetWindowTextLengthW(hwnd) + 1)
+                    user32.GetWindowTextW(hwnd, buffer, len(buffer))
+                    pid = wintypes.DWORD()
+                    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+                    info.update(window_title=buffer.value or "Unknown", pid=pid.value, handle=hwnd)
+            elif system == 'Linux' and shutil.which('xprop'):
+                active = subprocess.run(['xprop', '-root', '_NET_ACTIVE_WINDOW'], capture_output=True,
+                                        text=True, timeout=1).stdout
+                window_id = active.strip().split()[-1] if active.strip() else ''
+                if window_id.startswith('0x') and int(window_id, 16):
+                    props = subprocess.run(['xprop', '-id', window_id, '_NET_WM_NAME', '_NET_WM_PID'],
+                                           capture_output=True, text=True, timeout=1).stdout
+                    title = re.search(r'_NET_WM_NAME\(\w+\) = "(.*)"', props)
+                    pid = re.search(r'_NET_WM_PID\(\w+\) = (\d+)', props)
+                    info.update(window_title=title.group(1) if title else "Unknown",
+                                pid=int(pid.group(1)) if pid else None, handle=window_id)
+            else:
+                active_window = pyautogui.getActiveWindow()
+                info['window_title'] = active_window.title if active_window else "Unknown"
+        except Exception as e:
+            print(f"Error reading active window: {str(e)}")
+
+        if info['pid']:
+            try:
+                info['process_name'] = psutil.Process(info['pid']).name()
+            except psutil.Error:
+                pass
+        self._window_info, self._window_info_at = info, time.monotonic()
+        return info
+
+    def get_accessibility_text(self, window: Dict[str, Any]) -> Optional[str]:
+        """Text exposed by the focused application through AT-SPI (Linux) or UI Automation (Windows).
+
+        Returns None when no accessibility backend is available or the application exposes nothing.
+        """
+        if not window.get('pid') or not self.use_accessibility:
+            return None
+        try:
+            system = platform.system()
+            if system == 'Linux':
+                texts = self._atspi_texts(window['pid'])
+            elif system == 'Windows':
+                texts = self._uia_texts(window['handle'])
+            else:
+                return None
+        except ImportError:
+            self.use_accessibility = False  # Backend not installed; don't try again
+            return None
+        except Exception as e:
+            print(f"Error reading accessibility text: {str(e)}")
+            return None
+
+        text = '\n'.join(dict.fromkeys(text.strip() for text in texts if text and text.strip()))
+        return text[:self.max_accessible_chars] or None
 
-            # Extract text content
-            text_content = self.extract_text_from_image(screen)
+    def _atspi_texts(self, pid: int) -> List[str]:
+        import pyatspi
+        desktop = pyatspi.Registry.getDesktop(0)
+        app = next((app for app in desktop if app is not None and app.get_process_id() == pid), None)
+        if app is None:
+            return []
+        frames = [frame for frame in app if frame is not None]
+        active = [frame for frame in frames if frame.getState().contains(pyatspi.STATE_ACTIVE)]
 
-            # Get active window information
-            active_window = pyautogui.getActiveWindow()
-            window_title = active_window.title if active_window else "Unknown"
+        texts, queue, visited = [], list(active or frames[:1]), 0
+        while queue and visited < self.max_accessible_nodes:
+            node = queue.pop(0)
+            visited += 1
+            try:
+                text_interface = node.queryText()
+                texts.append(text_interface.getText(0, min(text_interface.characterCount, 2000)))
+            except NotImplementedError:
+                if node.getRole() in (pyatspi.ROLE_LABEL, pyatspi.ROLE_HEADING, pyatspi.ROLE_PUSH_BUTTON,
+                                      pyatspi.ROLE_PAGE_TAB, pyatspi.ROLE_LIST_ITEM):
+                    texts.append(node.name)
+            queue.extend(child for child in node if child is not None)
+        return texts
+
+    def _uia_texts(self, handle) -> List[str]:
+        import uiautomation as auto
+        root = auto.ControlFromHandle(handle)
+        if root is None:
+            return []
+        texts = []
+        for visited, (control, _) in enumerate(auto.WalkControl(root, maxDepth=12)):
+            if visited >= self.max_accessible_nodes:
+                break
+            if control.ControlType in (auto.ControlType.EditControl, auto.ControlType.DocumentControl):
+                try:
+                    texts.append(control.GetValuePattern().Value)
+                    continue
+                except Exception:
+                    pass
+            texts.append(control.Name)
+        return texts
+
+    def analyze_screen_content(self, use_ocr: Optional[bool] = None) -> Dict[str, Any]:
+        """Analyze the current screen content and return relevant information
+
+        Sources are tried cheapest first: the focused window's title and
+        process, then its accessibility text. Tesseract runs only when
+        use_ocr is set (default from config screen_analysis.ocr_by_default)
+        and no accessibility text was found.
+        """
+        with self.analysis_lock:
+            return self._analyze_screen_content(self.ocr_by_default if use_ocr is None else use_ocr)
+
+    def _analyze_screen_content(self, use_ocr: bool) -> Dict[str, Any]:
+        try:
+            window = self.get_active_window_info()
+
+            text_content, text_source, screen_changed = "", 'window', None
+            accessible_text = self.get_accessibility_text(window)
+            if accessible_text:
+                text_content, text_source = accessible_text, 'accessibility'
+            elif use_ocr:
+                ocr_result = self._ocr_screen()
+                if ocr_result is None:
+                    return {}
+                text_content, screen_changed = ocr_result
+                text_source = 'ocr'
 
             # Create analysis result
             analysis = {
                 'timestamp': datetime.now().isoformat(),
-                'window_title': window_title,
+                'window_title': window['window_title'],
+                'process_name': window['process_name'],
                 'text_content': text_content,
-                'screen_resolution': pyautogui.size()
+                'text_source': text_source,
+                'screen_resolution': pyautogui.size(),
+                'screen_changed': screen_changed
             }
 
             # Update history
@@ -70,6 +423,54 @@ class ScreenAnalyzer:
             print(f"Error analyzing screen content: {str(e)}")
             return {}
 
+    def _ocr_screen(self) -> Optional[Tuple[str, bool]]:
+        """OCR the screen, returning (text, whether the screen changed), or None if capture failed"""
+        # Capture the current screen
+        screen = self.capture_screen_region()
+        if screen is None:
+            return None
+
+        # Extract text content, reusing the last OCR result if nothing changed on screen
+        gray = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
+        change = self.change_detector.compare(gray)
+        self.metrics['analyses'] += 1
+        self.metrics['tiles'] += change['tile_count']
+        self.metrics['dirty_tiles'] += len(change['dirty_tiles'])
+        if not change['changed'] and self.last_ocr_text is not None:
+            self.metrics['ocr_skipped'] += 1
+            return self.last_ocr_text, False
+
+        self.last_ocr_text = self.extract_changed_text(gray, change['dirty_tiles'] if self.last_ocr_text is not None else None)
+        self.metrics['ocr_runs'] += 1
+        return self.last_ocr_text, True
+
+    def read_screen_text(self) -> str:
+        """Text on screen for commands that need it: accessibility text if available, otherwise OCR"""
+        return self.analyze_screen_content(use_ocr=True).get('text_content', "")
+
+    def _with_current_window(self, analysis: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Latest analysis, updated cheaply if the focused window changed since it was taken"""
+        window = self.get_active_window_info(max_age=self.window_info_max_age)
+        if analysis and analysis['window_title'] == window['window_title']:
+            return analysis
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'window_title': window['window_title'],
+            'process_name': window['process_name'],
+            'text_content': "",
+            'text_source': 'window',
+            'screen_resolution': analysis['screen_resolution'] if analysis else pyautogui.size(),
+            'screen_changed': None
+        }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Analysis counts and how often OCR was skipped because the screen had not changed"""
+        metrics = dict(self.metrics)
+        metrics['hit_rate'] = metrics['ocr_skipped'] / metrics['analyses'] if metrics['analyses'] else 0.0
+        metrics['dirty_tile_ratio'] = metrics['dirty_tiles'] / metrics['tiles'] if metrics['tiles'] else 0.0
+        metrics['ocr'] = dict(self.ocr.stats)
+        return metrics
+
     def get_context_summary(self) -> str:
         """Generate a summary of the current screen context"""
         if not self.last_analysis:
@@ -102,13 +503,21 @@ class ScreenAnalyzer:
 
         return "I'm here to help! What would you like to know about what you're viewing?"
 
-    def get_screen_context(self) -> Dict[str, Any]:
-        """Get the current screen context including analysis and relevant information"""
+    def get_screen_context(self, refresh: bool = True) -> Dict[str, Any]:
+        """Get the current screen context including analysis and relevant information
+
+        With refresh=False the latest analysis is returned without capturing the screen; only the
+        focused window is re-read, and the stale text dropped if it changed.
+        """
         try:
             # Perform screen analysis
-            analysis = self.analyze_screen_content()
+            if refresh:
+                analysis = self.analyze_screen_content()
+            else:
+                analysis = self._with_current_window(self.last_analysis)
             if not analysis:
-                return {'status': 'error', 'message': 'Failed to analyze screen content'}
+                message = 'Failed to analyze screen content' if refresh else 'No screen analysis available yet'
+                return {'status': 'error', 'message': message}
 
             # Get context summary
             context_summary = self.get_context_summary()
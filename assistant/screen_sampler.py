@@ -0,0 +1,146 @@
+import os
+import platform
+import shutil
+import subprocess
+import threading
+import time
+import logging
+from typing import Any, Dict, Optional
+
+import psutil
+
+
+class ScreenContextSampler:
+    """Keeps a ScreenAnalyzer's last analysis fresh from a background thread.
+
+    Commands read the latest snapshot without waiting on a capture. The
+    sampling interval doubles while CPU usage is high and returns to the
+    base rate once it drops. Sampling pauses while the user has been idle
+    or the screen is locked, as far as the platform lets us tell.
+    """
+
+    def __init__(self, analyzer, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.analyzer = analyzer
+        self.base_interval = config.get('interval_seconds', 30)
+        self.max_interval = config.get('max_interval_seconds', 300)
+        self.cpu_high = config.get('cpu_high_percent', 70)
+        self.cpu_low = config.get('cpu_low_percent', 40)
+        self.idle_after = config.get('idle_after_seconds', 300)
+        self.min_gap = config.get('min_gap_seconds', 5)  # Between samples requested by commands
+        self.interval = self.base_interval
+        self.wake = threading.Event()
+        self.running = False
+        self.thread = None
+        self.paused_reason = None
+        self.last_activity = time.time()
+        self.last_sample_at = 0.0
+        self.stats = {'samples': 0, 'skipped_idle': 0, 'skipped_locked': 0, 'last_sample_ms': 0.0}
+        self._xprintidle = shutil.which('xprintidle') if platform.system() == 'Linux' else None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        psutil.cpu_percent(interval=None)  # Prime the counter so the first reading is meaningful
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+
+    def request_refresh(self):
+        """Ask for a sample soon, e.g. after a command that likely changed the screen"""
+        self.last_activity = time.time()
+        if self.last_activity - self.last_sample_at >= self.min_gap:
+            self.wake.set()
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Screen context from the latest sample, without capturing the screen"""
+        return self.analyzer.get_screen_context(refresh=False)
+
+    def _run(self):
+        while self.running:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            if not self.running:
+                break
+
+            reason = self._pause_reason()
+            if reason:
+                if reason != self.paused_reason:
+                    logging.info(f"Screen sampling paused: {reason}")
+                self.paused_reason = reason
+                self.stats[f"skipped_{reason}"] += 1
+                continue
+            self.paused_reason = None
+
+            self.last_sample_at = time.time()
+            started = time.perf_counter()
+            try:
+                self.analyzer.analyze_screen_content()
+                self.stats['samples'] += 1
+            except Exception as e:
+                logging.error(f"Screen sampling failed: {str(e)}")
+            self.stats['last_sample_ms'] = (time.perf_counter() - started) * 1000
+            self._adapt_interval()
+
+    def _adapt_interval(self):
+        cpu = psutil.cpu_percent(interval=None)
+        if cpu >= self.cpu_high:
+            self.interval = min(self.interval * 2, self.max_interval)
+        elif cpu <= self.cpu_low:
+            self.interval = self.base_interval
+
+    def _pause_reason(self) -> Optional[str]:
+        if self.is_screen_locked():
+            return 'locked'
+        idle = self.idle_seconds()
+        if idle is not None and idle >= self.idle_after and time.time() - self.last_activity >= self.idle_after:
+            return 'idle'
+        return None
+
+    def idle_seconds(self) -> Optional[float]:
+        """Seconds since the last keyboard or mouse input, or None if it cannot be determined"""
+        try:
+            system = platform.system()
+            if system == 'Windows':
+                import ctypes
+
+                class LASTINPUTINFO(ctypes.Structure):
+                    _fields_ = [('cbSize', ctypes.c_uint), ('dwTime', ctypes.c_uint)]
+
+                info = LASTINPUTINFO()
+                info.cbSize = ctypes.sizeof(info)
+                if ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+                    return (ctypes.windll.kernel32.GetTickCount() - info.dwTime) / 1000.0
+            elif system == 'Darwin':
+                output = subprocess.run(['ioreg', '-c', 'IOHIDSystem'], capture_output=True, text=True,
+                                        timeout=2).stdout
+                for line in output.splitlines():
+                    if 'HIDIdleTime' in line:
+                        return int(line.split('=')[-1].strip()) / 1e9
+            elif self._xprintidle:
+                output = subprocess.run([self._xprintidle], capture_output=True, text=True, timeout=2).stdout
+                return int(output.strip()) / 1000.0
+        except Exception as e:
+            logging.debug(f"Could not read idle time: {str(e)}")
+        return None
+
+    def is_screen_locked(self) -> bool:
+        try:
+            system = platform.system()
+            if system == 'Windows':
+                return any(process.info['name'] == 'LogonUI.exe'
+                           for process in psutil.process_iter(['name']))
+            if system == 'Linux' and os.environ.get('XDG_SESSION_ID') and shutil.which('loginctl'):
+                output = subprocess.run(['loginctl', 'show-session', os.environ['XDG_SESSION_ID'], '-p', 'LockedHint'],
+                                        capture_output=True, text=True, timeout=2).stdout
+                return output.strip() == 'LockedHint=yes'
+        except Exception as e:
+            logging.debug(f"Could not read screen lock state: {str(e)}")
+        return False
+
+    def get_status(self) -> Dict[str, Any]:
+        return {'running': self.running, 'interval': self.interval, 'paused': self.paused_reason, **self.stats}
@@ -1,45 +1,128 @@
-import requests
-from bs4 import BeautifulSoup
 import webbrowser
+import json
+import time
+from bisect import bisect_left, insort
+from collections import Counter, deque
 from urllib.parse import quote_plus
 import threading
+from .cache import TTLCache, CACHE_DIR
+from .html_extraction import extract_google_results
+from .lazy_import import lazy_import
+
+requests = lazy_import('requests')
 
 class SearchService:
     def __init__(self, container=None):
         self.container = container
         self.logger = container.get_service('logger') if container else None
-        self.search_history = []
-        self.max_history = 50
-        
+        config_manager = container.get_service('config_manager') if container else None
+        search_config = config_manager.config.get('search', {}) if config_manager else {}
+
+        # Results keyed by normalized query, kept across restarts
+        self.results_cache = TTLCache(
+            max_entries=search_config.get('cache_max_entries', 200),
+            ttl=search_config.get('cache_ttl_minutes', 6 * 60) * 60,
+            persist_path=CACHE_DIR / 'search.json'
+        )
+
+        # Recent searches, oldest evicted first, with a sorted index of their
+        # normalized queries for prefix lookups
+        self.max_history = search_config.get('max_history', 50)
+        self.history_file = CACHE_DIR / 'search_history.json'
+        self.search_history = deque(maxlen=self.max_history)
+        self.query_index = []
+        self.query_counts = Counter()
+        self.last_seen = {}  # normalized query -> (timestamp, original query)
+        self.history_lock = threading.Lock()
+        self._load_history()
+
+    def _normalize(self, query):
+        return ' '.join(query.lower().split())
+
+    def _add_to_history(self, entry):
+        """Append to history, keeping the prefix index in step with evictions"""
+        with self.history_lock:
+            if len(self.search_history) == self.search_history.maxlen:
+                self._unindex(self.search_history[0])
+            self.search_history.append(entry)
+            normalized = self._normalize(entry['query'])
+            if self.query_counts[normalized] == 0:
+                insort(self.query_index, normalized)
+            self.query_counts[normalized] += 1
+            self.last_seen[normalized] = (entry.get('timestamp', 0), entry['query'])
+
+    def _unindex(self, entry):
+        normalized = self._normalize(entry['query'])
+        self.query_counts[normalized] -= 1
+        if self.query_counts[normalized] <= 0:
+            del self.query_counts[normalized]
+            self.last_seen.pop(normalized, None)
+            position = bisect_left(self.query_index, normalized)
+            if position < len(self.query_index) and self.query_index[position] == normalized:
+                self.query_index.pop(position)
+
+    def _load_history(self):
+        try:
+            if self.history_file.exists():
+                with open(self.history_file, 'r', encoding='utf-8') as f:
+                    for entry in json.load(f):
+                        self._add_to_history(entry)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error loading search history: {str(e)}")
+
+    def _save_history(self):
+        try:
+            with self.history_lock:
+                entries = list(self.search_history)
+            self.history_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.history_file, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error saving search history: {str(e)}")
+
     def search_google(self, query, open_browser=False):
         """
         Search Google for the given query
-        
+
         Args:
             query (str): The search query
             open_browser (bool): Whether to open the results in a browser
-            
+
         Returns:
             str: A message indicating the search was performed
         """
         search_url = f"https://www.google.com/search?q={quote_plus(query)}"
-        
+
         # Add to history
-        self.search_history.append({"query": query, "url": search_url})
-        if len(self.search_history) > self.max_history:
-            self.search_history.pop(0)
-        
+        self._add_to_history({"query": query, "url": search_url, "timestamp": time.time()})
+        self._save_history()
+
+        cached_results = self.get_cached_results(query)
+        if cached_results is None:
+            # Fetch in the background either way, so asking again is answered from the cache
+            threading.Thread(target=self._fetch_search_results,
+                             args=(query, search_url),
+                             daemon=True).start()
+
         if open_browser:
             webbrowser.open(search_url)
             return f"Opened Google search for: {query}"
-        
-        # Start a thread to fetch search results
-        threading.Thread(target=self._fetch_search_results, 
-                         args=(query, search_url), 
-                         daemon=True).start()
-        
+
+        if cached_results is not None:
+            self._emit_results(query, cached_results)
+            return f"Showing recent results for: {query}"
+
         return f"Searching Google for: {query}. Results will be displayed shortly."
-    
+
+    def _emit_results(self, query, results):
+        if self.container and self.container.get_service('events'):
+            self.container.get_service('events').emit(
+                'search_results',
+                {'query': query, 'results': results[:5]}
+            )
+
     def _fetch_search_results(self, query, url):
         """Fetch search results in a background thread"""
         try:
@@ -47,50 +130,77 @@ class SearchService:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
             response = requests.get(url, headers=headers, timeout=10)
-            
+
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
                 # Extract search results
-                search_results = []
-                for result in soup.select('div.g'):
-                    title_element = result.select_one('h3')
-                    link_element = result.select_one('a')
-                    snippet_element = result.select_one('div.VwiC3b')
-                    
-                    if title_element and link_element:
-                        title = title_element.get_text()
-                        link = link_element.get('href')
-                        snippet = snippet_element.get_text() if snippet_element else ""
-                        
-                        if link.startswith('/url?q='):
-                            link = link.split('/url?q=')[1].split('&')[0]
-                        
-                        search_results.append({
-                            'title': title,
-                            'link': link,
-                            'snippet': snippet
-                        })
-                
+                search_results = extract_google_results(response.text)
+                if search_results:
+                    self.results_cache.set(self._normalize(query), search_results)
+                    self.results_cache.save()
+
                 # Notify about results
-                if self.container and self.container.get_service('events'):
-                    self.container.get_service('events').emit(
-                        'search_results', 
-                        {'query': query, 'results': search_results[:5]}
-                    )
+                self._emit_results(query, search_results)
             else:
                 if self.logger:
                     self.logger.error(f"Search error: HTTP {response.status_code}")
-                
+
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Search error: {str(e)}")
-    
+
+    def search_cached(self, query):
+        """Cached results for a query, recorded in history like a search; None if not cached"""
+        results = self.get_cached_results(query)
+        if results is not None:
+            search_url = f"https://www.google.com/search?q={quote_plus(query)}"
+            self._add_to_history({"query": query, "url": search_url, "timestamp": time.time()})
+            self._save_history()
+        return results
+
+    def get_cached_results(self, query):
+        """Get unexpired results for a query, or None if it has to go to the network"""
+        return self.results_cache.get(self._normalize(query))
+
+    def suggest(self, prefix, limit=5):
+        """Past queries starting with prefix, most recent first"""
+        normalized = self._normalize(prefix)
+        if not normalized:
+            return []
+        with self.history_lock:
+            matches = []
+            position = bisect_left(self.query_index, normalized)
+            while position < len(self.query_index) and self.query_index[position].startswith(normalized):
+                matches.append(self.last_seen[self.query_index[position]])
+                position += 1
+        matches.sort(key=lambda match: match[0], reverse=True)
+        return [query for _, query in matches[:limit]]
+
+    def find_in_history(self, query=None):
+        """Most recent history entry for exactly this query; the last search if query is None"""
+        with self.history_lock:
+            if not self.search_history:
+                return None
+            if not query:
+                return self.search_history[-1]
+            normalized = self._normalize(query)
+            if normalized not in self.last_seen:
+                return None
+            for entry in reversed(self.search_history):
+                if self._normalize(entry['query']) == normalized:
+                    return entry
+        return None
+
     def get_search_history(self):
         """Get the search history"""
-        return self.search_history
-    
+        with self.history_lock:
+            return list(self.search_history)
+
     def clear_search_history(self):
         """Clear the search history"""
-        self.search_history = []
-        return "Search history cleared."
\ No newline at end of file
+        with self.history_lock:
+            self.search_history.clear()
+            self.query_index = []
+            self.query_counts.clear()
+            self.last_seen.clear()
+        self._save_history()
+        return "Search history cleared."
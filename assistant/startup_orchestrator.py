@@ -0,0 +1,225 @@
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+PENDING = 'pending'
+RUNNING = 'running'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class StartupTask:
+    """One service to build at startup and the services it needs first"""
+
+    def __init__(self, name: str, factory: Callable[[], Any], depends_on: Iterable[str] = ()):
+        self.name = name
+        self.factory = factory
+        self.depends_on = tuple(depends_on)
+        self.status = PENDING
+        self.error = None
+        self.submitted_at = None
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+
+class StartupOrchestrator:
+    """Builds startup services concurrently in dependency order.
+
+    Each task runs on a worker thread as soon as everything it depends on
+    is ready, and its result is registered with the container under the
+    task name. Until then the container holds a factory for the name that
+    waits for the task, so a service requested early is never built twice.
+    Progress is emitted as 'service_ready' / 'service_failed' events and
+    'startup_complete' once every task has finished; a failed task fails
+    the tasks that depend on it. timeline() gives the queue wait and build
+    time of each task for profiling.
+    """
+
+    def __init__(self, container, events=None, max_workers: int = 4):
+        self.container = container
+        self.events = events
+        self.max_workers = max_workers
+        self.tasks: Dict[str, StartupTask] = {}
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._all_done = threading.Event()
+        self._finishing = False
+        self._executor = None
+
+    def add(self, name: str, factory: Callable[[], Any], depends_on: Iterable[str] = ()):
+        """Add a task; dependencies may be other tasks or services already in the container"""
+        if self.started_at is not None:
+            raise RuntimeError("Cannot add startup tasks after start()")
+        task = StartupTask(name, factory, depends_on)
+        self.tasks[name] = task
+        self.container.register_factory(name, lambda: self.result(name))
+
+    def start(self):
+        """Begin building every task whose dependencies are already satisfied"""
+        for task in self.tasks.values():
+            missing = [dep for dep in task.depends_on
+                       if dep not in self.tasks and not self.container.has_service(dep)]
+            if missing:
+                raise ValueError(f"Startup task {task.name} depends on unknown services: {', '.join(missing)}")
+        self._check_cycles()
+
+        self.started_at = time.perf_counter()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='startup')
+        with self._lock:
+            self._submit_ready()
+        if not self.tasks:
+            self._finish()
+
+    def _check_cycles(self):
+        visiting, visited = set(), set()
+
+        def visit(name, path):
+            if name in visited or name not in self.tasks:
+                return
+            if name in visiting:
+                raise ValueError(f"Startup dependency cycle: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in self.tasks[name].depends_on:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.tasks:
+            visit(name, [])
+
+    def _submit_ready(self):
+        """Submit pending tasks whose dependencies are ready, and fail those whose dependencies failed"""
+        progress = True
+        while progress:
+            progress = False
+            for task in self.tasks.values():
+                if task.status != PENDING:
+                    continue
+                deps = [self.tasks[dep] for dep in task.depends_on if dep in self.tasks]
+                failed = [dep.name for dep in deps if dep.status == FAILED]
+                if failed:
+                    task.status, task.error = FAILED, f"dependency failed: {', '.join(failed)}"
+                    task.finished_at = time.perf_counter()
+                    task.done.set()
+                    self._emit('service_failed', task)
+                    progress = True
+                elif all(dep.status == READY for dep in deps):
+                    task.status = RUNNING
+                    task.submitted_at = time.perf_counter()
+                    self._executor.submit(self._run, task)
+
+    def _run(self, task: StartupTask):
+        task.started_at = time.perf_counter()
+        try:
+            service = task.factory()
+            self.container.register_service(task.name, service)
+            task.status = READY
+        except Exception as e:
+            logging.error(f"Failed to initialize {task.name}: {str(e)}")
+            task.status, task.error = FAILED, str(e)
+        task.finished_at = time.perf_counter()
+        task.done.set()
+        self._emit('service_ready' if task.status == READY else 'service_failed', task)
+
+        with self._lock:
+            self._submit_ready()
+            finished = not self._finishing and all(t.done.is_set() for t in self.tasks.values())
+            self._finishing = self._finishing or finished
+        if finished:
+            self._finish()
+
+    def _finish(self):
+        self.finished_at = time.perf_counter()
+        self._all_done.set()
+        if self._executor:
+            self._executor.shutdown(wait=False)
+        failed = [name for name, task in self.tasks.items() if task.status == FAILED]
+        self._emit_data('startup_complete', {
+            'elapsed_ms': round((self.finished_at - self.started_at) * 1000, 1),
+            'failed': failed
+        })
+
+    # Waiting
+
+    def wait(self, names: Optional[Iterable[str]] = None, timeout: Optional[float] = None) -> bool:
+        """Wait for the named tasks (all by default) to finish; False on timeout"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        if names is None:
+            return self._all_done.wait(timeout)
+        for name in names:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not self.tasks[name].done.wait(remaining):
+                return False
+        return True
+
+    def result(self, name: str, timeout: Optional[float] = None) -> Any:
+        """The service built by a task, waiting for it if needed"""
+        task = self.tasks[name]
+        if not task.done.wait(timeout):
+            raise TimeoutError(f"{name} is still initializing")
+        if task.status != READY:
+            raise RuntimeError(f"{name} failed to initialize: {task.error}")
+        return self.container.get_service(name)
+
+    def is_ready(self, name: str) -> bool:
+        task = self.tasks.get(name)
+        return bool(task and task.status == READY)
+
+    def failures(self) -> Dict[str, str]:
+        return {name: task.error for name, task in self.tasks.items() if task.status == FAILED}
+
+    # Profiling
+
+    def timeline(self) -> List[Dict[str, Any]]:
+        """Per task: when it was queued and started, and how long it waited and ran (ms from start())"""
+        def offset(moment):
+            return round((moment - self.started_at) * 1000, 1) if moment and self.started_at else None
+
+        rows = []
+        for task in self.tasks.values():
+            rows.append({
+                'name': task.name,
+                'status': task.status,
+                'depends_on': list(task.depends_on),
+                'queued_ms': offset(task.submitted_at),
+                'started_ms': offset(task.started_at),
+                'finished_ms': offset(task.finished_at),
+                'wait_ms': round((task.started_at - task.submitted_at) * 1000, 1)
+                if task.started_at and task.submitted_at else None,
+                'build_ms': round((task.finished_at - task.started_at) * 1000, 1)
+                if task.finished_at and task.started_at else None
+            })
+        rows.sort(key=lambda row: row['started_ms'] if row['started_ms'] is not None else float('inf'))
+        return rows
+
+    def format_timeline(self) -> str:
+        lines = ['Service startup timeline:']
+        for row in self.timeline():
+            if row['build_ms'] is None:
+                lines.append(f"  {row['name']:<24} {row['status']}")
+            else:
+                lines.append(f"  {row['name']:<24} start {row['started_ms']:8.1f} ms  "
+                             f"build {row['build_ms']:8.1f} ms  waited {row['wait_ms']:6.1f} ms  {row['status']}")
+        return '\n'.join(lines)
+
+    # Events
+
+    def _emit(self, event_type: str, task: StartupTask):
+        self._emit_data(event_type, {
+            'name': task.name,
+            'status': task.status,
+            'error': task.error,
+            'build_ms': round((task.finished_at - task.started_at) * 1000, 1) if task.started_at else None
+        })
+
+    def _emit_data(self, event_type: str, data: Dict[str, Any]):
+        if not self.events:
+            return
+        try:
+            self.events.emit(event_type, data)
+        except Exception as e:
+            logging.error(f"Error emitting {event_type}: {str(e)}")
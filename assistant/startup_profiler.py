@@ -0,0 +1,87 @@
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+
+class StartupProfiler:
+    """Times module imports and named startup phases.
+
+    While installed, builtins.__import__ is wrapped so every module imported
+    for the first time records its inclusive time and its self time (minus
+    the imports it triggered). mark() records how long after start() each
+    phase finished, e.g. 'window_shown'. report() summarizes both.
+    """
+
+    def __init__(self):
+        self.started_at = None
+        self.phases: List[Tuple[str, float]] = []
+        self.imports: Dict[str, Tuple[float, float]] = {}  # name -> (inclusive, self) seconds
+        self._original_import = builtins.__import__
+        self._active = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        if not self._active:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+            self._active = True
+
+    def stop(self):
+        if self._active and builtins.__import__ is self._timed_import:
+            builtins.__import__ = self._original_import
+        # Code that captured the wrapper keeps working, untimed
+        self._active = False
+
+    def mark(self, phase: str) -> float:
+        """Record that a phase finished; returns seconds since start()"""
+        elapsed = time.perf_counter() - (self.started_at or time.perf_counter())
+        self.phases.append((phase, elapsed))
+        return elapsed
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        if not self._active:
+            return original(name, globals, locals, fromlist, level)
+        try:
+            full_name = importlib.util.resolve_name('.' * level + name, (globals or {}).get('__package__')) \
+                if level else name
+        except (ImportError, ValueError):
+            full_name = name
+        if full_name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+
+        stack = self._local.__dict__.setdefault('stack', [])
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                self.imports.setdefault(full_name, (elapsed, elapsed - children))
+
+    def slowest_imports(self, limit: int = 15) -> List[Tuple[str, float, float]]:
+        """(module, inclusive ms, self ms), slowest self time first"""
+        with self._lock:
+            ranked = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)
+        return [(name, inclusive * 1000, own * 1000) for name, (inclusive, own) in ranked[:limit]]
+
+    def report(self, limit: int = 15) -> str:
+        lines = ['Startup timeline:']
+        lines += [f"  {phase:<28} {elapsed * 1000:8.0f} ms" for phase, elapsed in self.phases]
+        lines.append(f"Slowest imports ({len(self.imports)} modules imported):")
+        lines += [f"  {name:<40} {own:7.1f} ms self {inclusive:8.1f} ms total"
+                  for name, inclusive, own in self.slowest_imports(limit)]
+        return '\n'.join(lines)
+
+    def log_report(self, logger: Optional[logging.Logger] = None, limit: int = 15):
+        (logger or logging.getLogger(__name__)).info(self.report(limit))
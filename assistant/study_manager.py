@@ -1,9 +1,13 @@
 import time
 import os
-from pygame import mixer
+import re
+import threading
 from datetime import datetime, timedelta
-import nltk
 from weakref import WeakValueDictionary
+from .lazy_import import lazy_import
+
+mixer = lazy_import('pygame.mixer')
+nltk = lazy_import('nltk')
 
 class StudyManager:
     def __init__(self, db_handler):
@@ -11,13 +15,8 @@ class StudyManager:
         self.cache = WeakValueDictionary()
         self.timer_active = False
         self.current_card = 0
-        mixer.init()
-        
-        # Ensure NLTK resources are available
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
+        # The sound mixer and NLTK's tokenizer data are set up on first use
+        self._punkt_download = None
 
     def start_pomodoro(self, work_mins=25, break_mins=5):
         def timer(countdown):
@@ -52,6 +51,8 @@ class StudyManager:
         """Handle bell sound with fallback"""
         try:
             if os.path.exists("bell.wav"):
+                if not mixer.get_init():
+                    mixer.init()
                 mixer.Sound("bell.wav").play()
             else:
                 # Generate fallback beep
@@ -79,11 +80,28 @@ class StudyManager:
                 self.cache[card[0]] = {'front': card[1], 'back': card[2]}
         return cards
 
+    def _punkt_available(self):
+        """Whether NLTK's sentence tokenizer data is installed; if not, fetch it in the background"""
+        try:
+            nltk.data.find('tokenizers/punkt')
+            return True
+        except ImportError:
+            return False
+        except LookupError:
+            if self._punkt_download is None:
+                self._punkt_download = threading.Thread(
+                    target=nltk.download, args=('punkt',), kwargs={'quiet': True}, daemon=True)
+                self._punkt_download.start()
+            return False
+
     def summarize_text(self, text, ratio=0.2):
         """Summarize text using NLTK with error handling"""
         try:
-            from nltk.tokenize import sent_tokenize
-            sentences = sent_tokenize(text)
+            if self._punkt_available():
+                sentences = nltk.tokenize.sent_tokenize(text)
+            else:
+                # Simple split until the tokenizer data has been downloaded
+                sentences = [s for s in re.split(r'(?<=[.!?])\s+', text.strip()) if s]
             return ' '.join(sentences[:int(len(sentences)*ratio)])
         except Exception as e:
             print(f"Text summarization error: {str(e)}")
@@ -1,10 +1,12 @@
 import os
-import pyautogui
 import subprocess
 from datetime import datetime
+from .lazy_import import lazy_import
+
+pyautogui = lazy_import('pyautogui')
 
 class SystemController:
-    def __init__(self):
+    def __init__(self, app_resolver=None):
         self.screenshot_dir = os.path.expanduser('~/Pictures/Screenshots')
         os.makedirs(self.screenshot_dir, exist_ok=True)
         
@@ -17,6 +19,9 @@ class SystemController:
             'task_manager': 'taskmgr.exe',
             'control_panel': 'control.exe'
         }
+        self.app_resolver = app_resolver
+        if app_resolver:
+            app_resolver.add_aliases(self.app_paths)
     
     def take_screenshot(self, region=None):
         """Take a screenshot of the entire screen or a specific region"""
@@ -38,6 +43,12 @@ class SystemController:
     def open_application(self, app_name):
         """Open a system application by name"""
         try:
+            if self.app_resolver:
+                entry = self.app_resolver.resolve(app_name)
+                if entry and self.app_resolver.launch(entry):
+                    return f'Opened {app_name}'
+                return f'Application {app_name} not found'
+
             app_path = self.app_paths.get(app_name.lower())
             if app_path:
                 subprocess.Popen(app_path)
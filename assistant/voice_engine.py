@@ -1,19 +1,23 @@
 import os
-import pvporcupine
-import sounddevice as sd
-import numpy as np
-import speech_recognition as sr
 from threading import Thread, Event
-import pyttsx3
 import platform
 import json
 import time
-from vosk import Model, KaldiRecognizer
-import requests
-from gtts import gTTS
 from io import BytesIO
-import pygame
 from .ai_service_handler import AIServiceHandler
+from .lazy_import import lazy_import
+from .warm_cache import get_warm_cache, fingerprint
+
+# Audio and speech libraries load on first use so they don't delay the window
+pvporcupine = lazy_import('pvporcupine')
+sd = lazy_import('sounddevice')
+np = lazy_import('numpy')
+sr = lazy_import('speech_recognition')
+pyttsx3 = lazy_import('pyttsx3')
+vosk = lazy_import('vosk')
+requests = lazy_import('requests')
+gtts = lazy_import('gtts')
+pygame = lazy_import('pygame')
 
 class VoiceEngine:
     def __init__(self, gui, command_handler, config):
@@ -46,6 +50,13 @@ class VoiceEngine:
 
     def init_ai_service(self):
         try:
+            # Share the application's AI service so GUI and voice requests are scheduled together
+            if hasattr(self.gui, 'container') and self.gui.container:
+                try:
+                    self.ai_service = self.gui.container.get_service('ai_service')
+                    return
+                except KeyError:
+                    pass
             self.ai_service = AIServiceHandler(self.config)
         except Exception as e:
             self.gui.show_error(f"AI service initialization error: {str(e)}")
@@ -120,7 +131,7 @@ class VoiceEngine:
 
     def init_vosk_model(self):
         try:
-            self.vosk_model = Model(lang="en-us") if self.config.get('offline_mode', False) else None
+            self.vosk_model = vosk.Model(lang="en-us") if self.config.get('offline_mode', False) else None
         except Exception as e:
             self.gui.show_error(f"Vosk model initialization error: {str(e)}")
             # Don't raise here as Vosk is optional
@@ -129,19 +140,61 @@ class VoiceEngine:
         self.wake_word_thread = Thread(target=self.detect_wake_word, daemon=True)
         self.wake_word_thread.start()
 
+    def _find_female_voice(self):
+        """Id of the first installed pyttsx3 voice named female, or None"""
+        for voice in self.engine.getProperty('voices'):
+            if 'female' in voice.name.lower():
+                return voice.id
+        return None
+
+    def _voice_fingerprint(self):
+        """Cache key for the chosen voice that changes when voices are installed or removed"""
+        extra = {'system': platform.platform()}
+        system = platform.system()
+        if system == 'Windows':
+            windir = os.environ.get('SystemRoot', r'C:\Windows')
+            paths = [os.path.join(windir, 'Speech', 'Engines', 'TTS'),
+                     os.path.join(windir, 'Speech_OneCore', 'Engines', 'TTS')]
+            import winreg
+            for key_path in (r'SOFTWARE\Microsoft\Speech\Voices\Tokens',
+                             r'SOFTWARE\Microsoft\Speech_OneCore\Voices\Tokens'):
+                try:
+                    with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path) as key:
+                        extra[key_path] = winreg.QueryInfoKey(key)[2]  # Last write time
+                except OSError:
+                    continue
+        elif system == 'Darwin':
+            paths = ['/System/Library/Speech/Voices', os.path.expanduser('~/Library/Speech/Voices')]
+        else:
+            paths = ['/usr/share/espeak-ng-data', '/usr/share/espeak-ng-data/voices',
+                     '/usr/lib/x86_64-linux-gnu/espeak-ng-data/voices', '/usr/share/espeak/voices']
+        return fingerprint(paths, **extra)
+
     def init_tts_engine(self):
+        # The voice picked on the last launch is reused so the installed voices aren't enumerated again.
+        # The key follows the voice folders/registry, and "no female voice" is never cached,
+        # so a newly installed voice is found on the next launch.
+        warm_cache = get_warm_cache()
         try:
+            voice_key = self._voice_fingerprint()
+            female_voice = warm_cache.get('tts_voice', voice_key)
+
             # Try pyttsx3 first
             self.engine = pyttsx3.init()
-            voices = self.engine.getProperty('voices')
-            female_voice = None
-            for voice in voices:
-                if 'female' in voice.name.lower():
-                    female_voice = voice
-                    break
+            if female_voice:
+                try:
+                    self.engine.setProperty('voice', female_voice)
+                except Exception:
+                    female_voice = None
+            if not female_voice:
+                female_voice = self._find_female_voice()
+                if female_voice:
+                    warm_cache.set('tts_voice', voice_key, female_voice)
+                    self.engine.setProperty('voice', female_voice)
+                else:
+                    warm_cache.invalidate('tts_voice')
             
             if female_voice:
-                self.engine.setProperty('voice', female_voice.id)
                 self.engine.setProperty('rate', self.config['speech_rate'])
                 self.engine.setProperty('volume', self.config['speech_volume'])
                 self.tts_engine = 'pyttsx3'
@@ -213,7 +266,7 @@ class VoiceEngine:
                 
                 # Use gTTS if pyttsx3 failed or was not the selected engine
                 if self.tts_engine == 'gtts':
-                    tts = gTTS(text=txt, lang='en', slow=False)
+                    tts = gtts.gTTS(text=txt, lang='en', slow=False)
                     fp = BytesIO()
                     tts.write_to_fp(fp)
                     fp.seek(0)
@@ -371,7 +424,7 @@ class VoiceEngine:
             return None
             
         try:
-            recognizer = KaldiRecognizer(self.vosk_model, 16000)
+            recognizer = vosk.KaldiRecognizer(self.vosk_model, 16000)
             if recognizer.AcceptWaveform(wav_data):
                 result = json.loads(recognizer.Result())
                 return result.get('text', '')
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .cache import CACHE_DIR
+
+# Bump when the shape of any cached probe result changes
+WARM_CACHE_VERSION = 1
+
+
+def fingerprint(paths: Iterable[Any] = (), env: Iterable[str] = (), **extra: Any) -> str:
+    """Invalidation key from file/folder mtimes and sizes, environment variables and extra values.
+
+    Environment values are hashed rather than stored, so API keys never
+    reach the cache file.
+    """
+    parts = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            parts.append((str(path), st.st_mtime_ns, st.st_size))
+        except OSError:
+            parts.append((str(path), None, None))
+    for name in env:
+        value = os.environ.get(name)
+        parts.append((name, hashlib.sha256(value.encode()).hexdigest() if value is not None else None))
+    parts.append(sorted(extra.items()))
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+class WarmStartCache:
+    """Results of slow one-time startup probes, reused across launches.
+
+    Each probe is stored under a name together with the invalidation key it
+    was computed for (see fingerprint()). A later start with the same key
+    gets the stored result immediately, and with revalidate the probe is
+    re-run on a background thread so a changed result (a provider that went
+    down, a model that was added) is applied and saved for next time. The
+    whole file is ignored when WARM_CACHE_VERSION changes.
+    """
+
+    def __init__(self, path: Optional[Path] = None, version: int = WARM_CACHE_VERSION):
+        self.path = Path(path) if path else CACHE_DIR / 'warm_start.json'
+        self.version = version
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        try:
+            if not self.path.exists():
+                return
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.version:
+                self.entries = data.get('entries', {})
+        except Exception as e:
+            print(f"Error loading warm start cache: {str(e)}")
+
+    def save(self):
+        """Write the cache to disk atomically"""
+        try:
+            # Held throughout so concurrent saves cannot replace a newer file with an older one
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'version': self.version, 'entries': self.entries}, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving warm start cache: {str(e)}")
+
+    def get(self, name: str, key: str, default: Any = None) -> Any:
+        """The stored result for name if it was computed under key"""
+        with self._lock:
+            entry = self.entries.get(name)
+            if entry is None or entry.get('key') != key:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry['value']
+
+    def set(self, name: str, key: str, value: Any, save: bool = True):
+        with self._lock:
+            self.entries[name] = {'key': key, 'value': value, 'stored_at': time.time()}
+        if save:
+            self.save()
+
+    def invalidate(self, name: str):
+        with self._lock:
+            removed = self.entries.pop(name, None)
+        if removed is not None:
+            self.save()
+
+    def cached(self, name: str, key: str, probe: Callable[[], Any], revalidate: bool = True,
+               on_change: Optional[Callable[[Any], None]] = None) -> Any:
+        """Result of probe(), from the cache when the key matches.
+
+        On a hit with revalidate, probe() runs again in the background; if
+        its result differs it is stored and passed to on_change. Results
+        must be JSON serializable.
+        """
+        missing = object()
+        value = self.get(name, key, missing)
+        if value is missing:
+            value = probe()
+            self.set(name, key, value)
+            return value
+
+        if revalidate:
+            threading.Thread(target=self._revalidate, args=(name, key, value, probe, on_change),
+                             daemon=True, name=f'warm-{name}').start()
+        return value
+
+    def _revalidate(self, name: str, key: str, cached_value: Any, probe: Callable[[], Any],
+                    on_change: Optional[Callable[[Any], None]]):
+        try:
+            value = probe()
+        except Exception as e:
+            logging.warning(f"Revalidating {name} failed: {str(e)}")
+            return
+        # Compare as stored, since JSON turns tuples into lists
+        if json.dumps(value, sort_keys=True, default=str) == json.dumps(cached_value, sort_keys=True, default=str):
+            return
+        self.set(name, key, value)
+        logging.info(f"Warm start cache: {name} changed since last launch")
+        if on_change:
+            try:
+                on_change(value)
+            except Exception as e:
+                logging.error(f"Error applying revalidated {name}: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                    'version': self.version}
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_warm_cache() -> WarmStartCache:
+    """The process-wide cache, so every service reads and writes one file"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = WarmStartCache()
+        return _shared_cache
@@ -1,39 +1,170 @@
 import os
-import requests
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime
+from .cache import TTLCache, CACHE_DIR
+from .lazy_import import lazy_import
+
+requests = lazy_import('requests')
 
 class WeatherService:
     def __init__(self):
         self.api_key = os.getenv('WEATHER_API_KEY')
         self.base_url = 'http://api.openweathermap.org/data/2.5/weather'
+        self.forecast_url = 'http://api.openweathermap.org/data/2.5/forecast'
         self.default_city = os.getenv('DEFAULT_CITY', 'London')
         self.units = os.getenv('WEATHER_UNITS', 'metric')
         self.offline_mode = not bool(self.api_key)  # Enable offline mode if no API key
 
-    def get_current_weather(self, city=None):
-        if self.offline_mode:
-            return self._get_offline_weather(city or self.default_city)
+        # Per-city cache of current conditions and 5-day forecasts, kept across restarts.
+        # Entries older than these ages are refetched, but still used if the network is down.
+        self.current_max_age = int(os.getenv('WEATHER_CURRENT_TTL', 10 * 60))
+        self.forecast_max_age = int(os.getenv('WEATHER_FORECAST_TTL', 60 * 60))
+        # How close a forecast slot must be to now to stand in for current conditions
+        self.forecast_slot_window = 90 * 60
+        self.cache = TTLCache(max_entries=64, ttl=self.forecast_max_age,
+                              persist_path=CACHE_DIR / 'weather.json')
+        self.in_flight = {}
+        self.in_flight_lock = threading.Lock()
+        # After a connection failure or timeout, further requests fail fast for this long, so
+        # the current and forecast fetches of one refresh don't each wait out the timeout
+        self.retry_after = int(os.getenv('WEATHER_RETRY_AFTER', 30))
+        self.unreachable_until = 0.0
+
+    def _city_key(self, city):
+        return ' '.join(city.lower().split())
+
+    def _fetch_json(self, url, city):
+        """Fetch from OpenWeatherMap, sharing one request between concurrent callers for the same URL and city"""
+        if time.monotonic() < self.unreachable_until:
+            raise requests.ConnectionError("OpenWeatherMap was unreachable moments ago")
+
+        key = (url, self._city_key(city))
+        with self.in_flight_lock:
+            future = self.in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.in_flight[key] = future
+
+        if not owner:
+            return future.result()
 
         try:
-            city = city or self.default_city
-            if not self.api_key:
-                return self._get_offline_weather(city)
-
             params = {
                 'q': city,
                 'appid': self.api_key,
                 'units': self.units
             }
-            response = requests.get(self.base_url, params=params, timeout=5)
+            response = requests.get(url, params=params, timeout=5)
             response.raise_for_status()
             data = response.json()
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+                self.unreachable_until = time.monotonic() + self.retry_after
+            raise
+        finally:
+            with self.in_flight_lock:
+                self.in_flight.pop(key, None)
+
+    def _cached(self, kind, city, max_age):
+        """Return cached data if younger than max_age"""
+        entry = self.cache.get_entry(f"{kind}:{self._city_key(city)}")
+        if entry is not None and entry[1] <= max_age:
+            return entry[0]
+        return None
+
+    def _last_known(self, kind, city):
+        """Return cached data of any age, for use when the network is unavailable"""
+        entry = self.cache.get_entry(f"{kind}:{self._city_key(city)}")
+        return entry[0] if entry else None
+
+    def _store(self, kind, city, data):
+        self.cache.set(f"{kind}:{self._city_key(city)}", data)
+        self.cache.save()
+
+    def _current_from_forecast(self, forecast, city):
+        """Derive current conditions from the forecast slot closest to now"""
+        now = datetime.now().timestamp()
+        closest = min(forecast.get('list', []), key=lambda item: abs(item['dt'] - now), default=None)
+        if closest is None or abs(closest['dt'] - now) > self.forecast_slot_window:
+            return None
+        return {
+            'name': forecast.get('city', {}).get('name', city),
+            'main': closest['main'],
+            'weather': closest['weather'],
+            'wind': closest.get('wind', {}),
+            'dt': closest['dt'],
+            'derived_from_forecast': True
+        }
+
+    def get_current_data(self, city=None):
+        """Get current conditions as an OpenWeatherMap-style dict, served from cache where possible"""
+        city = city or self.default_city
+
+        data = self._cached('current', city, self.current_max_age)
+        if data is not None:
+            return data
+
+        # One forecast request answers both "weather" and a follow-up "forecast"
+        try:
+            forecast = self.get_forecast_data(city)
+        except requests.RequestException:
+            forecast = None
+        if forecast is not None:
+            data = self._current_from_forecast(forecast, city)
+            if data is not None:
+                return data
+
+        try:
+            data = self._fetch_json(self.base_url, city)
+            self._store('current', city, data)
+            return data
+        except requests.RequestException:
+            last_known = self._last_known('current', city)
+            if last_known is not None:
+                return last_known
+            raise
+
+    def get_forecast_data(self, city=None):
+        """Get the 5-day / 3-hour forecast, served from cache where possible"""
+        city = city or self.default_city
+
+        data = self._cached('forecast', city, self.forecast_max_age)
+        if data is not None:
+            return data
+
+        try:
+            data = self._fetch_json(self.forecast_url, city)
+            self._store('forecast', city, data)
+            return data
+        except requests.RequestException:
+            last_known = self._last_known('forecast', city)
+            if last_known is not None:
+                return last_known
+            raise
+
+    def get_current_weather(self, city=None):
+        if self.offline_mode:
+            return self._get_offline_weather(city or self.default_city)
+
+        try:
+            city = city or self.default_city
+            if not self.api_key:
+                return self._get_offline_weather(city)
+
+            data = self.get_current_data(city)
 
             # Format weather information in a natural way
             weather_desc = data['weather'][0]['description']
             temp = data['main']['temp']
             humidity = data['main']['humidity']
-            wind_speed = data['wind']['speed']
-            
+            wind_speed = data.get('wind', {}).get('speed', 0)
+
             response_text = f"In {city}, it's {weather_desc} with a temperature of {temp}°C. "
             response_text += f"The humidity is {humidity}% and wind speed is {wind_speed} meters per second."
 
@@ -52,7 +183,7 @@ class WeatherService:
         # Provide a simulated response when in offline mode
         from datetime import datetime
         current_hour = datetime.now().hour
-        
+
         # Simulate different weather conditions based on time of day
         if 5 <= current_hour < 12:
             temp = 18
@@ -63,18 +194,18 @@ class WeatherService:
         else:
             temp = 16
             desc = "clear"
-            
+
         # Make sure city is not None
         city = city or self.default_city
-            
+
         response = f"Since I'm in offline mode, I'll give you a simulated weather report for {city}. "
         response += f"It's currently {desc} with an approximate temperature of {temp}°C. "
-        
+
         if temp < 20:
             response += "You might want to bring a light jacket."
         else:
             response += "It's quite pleasant outside."
-            
+
         return response
 
     def get_daily_forecast(self, city=None):
@@ -86,15 +217,7 @@ class WeatherService:
             if not self.api_key:
                 return self._get_offline_weather(city)
 
-            forecast_url = 'http://api.openweathermap.org/data/2.5/forecast'
-            params = {
-                'q': city,
-                'appid': self.api_key,
-                'units': self.units
-            }
-            response = requests.get(forecast_url, params=params, timeout=5)
-            response.raise_for_status()
-            data = response.json()
+            data = self.get_forecast_data(city)
 
             # Get today's date
             today = datetime.now().date()
@@ -113,4 +236,4 @@ class WeatherService:
             return forecast_text
 
         except requests.RequestException as e:
-            return f"I'm sorry, I couldn't fetch the forecast information. {str(e)}"
\ No newline at end of file
+            return f"I'm sorry, I couldn't fetch the forecast information. {str(e)}"
@@ -3,8 +3,10 @@ from tkinter import ttk
 import webbrowser
 from urllib.parse import quote_plus
 import threading
-import requests
-from bs4 import BeautifulSoup
+from .lazy_import import lazy_import
+
+requests = lazy_import('requests')
+bs4 = lazy_import('bs4')
 
 class BrowserFrame(ttk.Frame):
     def __init__(self, master, container=None):
@@ -94,7 +96,7 @@ class BrowserFrame(ttk.Frame):
     def _fetch_content(self, url):
         try:
             response = requests.get(url, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = bs4.BeautifulSoup(response.text, 'html.parser')
             
             # Extract text content
             text_content = soup.get_text()
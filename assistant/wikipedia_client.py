@@ -0,0 +1,157 @@
+import re
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+from .cache import TTLCache, CACHE_DIR
+from .lazy_import import lazy_import
+
+requests = lazy_import('requests')
+
+
+class WikipediaClient:
+    """Resolves a topic to its title, summary and URL in one API request.
+
+    Results are cached on disk. Stale entries are revalidated with a
+    conditional request against the REST summary endpoint (ETag /
+    If-None-Match), and any cached topic can still be answered offline.
+    """
+
+    def __init__(self, language: str = 'en', cache_ttl: float = 7 * 24 * 3600, max_entries: int = 500):
+        self.language = language
+        self.api_url = f"https://{language}.wikipedia.org/w/api.php"
+        self.summary_url = f"https://{language}.wikipedia.org/api/rest_v1/page/summary/"
+        self._session = None  # Created on the first request, so requests is only imported when needed
+        self.cache = TTLCache(max_entries=max_entries, ttl=cache_ttl,
+                              persist_path=CACHE_DIR / f'wikipedia_{language}.json')
+        self.lock = threading.Lock()
+
+    @property
+    def session(self):
+        with self.lock:
+            if self._session is None:
+                self._session = requests.Session()
+                self._session.headers.update({'User-Agent': 'Anna-AI-Assistant'})
+            return self._session
+
+    def _cache_key(self, query: str, sentences: int) -> str:
+        # Summaries are trimmed to a sentence count, so each count is cached separately
+        return f"{' '.join(query.lower().split())}#{sentences}"
+
+    def _trim_sentences(self, text: str, sentences: int) -> str:
+        parts = re.split(r'(?<=[.!?])\s+', text.strip())
+        return ' '.join(parts[:sentences])
+
+    def lookup(self, query: str, sentences: int = 3) -> Dict[str, Any]:
+        """Look up a topic.
+
+        Returns a dict whose 'status' is 'success' (with title, summary and
+        url), 'disambiguation' (with options), 'not_found' or 'error'.
+        """
+        key = self._cache_key(query, sentences)
+        entry = self.cache.get_entry(key)
+        if entry is not None:
+            result, age = entry
+            if age <= self.cache.ttl:
+                return {**result, 'cached': True}
+            refreshed = self._revalidate(key, query, sentences, result)
+            if refreshed is not None:
+                return refreshed
+            # Network unavailable: answer from the last known copy
+            return {**result, 'cached': True, 'stale': True}
+
+        try:
+            result = self._search(query, sentences)
+        except requests.RequestException as e:
+            return {'status': 'error', 'message': f"Could not reach Wikipedia: {str(e)}"}
+
+        if result['status'] in ('success', 'disambiguation'):
+            self._store(key, result)
+        return {**result, 'cached': False}
+
+    def _store(self, key: str, result: Dict[str, Any]):
+        with self.lock:
+            self.cache.set(key, result)
+            self.cache.save()
+
+    def _search(self, query: str, sentences: int) -> Dict[str, Any]:
+        """Search and fetch intro extract, canonical URL and disambiguation flag in one request"""
+        params = {
+            'action': 'query',
+            'format': 'json',
+            'formatversion': 2,
+            'generator': 'search',
+            'gsrsearch': query,
+            'gsrlimit': 5,
+            'prop': 'extracts|info|pageprops',
+            'exintro': 1,
+            'explaintext': 1,
+            'exsentences': sentences,
+            'exlimit': 'max',
+            'inprop': 'url',
+            'ppprop': 'disambiguation',
+            'redirects': 1
+        }
+        response = self.session.get(self.api_url, params=params, timeout=10)
+        response.raise_for_status()
+        pages = response.json().get('query', {}).get('pages', [])
+        if not pages:
+            return {'status': 'not_found'}
+
+        pages.sort(key=lambda page: page.get('index', 0))
+        top = pages[0]
+        if 'disambiguation' in top.get('pageprops', {}):
+            options = [page['title'] for page in pages[1:]] or [top['title']]
+            return {'status': 'disambiguation', 'title': top['title'], 'options': options}
+
+        return {
+            'status': 'success',
+            'title': top['title'],
+            'summary': top.get('extract', ''),
+            'url': top.get('fullurl', f"https://{self.language}.wikipedia.org/wiki/{quote(top['title'])}"),
+            'sentences': sentences,
+            'etag': response.headers.get('ETag')
+        }
+
+    def _revalidate(self, key: str, query: str, sentences: int, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Check a stale entry with a conditional request; None if the network is unavailable"""
+        if result.get('status') != 'success':
+            # Disambiguation results are cheap to redo with a fresh search
+            try:
+                fresh = self._search(query, sentences)
+            except requests.RequestException:
+                return None
+            if fresh['status'] in ('success', 'disambiguation'):
+                self._store(key, fresh)
+            return {**fresh, 'cached': False}
+
+        headers = {}
+        if result.get('etag'):
+            headers['If-None-Match'] = result['etag']
+        try:
+            response = self.session.get(self.summary_url + quote(result['title'].replace(' ', '_'), safe=''),
+                                        headers=headers, timeout=10)
+        except requests.RequestException:
+            return None
+
+        if response.status_code == 304:
+            # Unchanged: just renew the entry's timestamp
+            self._store(key, result)
+            return {**result, 'cached': True}
+        if response.status_code != 200:
+            return None
+
+        data = response.json()
+        updated = {
+            **result,
+            'title': data.get('title', result['title']),
+            'summary': self._trim_sentences(data.get('extract', result['summary']), sentences),
+            'url': data.get('content_urls', {}).get('desktop', {}).get('page', result['url']),
+            'etag': response.headers.get('ETag')
+        }
+        self._store(key, updated)
+        return {**updated, 'cached': False}
+
+    def get_cached_topics(self) -> List[str]:
+        """Topics that can be answered without a network connection"""
+        return list(dict.fromkeys(key.rsplit('#', 1)[0] for key in self.cache.keys()))
@@ -0,0 +1,153 @@
+"""Compare parse time and peak memory of the HTML extractors against the
+original BeautifulSoup html.parser approach, over saved result pages.
+
+Usage:
+    python benchmarks/html_extraction_benchmark.py [--runs N] [--regenerate]
+
+Pages in benchmarks/fixtures can be replaced with real saved result pages
+(youtube_results.html, google_results.html). --regenerate rebuilds the
+synthetic fixtures that mimic their structure.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assistant.html_extraction import default_extractor  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def baseline_youtube(html):
+    """YouTubeCommand._search_youtube before the extraction layer"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup.find_all('a', {'href': re.compile(r'/watch\?v=')}):
+        href = element.get('href', '')
+        if '/watch?v=' in href and 'list=' not in href:
+            return [href.split('/watch?v=')[1]]
+    return re.findall(r"watch\?v=(\S{11})", html)[:1]
+
+
+def baseline_google(html):
+    """SearchService._fetch_search_results before the extraction layer"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    results = []
+    for result in soup.select('div.g'):
+        title_element = result.select_one('h3')
+        link_element = result.select_one('a')
+        snippet_element = result.select_one('div.VwiC3b')
+        if title_element and link_element:
+            results.append({'title': title_element.get_text(), 'link': link_element.get('href'),
+                            'snippet': snippet_element.get_text() if snippet_element else ""})
+    return results
+
+
+def _filler(rng, count):
+    words = ['lorem', 'ipsum', 'dolor', 'sit', 'amet', 'video', 'music', 'lecture', 'study', 'notes']
+    return ''.join(
+        f'<div class="f{i % 7}"><span>{" ".join(rng.choice(words) for _ in range(12))}</span>'
+        f'<a href="/feed/{i}">link</a></div>'
+        for i in range(count)
+    )
+
+
+def _video_id(rng):
+    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-'
+    return ''.join(rng.choice(alphabet) for _ in range(11))
+
+
+def generate_fixtures():
+    rng = random.Random(42)
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+
+    contents = []
+    for i in range(40):
+        video_id = _video_id(rng)
+        contents.append({'videoRenderer': {
+            'videoId': video_id,
+            'thumbnail': {'thumbnails': [{'url': f'https://i.ytimg.com/vi/{video_id}/{size}.jpg',
+                                          'width': size, 'height': size} for size in (120, 320, 480)]},
+            'title': {'runs': [{'text': f'Result video {i}'}]},
+            'viewCountText': {'simpleText': f'{rng.randint(1000, 10 ** 7):,} views'},
+            'navigationEndpoint': {'watchEndpoint': {'videoId': video_id}},
+            'descriptionSnippet': {'runs': [{'text': 'x' * 200}]}
+        }})
+    initial_data = {'contents': {'twoColumnSearchResultsRenderer': {'primaryContents': {
+        'sectionListRenderer': {'contents': [{'itemSectionRenderer': {'contents': contents}}]}}}}}
+    youtube = (
+        '<!DOCTYPE html><html><head><title>YouTube</title>'
+        + ''.join(f'<script>var config{i} = {json.dumps({"k": "v" * 2000})};</script>' for i in range(60))
+        + '</head><body>' + _filler(rng, 2000)
+        + f'<script>var ytInitialData = {json.dumps(initial_data, separators=(",", ":"))};</script>'
+        + '</body></html>'
+    )
+    with open(os.path.join(FIXTURE_DIR, 'youtube_results.html'), 'w', encoding='utf-8') as f:
+        f.write(youtube)
+
+    results = ''.join(
+        f'<div class="g"><div class="yuRUbf"><a href="/url?q=https://example.com/{i}&sa=U">'
+        f'<h3 class="LC20lb">Result {i}</h3></a></div>'
+        f'<div class="VwiC3b"><span>Snippet text for result {i} ' + 'detail ' * 30 + '</span></div></div>'
+        for i in range(10)
+    )
+    google = ('<!DOCTYPE html><html><head><title>Google</title>'
+              + ''.join(f'<style>.c{i}{{color:#{i:06x}}}</style>' for i in range(300))
+              + '</head><body>' + _filler(rng, 1500) + f'<div id="search">{results}</div>'
+              + _filler(rng, 500) + '</body></html>')
+    with open(os.path.join(FIXTURE_DIR, 'google_results.html'), 'w', encoding='utf-8') as f:
+        f.write(google)
+
+
+def measure(func, html, runs):
+    """Median wall time in ms and peak traced memory in KiB"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(html)
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--regenerate', action='store_true')
+    args = parser.parse_args()
+
+    if args.regenerate or not os.path.exists(os.path.join(FIXTURE_DIR, 'youtube_results.html')):
+        generate_fixtures()
+
+    pages = [
+        ('youtube_videos', 'youtube_results.html', baseline_youtube),
+        ('google_results', 'google_results.html', baseline_google),
+    ]
+    for kind, filename, baseline in pages:
+        with open(os.path.join(FIXTURE_DIR, filename), encoding='utf-8') as f:
+            html = f.read()
+        print(f"\n{filename} ({len(html) / 1024:.0f} KiB)")
+        print(f"{'extractor':<20}{'median ms':>12}{'peak KiB':>12}{'results':>10}")
+        for name, func in [('baseline (bs4)', baseline)] + default_extractor.get_extractors(kind):
+            try:
+                count = len(func(html))
+                elapsed, peak = measure(func, html, args.runs)
+            except ImportError as e:
+                print(f"{name:<20}{'skipped: ' + str(e.name) + ' not installed':>34}")
+                continue
+            print(f"{name:<20}{elapsed:>12.2f}{peak:>12.0f}{count:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,9 @@
+from assistant.startup_profiler import StartupProfiler
+
+# Started before the other imports so their cost shows up in the startup report
+startup_profiler = StartupProfiler()
+startup_profiler.start()
+
 from assistant.gui import AssistantGUI
 from assistant.voice_engine import VoiceEngine
 from assistant.command_handler import CommandHandler
@@ -12,6 +18,7 @@ from assistant.file_system_handler import FileSystemHandler
 from assistant.external_services import ExternalServices
 from ttkthemes import ThemedTk
 from assistant.dependency_container import DependencyContainer
+from assistant.startup_orchestrator import StartupOrchestrator
 from assistant.event_system import EventSystem
 from assistant.session_manager import SessionManager
 from assistant.backup_manager import BackupManager
@@ -23,6 +30,7 @@ import json
 import logging
 import os
 import sys
+import threading
 
 def setup_application():
     container = DependencyContainer()
@@ -49,6 +57,7 @@ def main():
         container = setup_application()
         logger = container.get_service('logger')
         config = container.get_service('config')
+        startup_profiler.mark('config_loaded')
         
         # Validate critical configuration
         if not validate_critical_config(config, logger):
@@ -62,10 +71,33 @@ def main():
             logger.error(f"Failed to initialize window: {str(e)}")
             raise RuntimeError(f"Failed to initialize window: {str(e)}")
 
+        # Initialize GUI with container
+        try:
+            gui = AssistantGUI(root, config, container)
+            container.register_service('gui', gui)
+        except Exception as e:
+            logger.error(f"Failed to initialize GUI: {str(e)}")
+            raise RuntimeError(f"Failed to initialize GUI: {str(e)}")
+
+        # Paint the window now; the services below are built afterwards
+        root.update()
+        startup_profiler.mark('window_shown')
+        
         # Initialize core components with error handling
         try:
-            # Initialize components using dependency injection pattern
-            initialize_core_components(container, config, logger)
+            # Build components on worker threads, in dependency order
+            orchestrator = initialize_core_components(container, config, logger)
+            container.register_service('startup_orchestrator', orchestrator)
+            orchestrator.start()
+
+            # Keep the window responsive while the command handler's dependencies are built
+            while not orchestrator.wait(COMMAND_HANDLER_DEPENDENCIES, timeout=0.05):
+                root.update()
+            failed = {name: error for name, error in orchestrator.failures().items()
+                      if name in COMMAND_HANDLER_DEPENDENCIES}
+            if failed:
+                raise RuntimeError('; '.join(f"{name}: {error}" for name, error in failed.items()))
+            startup_profiler.mark('services_ready')
             
         except Exception as e:
             import traceback
@@ -74,14 +106,6 @@ def main():
             print(f"Detailed error: {error_details}")
             raise RuntimeError(f"Failed to initialize core components: {str(e)}")
         
-        # Initialize GUI with container
-        try:
-            gui = AssistantGUI(root, config, container)
-            container.register_service('gui', gui)
-        except Exception as e:
-            logger.error(f"Failed to initialize GUI: {str(e)}")
-            raise RuntimeError(f"Failed to initialize GUI: {str(e)}")
-        
         # Initialize VoiceEngine and CommandHandler
         try:
             # Get required services from container
@@ -121,7 +145,9 @@ def main():
             logger.error(f"Failed to initialize voice engine or command handler: {str(e)}")
             raise RuntimeError(f"Failed to initialize voice engine or command handler: {str(e)}")
         
+        startup_profiler.mark('command_handler_ready')
         logger.info("Application initialized successfully")
+        root.after_idle(finish_startup_profile, logger, orchestrator)
         root.mainloop()
     except Exception as e:
         print(f"Critical error during initialization: {str(e)}")
@@ -129,6 +155,27 @@ def main():
         raise SystemExit(1)
 
 
+# Services CommandHandler is constructed with; the rest may finish after the window is usable
+COMMAND_HANDLER_DEPENDENCIES = [
+    'study_manager', 'media_controller', 'email_manager', 'spaced_repetition',
+    'ai_service', 'file_system', 'external_services'
+]
+
+
+def finish_startup_profile(logger, orchestrator):
+    """Stop timing imports once the main loop runs and log where startup time went"""
+    startup_profiler.mark('mainloop_started')
+    startup_profiler.stop()
+    startup_profiler.log_report(logger)
+
+    # Services nothing waited for may still be building; log their timeline once they are done
+    def log_timeline():
+        orchestrator.wait()
+        logger.info(orchestrator.format_timeline())
+
+    threading.Thread(target=log_timeline, daemon=True).start()
+
+
 def validate_critical_config(config, logger):
     """
     Validates that all critical configuration settings are present.
@@ -160,87 +207,83 @@ def validate_critical_config(config, logger):
 
 def initialize_core_components(container, config, logger):
     """
-    Initialize all core components with proper dependency injection.
-    All components are registered with the container.
+    Describe how to build each core component and what it depends on.
+    Returns a StartupOrchestrator; start() builds independent components in
+    parallel and registers each with the container as it becomes ready.
     """
-    # Database initialization
-    logger.info("Initializing database handler...")
-    print("Initializing database handler...")
-    db_handler = DatabaseHandler()
-    container.register_service('db_handler', db_handler)
-    
-    # Conversation storage initialization
-    logger.info("Initializing conversation storage...")
-    print("Initializing conversation storage...")
-    from assistant.conversation_storage import ConversationStorage
-    conversation_storage = ConversationStorage()
-    container.register_service('conversation_storage', conversation_storage)
-    
-    # Spaced repetition system
-    logger.info("Initializing spaced repetition system...")
-    print("Initializing spaced repetition system...")
-    spaced_repetition = SpacedRepetitionSystem(db_handler)
-    container.register_service('spaced_repetition', spaced_repetition)
-    
-    # Study manager
-    logger.info("Initializing study manager...")
-    print("Initializing study manager...")
-    study_manager = StudyManager(db_handler)
-    container.register_service('study_manager', study_manager)
-    
-    # Media controller with proper dependency injection
-    logger.info("Initializing media controller...")
-    print("Initializing media controller...")
-    media_controller = MediaController(config=config)  # Pass config directly in constructor
-    container.register_service('media_controller', media_controller)
-    
-    # Set media path with proper error handling
-    try:
-        logger.info("Setting media path...")
-        print("Setting media path...")
-        media_controller.set_music_path()
-    except Exception as e:
-        logger.warning(f"Media path setting failed: {str(e)}. Continuing without media path.")
-        print(f"Error setting media path: {str(e)}")
-    
-    # Email manager
-    logger.info("Initializing email manager...")
-    print("Initializing email manager...")
-    email_manager = EmailManager()
-    container.register_service('email_manager', email_manager)
-    
-    # AI service
-    logger.info("Initializing AI service...")
-    print("Initializing AI service...")
-    # Pass config.config instead of config directly to AIServiceHandler
-    ai_service = AIServiceHandler(config.config)
-    container.register_service('ai_service', ai_service)
-    
-    # File system handler
-    logger.info("Initializing file system handler...")
-    print("Initializing file system handler...")
-    file_system = FileSystemHandler()
-    container.register_service('file_system', file_system)
-    
-    # External services
-    logger.info("Initializing external services...")
-    print("Initializing external services...")
-    external_services = ExternalServices(config)
-    container.register_service('external_services', external_services)
-    
-    # Enhanced context manager with dependency injection
-    logger.info("Initializing enhanced context manager...")
-    print("Initializing enhanced context manager...")
-    enhanced_context = EnhancedContextManager(conversation_storage)
-    container.register_service('enhanced_context', enhanced_context)
-    
-    # Dynamic response generator with dependency injection
-    logger.info("Initializing dynamic response generator...")
-    print("Initializing dynamic response generator...")
-    dynamic_response = DynamicResponseGenerator(conversation_storage, enhanced_context)
-    container.register_service('dynamic_response', dynamic_response)
-    
-    return True
+    def create_db_handler():
+        logger.info("Initializing database handler...")
+        return DatabaseHandler()
+
+    def create_conversation_storage():
+        logger.info("Initializing conversation storage...")
+        from assistant.conversation_storage import ConversationStorage
+        return ConversationStorage()
+
+    def create_spaced_repetition():
+        logger.info("Initializing spaced repetition system...")
+        return SpacedRepetitionSystem(container.get_service('db_handler'))
+
+    def create_study_manager():
+        logger.info("Initializing study manager...")
+        return StudyManager(container.get_service('db_handler'))
+
+    def create_media_controller():
+        logger.info("Initializing media controller...")
+        media_controller = MediaController(config=config)  # Pass config directly in constructor
+
+        # Set media path with proper error handling
+        try:
+            logger.info("Setting media path...")
+            media_controller.set_music_path()
+        except Exception as e:
+            logger.warning(f"Media path setting failed: {str(e)}. Continuing without media path.")
+            print(f"Error setting media path: {str(e)}")
+        return media_controller
+
+    def create_email_manager():
+        logger.info("Initializing email manager...")
+        return EmailManager()
+
+    def create_ai_service():
+        logger.info("Initializing AI service...")
+        # Pass config.config instead of config directly to AIServiceHandler
+        return AIServiceHandler(config.config)
+
+    def create_file_system():
+        logger.info("Initializing file system handler...")
+        events = container.get_service('events') if container.has_service('events') else None
+        return FileSystemHandler(events, config)
+
+    def create_external_services():
+        logger.info("Initializing external services...")
+        return ExternalServices(config)
+
+    def create_enhanced_context():
+        logger.info("Initializing enhanced context manager...")
+        return EnhancedContextManager(container.get_service('conversation_storage'))
+
+    def create_dynamic_response():
+        logger.info("Initializing dynamic response generator...")
+        return DynamicResponseGenerator(container.get_service('conversation_storage'),
+                                        container.get_service('enhanced_context'))
+
+    events = container.get_service('events') if container.has_service('events') else None
+    orchestrator = StartupOrchestrator(container, events)
+    orchestrator.add('db_handler', create_db_handler)
+    orchestrator.add('conversation_storage', create_conversation_storage)
+    orchestrator.add('spaced_repetition', create_spaced_repetition, depends_on=['db_handler'])
+    orchestrator.add('study_manager', create_study_manager, depends_on=['db_handler'])
+    orchestrator.add('media_controller', create_media_controller)
+    orchestrator.add('email_manager', create_email_manager)
+    orchestrator.add('ai_service', create_ai_service)
+    orchestrator.add('file_system', create_file_system)
+    orchestrator.add('external_services', create_external_services)
+    orchestrator.add('enhanced_context', create_enhanced_context, depends_on=['conversation_storage'])
+    orchestrator.add('dynamic_response', create_dynamic_response,
+                     depends_on=['conversation_storage', 'enhanced_context'])
+
+    return orchestrator
 
 
 def setup_application():
@@ -305,15 +348,17 @@ def setup_application():
     feature_toggle = FeatureToggleManager(container)
     container.register_service('feature_toggle', feature_toggle)
     
-    # Initialize search service
-    from assistant.search_service import SearchService
-    search_service = SearchService(container)
-    container.register_service('search_service', search_service)
-    
-    # Initialize news service
-    from assistant.news_service import NewsService
-    news_service = NewsService(container)
-    container.register_service('news_service', news_service)
+    # Search and news services are built when the GUI first asks for them
+    def create_search_service():
+        from assistant.search_service import SearchService
+        return SearchService(container)
+
+    def create_news_service():
+        from assistant.news_service import NewsService
+        return NewsService(container)
+
+    container.register_factory('search_service', create_search_service)
+    container.register_factory('news_service', create_news_service)
     
     return container
 